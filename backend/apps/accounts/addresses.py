@@ -0,0 +1,46 @@
+"""Address normalization.
+
+Two addresses are the same entry in a user's address book when their street,
+city, postal code and country match after normalization: Unicode and case
+folding, punctuation and whitespace collapsed, and common street words
+abbreviated. The canonical form is stored as a SHA-256 hash on Address so
+duplicates are caught by a unique (user, normalized_hash) index.
+"""
+import hashlib
+import re
+import unicodedata
+
+ABBREVIATIONS = {
+    'street': 'st',
+    'road': 'rd',
+    'avenue': 'ave',
+    'lane': 'ln',
+    'house': 'h',
+    'apartment': 'apt',
+    'flat': 'apt',
+    'number': 'no',
+    'block': 'blk',
+    'sector': 'sec',
+}
+SEPARATORS_RE = re.compile(r"[\s.,#:;/\\\-'\"()]+")
+POSTAL_CODE_RE = re.compile(r'[^0-9A-Z]')
+
+
+def normalize_text(value):
+    value = unicodedata.normalize('NFKC', value or '').casefold()
+    words = [word for word in SEPARATORS_RE.split(value) if word]
+    return ' '.join(ABBREVIATIONS.get(word, word) for word in words)
+
+
+def normalize_postal_code(value):
+    return POSTAL_CODE_RE.sub('', unicodedata.normalize('NFKC', value or '').upper())
+
+
+def address_hash(street_address, city, postal_code, country):
+    canonical = '|'.join([
+        normalize_text(street_address),
+        normalize_text(city),
+        normalize_postal_code(postal_code),
+        normalize_text(country),
+    ])
+    return hashlib.sha256(canonical.encode()).hexdigest()
@@ -1,5 +1,33 @@
 from django.contrib import admin
+from utils.admin import LargeTableAdmin
 from .models import User, Address
 
-admin.site.register(User)
-admin.site.register(Address)
+@admin.register(User)
+class UserAdmin(LargeTableAdmin):
+    list_display = ['email', 'first_name', 'last_name', 'is_staff', 'is_active', 'date_joined']
+    list_filter = ['is_staff', 'is_active']
+    search_fields = ['email', 'first_name', 'last_name']
+    date_hierarchy = 'date_joined'
+
+@admin.register(Address)
+class AddressAdmin(LargeTableAdmin):
+    list_display = ['user', 'street_address', 'city', 'country', 'is_default']
+    list_select_related = ['user']
+    search_fields = ['street_address', 'postal_code']
+    autocomplete_fields = ['user']
+
+from .models import MailCampaign
+
+@admin.register(MailCampaign)
+class MailCampaignAdmin(admin.ModelAdmin):
+    list_display = ['name', 'status', 'sent', 'failed', 'created_at', 'finished_at']
+    list_filter = ['status']
+    readonly_fields = ['status', 'sent', 'failed', 'last_user_id', 'started_at', 'finished_at']
+    fieldsets = [
+        (None, {
+            'fields': ['name', 'subject', 'body'],
+            'description': "Sent with `manage.py send_campaign <id>`. Templates get the recipient as {{ user }}, "
+                           "e.g. Hi {{ user.first_name|default:'there' }}.",
+        }),
+        ('Progress', {'fields': readonly_fields}),
+    ]
@@ -0,0 +1,115 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+CACHE_PREFIX = 'auth:token:'
+
+
+class _LocalTokenCache:
+    """Tiny per-process TTL cache in front of the shared cache.
+
+    Entries live for TOKEN_LOCAL_CACHE_TTL seconds, which bounds how long a
+    revoked token can keep working in a worker that did not see the revocation.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            with self._lock:
+                self._data.pop(key, None)
+            return None
+        return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            if len(self._data) >= settings.TOKEN_LOCAL_CACHE_SIZE:
+                self._data.clear()
+            self._data[key] = (time.monotonic() + ttl, value)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+local_cache = _LocalTokenCache()
+
+
+def _cache_key(key):
+    return f"{CACHE_PREFIX}{key}"
+
+
+def token_expires_at(created):
+    return created + settings.TOKEN_EXPIRY
+
+
+def is_expired(created):
+    return token_expires_at(created) <= timezone.now()
+
+
+def evict_token(key):
+    local_cache.delete(key)
+    cache.delete(_cache_key(key))
+
+
+def issue_token(user):
+    """Return a valid token for the user, replacing it if it has expired."""
+    token, created = Token.objects.get_or_create(user=user)
+    if not created and is_expired(token.created):
+        token = rotate_token(user)
+    return token
+
+
+def rotate_token(user):
+    # Deleting fires post_delete, which evicts the old key from the caches.
+    Token.objects.filter(user=user).delete()
+    return Token.objects.create(user=user)
+
+
+def revoke_user_tokens(user):
+    Token.objects.filter(user=user).delete()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Token authentication that normally costs zero queries.
+
+    Resolved (user, token created) pairs are kept in a short-lived in-process
+    cache backed by the shared Django cache. Tokens expire TOKEN_EXPIRY after
+    they were issued; revocation is handled by the signals in apps.accounts.
+    """
+
+    def authenticate_credentials(self, key):
+        entry = local_cache.get(key)
+        if entry is None:
+            entry = cache.get(_cache_key(key))
+            if entry is None:
+                entry = self._load(key)
+                cache.set(_cache_key(key), entry, settings.TOKEN_CACHE_TTL)
+            local_cache.set(key, entry, settings.TOKEN_LOCAL_CACHE_TTL)
+
+        user, created = entry
+        if is_expired(created):
+            evict_token(key)
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        if not user.is_active:
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return (user, key)
+
+    def _load(self, key):
+        try:
+            token = Token.objects.select_related('user').get(key=key)
+        except Token.DoesNotExist:
+            raise exceptions.AuthenticationFailed('Invalid token.')
+        return (token.user, token.created)
@@ -0,0 +1,19 @@
+from apps.events.bus import ORDER_PLACED, subscribe
+from .models import Address
+
+
+@subscribe(ORDER_PLACED)
+def save_order_address(payload):
+    from apps.orders.models import Order
+
+    order = Order.objects.select_related('user').get(pk=payload['order_id'])
+    if order.user is None:
+        return
+    Address.objects.upsert(
+        order.user,
+        street_address=order.address_line_1,
+        city=order.city,
+        state=order.state,
+        postal_code=order.postal_code,
+        country=order.country,
+    )
@@ -0,0 +1,134 @@
+"""Campaign mail to the whole user base.
+
+`send_campaign` walks active users in primary key order, MAIL_CHUNK_SIZE at a
+time, with keyset pagination (`pk > last`), so memory stays flat and every
+chunk is an index range read no matter how far into the table the run is.
+Subject and body templates are compiled once per run. All mail goes over one
+SMTP connection that stays open for the run; it is only reopened if the
+server drops it.
+
+After each chunk the campaign stores the last user id and its counters. A run
+that dies can be resumed with `send_campaign(campaign, resume=True)` and picks
+up after the last completed chunk. Recipients of the chunk in flight may get
+the message twice.
+
+Sending is paced to MAIL_RATE_PER_SECOND: messages go out in batches of one
+second's worth, and the run sleeps whenever it gets ahead of the rate. Within
+a batch each message is its own send_messages() call on the open connection,
+so a refused recipient or a dropped connection only affects that message and
+nobody who was already mailed is mailed again.
+"""
+import smtplib
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.template import Context, Engine
+from django.utils import timezone
+
+from .models import MailCampaign, User
+
+# Plain text mail, so nothing is HTML-escaped.
+ENGINE = Engine(autoescape=False)
+
+
+class CampaignError(Exception):
+    pass
+
+
+def _next_chunk(after, chunk_size):
+    return list(
+        User.objects
+        .filter(is_active=True, pk__gt=after)
+        .order_by('pk')
+        .only('pk', 'email', 'first_name', 'last_name')[:chunk_size]
+    )
+
+
+def _send_one(connection, message):
+    try:
+        return connection.send_messages([message]) or 0
+    except smtplib.SMTPServerDisconnected:
+        # Nothing went out for this message; reconnect and try it once more.
+        connection.close()
+        connection.open()
+        return connection.send_messages([message]) or 0
+
+
+def _deliver(connection, messages):
+    """Send `messages` over `connection` one at a time; returns (sent, failed).
+
+    send_messages() stops at the first error, so sending them together would
+    not tell which ones already went out.
+    """
+    sent = failed = 0
+    for message in messages:
+        try:
+            if _send_one(connection, message):
+                sent += 1
+            else:
+                failed += 1
+        except smtplib.SMTPException:
+            failed += 1
+    return sent, failed
+
+
+def send_campaign(campaign, resume=False, chunk_size=None, rate=None, progress=None):
+    """Mail `campaign` to every active user; returns the updated campaign.
+
+    `progress`, if given, is called with the campaign after each chunk.
+    """
+    chunk_size = chunk_size or settings.MAIL_CHUNK_SIZE
+    rate = rate or settings.MAIL_RATE_PER_SECOND
+    # Compile before claiming, so a template error leaves the campaign a Draft.
+    subject_template = ENGINE.from_string(campaign.subject)
+    body_template = ENGINE.from_string(campaign.body)
+    from_email = settings.EMAIL_HOST_USER or 'noreply@luxstore.com'
+
+    statuses = ['Draft', 'Sending'] if resume else ['Draft']
+    claimed = MailCampaign.objects.filter(pk=campaign.pk, status__in=statuses).update(
+        status='Sending', started_at=Coalesce(F('started_at'), timezone.now()),
+    )
+    campaign.refresh_from_db()
+    if not claimed:
+        hint = " Pass resume=True to continue an interrupted run." if campaign.status == 'Sending' else ""
+        raise CampaignError(f"Campaign '{campaign.name}' is {campaign.status}.{hint}")
+
+    connection = get_connection()
+    connection.open()
+    started, attempted = time.monotonic(), 0
+    try:
+        while True:
+            users = _next_chunk(campaign.last_user_id, chunk_size)
+            if not users:
+                break
+            messages = []
+            for user in users:
+                context = Context({'user': user})
+                subject = ' '.join(subject_template.render(context).split())
+                messages.append(EmailMessage(subject, body_template.render(context), from_email, [user.email]))
+
+            sent = failed = 0
+            for i in range(0, len(messages), rate):
+                batch = messages[i:i + rate]
+                s, f = _deliver(connection, batch)
+                sent, failed = sent + s, failed + f
+                attempted += len(batch)
+                delay = started + attempted / rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+
+            MailCampaign.objects.filter(pk=campaign.pk).update(
+                last_user_id=users[-1].pk, sent=F('sent') + sent, failed=F('failed') + failed,
+            )
+            campaign.refresh_from_db()
+            if progress:
+                progress(campaign)
+    finally:
+        connection.close()
+
+    MailCampaign.objects.filter(pk=campaign.pk).update(status='Sent', finished_at=timezone.now())
+    campaign.refresh_from_db()
+    return campaign
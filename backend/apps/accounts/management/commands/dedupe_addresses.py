@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.accounts.addresses import address_hash
+from apps.accounts.models import Address
+
+
+class Command(BaseCommand):
+    help = "Backfill Address.normalized_hash and merge duplicate address book entries."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        hashed = merged = 0
+        while True:
+            with transaction.atomic():
+                batch = list(Address.objects.filter(normalized_hash__isnull=True).order_by('id')[:batch_size])
+                if not batch:
+                    break
+                for address in batch:
+                    address.normalized_hash = address_hash(
+                        address.street_address, address.city, address.postal_code, address.country
+                    )
+
+                # Entries already hashed win over the batch; within the batch the oldest wins.
+                keepers = {
+                    (address.user_id, address.normalized_hash): address
+                    for address in Address.objects.filter(
+                        user_id__in={address.user_id for address in batch},
+                        normalized_hash__in={address.normalized_hash for address in batch},
+                    )
+                }
+                to_update, duplicates = {}, []
+                for address in batch:
+                    key = (address.user_id, address.normalized_hash)
+                    keeper = keepers.get(key)
+                    if keeper is None:
+                        keepers[key] = to_update[address.pk] = address
+                        continue
+                    duplicates.append(address.pk)
+                    if address.is_default and not keeper.is_default:
+                        keeper.is_default = True
+                        to_update[keeper.pk] = keeper
+
+                Address.objects.filter(pk__in=duplicates).delete()
+                Address.objects.bulk_update(to_update.values(), ['normalized_hash', 'is_default'])
+                hashed += len(batch)
+                merged += len(duplicates)
+            self.stdout.write(f"Processed {hashed} address(es), merged {merged} duplicate(s)...")
+        self.stdout.write(self.style.SUCCESS(f"Done: {hashed} address(es) processed, {merged} duplicate(s) merged."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.accounts.mailer import CampaignError, send_campaign
+from apps.accounts.models import MailCampaign
+
+
+class Command(BaseCommand):
+    help = "Email a mail campaign to every active user, resumably and rate limited."
+
+    def add_arguments(self, parser):
+        parser.add_argument('campaign', type=int, help="MailCampaign id.")
+        parser.add_argument('--resume', action='store_true', help="Continue a run that was interrupted.")
+        parser.add_argument('--chunk-size', type=int, help="Recipients per chunk (default: MAIL_CHUNK_SIZE).")
+        parser.add_argument('--rate', type=int, help="Messages per second (default: MAIL_RATE_PER_SECOND).")
+
+    def handle(self, *args, **options):
+        try:
+            campaign = MailCampaign.objects.get(pk=options['campaign'])
+        except MailCampaign.DoesNotExist:
+            raise CommandError(f"No mail campaign with id {options['campaign']}.")
+
+        def progress(campaign):
+            self.stdout.write(f"Sent {campaign.sent}, failed {campaign.failed} (up to user {campaign.last_user_id}).")
+
+        try:
+            campaign = send_campaign(
+                campaign, options['resume'], options['chunk_size'], options['rate'], progress,
+            )
+        except CampaignError as e:
+            raise CommandError(str(e))
+        self.stdout.write(self.style.SUCCESS(
+            f"Campaign '{campaign.name}' sent to {campaign.sent} user(s), {campaign.failed} failed."
+        ))
@@ -0,0 +1,22 @@
+# Generated by Django 6.0 on 2026-10-19 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0003_user_avatar_user_phone'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='normalized_hash',
+            field=models.CharField(editable=False, max_length=64, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='address',
+            constraint=models.UniqueConstraint(fields=('user', 'normalized_hash'), name='address_user_hash_uniq'),
+        ),
+    ]
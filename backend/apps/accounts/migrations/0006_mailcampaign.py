@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0005_admin_date_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MailCampaign',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('subject', models.CharField(max_length=200)),
+                ('body', models.TextField()),
+                ('status', models.CharField(choices=[('Draft', 'Draft'), ('Sending', 'Sending'), ('Sent', 'Sent')], default='Draft', max_length=10)),
+                ('last_user_id', models.PositiveBigIntegerField(default=0, editable=False)),
+                ('sent', models.PositiveIntegerField(default=0, editable=False)),
+                ('failed', models.PositiveIntegerField(default=0, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, editable=False, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, editable=False, null=True)),
+            ],
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from .addresses import address_hash
 
 class CustomUserManager(BaseUserManager):
     def create_user(self, email, password=None, **extra_fields):
@@ -27,9 +28,41 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Admin date hierarchy.
+            models.Index(fields=['date_joined'], name='user_date_joined_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
+class AddressManager(models.Manager):
+    def upsert(self, user, street_address, city, state, postal_code, country, is_default=None):
+        """Return (address, created) for the user's entry matching this address.
+
+        One indexed lookup on (user, normalized_hash); a new entry becomes the
+        default only if the user has none yet, unless is_default is given.
+        """
+        if is_default is None:
+            is_default = lambda: not self.filter(user=user, is_default=True).exists()
+        address, created = self.get_or_create(
+            user=user,
+            normalized_hash=address_hash(street_address, city, postal_code, country),
+            defaults={
+                'street_address': street_address,
+                'city': city,
+                'state': state,
+                'postal_code': postal_code,
+                'country': country,
+                'is_default': is_default,
+            },
+        )
+        if not created and is_default is True and not address.is_default:
+            address.is_default = True
+            address.save(update_fields=['is_default'])
+        return address, created
+
 class Address(models.Model):
     user = models.ForeignKey(User, related_name='addresses', on_delete=models.CASCADE)
     street_address = models.CharField(max_length=255)
@@ -38,6 +71,46 @@ class Address(models.Model):
     postal_code = models.CharField(max_length=20)
     country = models.CharField(max_length=100)
     is_default = models.BooleanField(default=False)
+    # Null only for rows saved before normalization; see dedupe_addresses.
+    normalized_hash = models.CharField(max_length=64, null=True, editable=False)
+
+    objects = AddressManager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'normalized_hash'], name='address_user_hash_uniq'),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.normalized_hash = address_hash(self.street_address, self.city, self.postal_code, self.country)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'normalized_hash' not in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_hash'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.street_address}, {self.city}"
+
+class MailCampaign(models.Model):
+    """A one-off email to every active user; sent by `manage.py send_campaign`."""
+    STATUS_CHOICES = (
+        ('Draft', 'Draft'),
+        ('Sending', 'Sending'),
+        ('Sent', 'Sent'),
+    )
+
+    name = models.CharField(max_length=100)
+    # Django template syntax, rendered per recipient with `user` in the context.
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Draft')
+    # Recipients go out in primary key order; a resumed run starts after this.
+    last_user_id = models.PositiveBigIntegerField(default=0, editable=False)
+    sent = models.PositiveIntegerField(default=0, editable=False)
+    failed = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return f"{self.name} ({self.status})"
@@ -0,0 +1,29 @@
+"""Account queries checked by `manage.py check_query_plans`."""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from utils.query_plans import hot_query
+from .models import Address, User
+
+
+@hot_query('accounts.user_by_email')
+def user_by_email():
+    return User.objects.filter(email='user@example.com')
+
+
+@hot_query('accounts.address_book')
+def address_book():
+    return Address.objects.filter(user_id=1)
+
+
+@hot_query('accounts.admin_by_join_date')
+def admin_by_join_date():
+    # Admin date hierarchy drilled down to one day.
+    day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return User.objects.filter(date_joined__gte=day, date_joined__lt=day + timedelta(days=1)).order_by('-date_joined')[:100]
+
+
+@hot_query('accounts.campaign_recipients')
+def campaign_recipients():
+    return User.objects.filter(is_active=True, pk__gt=1000).order_by('pk')[:500]
@@ -0,0 +1,34 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import evict_token, revoke_user_tokens
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def evict_deleted_token(sender, instance, **kwargs):
+    evict_token(instance.key)
+
+
+@receiver(post_save, sender=User)
+def refresh_user_tokens(sender, instance, created, **kwargs):
+    if created:
+        return
+    # set_password() stashes the raw password until save() completes, so this
+    # is how a password change shows up here.
+    if getattr(instance, '_password', None) is not None:
+        revoke_user_tokens(instance)
+        return
+    # Any other profile change: drop the cached copy of the user.
+    for key in Token.objects.filter(user=instance).values_list('key', flat=True):
+        evict_token(key)
+
+
+@receiver(user_logged_out)
+def revoke_on_session_logout(sender, user, **kwargs):
+    if user is not None:
+        revoke_user_tokens(user)
@@ -1,3 +1,46 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from rest_framework.test import APIRequestFactory
+
+from utils.throttling import SlidingWindowThrottle
+
+
+class LoginThrottle(SlidingWindowThrottle):
+    scope = 'login'  # 5/min per client, 20/min per IP
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = APIRequestFactory()
+        # Early in a window, so the previous window doesn't weigh in.
+        patcher = mock.patch('utils.throttling.time.time', return_value=60_000_000.0 + 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def attempt(self, **headers):
+        request = self.factory.post('/api/auth/login/', REMOTE_ADDR='203.0.113.7', **headers)
+        request.user = AnonymousUser()
+        return LoginThrottle().allow_request(request, None)
+
+    def test_spoofed_forwarded_for_shares_one_bucket(self):
+        results = [self.attempt(HTTP_X_FORWARDED_FOR=f"198.51.100.{i}") for i in range(8)]
+        self.assertEqual(results, [True] * 5 + [False] * 3)
+
+    def test_denied_requests_are_not_counted(self):
+        for _ in range(5):
+            self.assertTrue(self.attempt())
+        for _ in range(10):
+            self.assertFalse(self.attempt())
+        key = f"throttle:login.client:203.0.113.7:{1_000_000}"
+        self.assertEqual(cache.get(key), 5)
+
+    def test_concurrent_burst_stays_within_limit(self):
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=10) as pool:
+            results = list(pool.map(lambda _: self.attempt(), range(30)))
+        self.assertEqual(results.count(True), 5)
@@ -1,8 +1,11 @@
-from rest_framework import viewsets, permissions, status
+from django.db import IntegrityError, transaction
+from rest_framework import serializers, viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework.authtoken.models import Token
+from apps.events.bus import USER_LOGGED_IN, publish
+from utils.throttling import SlidingWindowThrottle
+from .authentication import issue_token, rotate_token, revoke_user_tokens
 from .models import Address
 from .serializers import UserSerializer, RegisterSerializer, AddressSerializer
 
@@ -10,54 +13,28 @@ User = get_user_model()
 
 class AuthViewSet(viewsets.ViewSet):
     permission_classes = [permissions.AllowAny]
+    throttle_scope = None  # set per action
 
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=[SlidingWindowThrottle], throttle_scope='login')
     def login(self, request):
         email = request.data.get('email')
         password = request.data.get('password')
         user = authenticate(username=email, password=password)
         if user:
-            token, _ = Token.objects.get_or_create(user=user)
+            token = issue_token(user)
             
-            # --- Smart Coupon Logic: Login Trigger ---
-            try:
-                from django.utils import timezone
-                from apps.store.models import CouponRule, UserCouponHistory
-                from utils.email_service import EmailService
-
-                now = timezone.now()
-                # Find active login rules
-                login_rules = CouponRule.objects.filter(
-                    trigger_event='LOGIN',
-                    is_active=True,
-                    start_date__lte=now,
-                    end_date__gte=now
-                )
-
-                for rule in login_rules:
-                    # Check if already sent
-                    if not UserCouponHistory.objects.filter(user=user, rule=rule).exists():
-                        # Record history first to prevent race usage (simple lock)
-                        UserCouponHistory.objects.create(user=user, rule=rule)
-                        
-                        # Send Email
-                        # We need a new method in email service or use generic send
-                        subject = f"You've unlocked a reward: {rule.name}"
-                        message = f"Hi {user.full_name},\n\nThanks for logging in! As a special treat, here is a coupon code just for you:\n\nCode: {rule.coupon.code}\nDiscount: {rule.coupon.discount_value} ({rule.coupon.discount_type})\n\nEnjoy shopping!\nLuxStore Team"
-                        EmailService.send_email(subject, message, [user.email])
-            except Exception as e:
-                print(f"Coupon Rule Error: {e}")
-            # -----------------------------------------
+            # Login coupon rewards run as a handler; see store.handlers.
+            publish(USER_LOGGED_IN, {'user_id': user.id}, key=f"user:{user.id}")
 
             return Response({'token': token.key, 'user': UserSerializer(user).data})
         return Response({'error': 'Invalid Credentials'}, status=status.HTTP_400_BAD_REQUEST)
 
-    @action(detail=False, methods=['post'])
+    @action(detail=False, methods=['post'], throttle_classes=[SlidingWindowThrottle], throttle_scope='register')
     def register(self, request):
         serializer = RegisterSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            token, _ = Token.objects.get_or_create(user=user)
+            token = issue_token(user)
             
             # Send Welcome Email
             from utils.email_service import EmailService
@@ -66,6 +43,16 @@ class AuthViewSet(viewsets.ViewSet):
             return Response({'token': token.key, 'user': UserSerializer(user).data})
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def logout(self, request):
+        revoke_user_tokens(request.user)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAuthenticated])
+    def rotate(self, request):
+        token = rotate_token(request.user)
+        return Response({'token': token.key})
+
 class AddressViewSet(viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = AddressSerializer
@@ -74,7 +61,15 @@ class AddressViewSet(viewsets.ModelViewSet):
         return Address.objects.filter(user=self.request.user)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        # Saving an address the user already has returns the existing entry.
+        serializer.instance, created = Address.objects.upsert(self.request.user, **serializer.validated_data)
+
+    def perform_update(self, serializer):
+        try:
+            with transaction.atomic():
+                serializer.save()
+        except IntegrityError:
+            raise serializers.ValidationError({'error': 'This address is already in your address book.'})
 
 class UserViewSet(viewsets.GenericViewSet):
     permission_classes = [permissions.IsAuthenticated]
@@ -0,0 +1,16 @@
+from django.contrib import admin
+from django.utils import timezone
+from utils.admin import LargeTableAdmin
+from .models import OutboxEvent
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(LargeTableAdmin):
+    list_display = ['id', 'name', 'key', 'status', 'attempts', 'created_at', 'processed_at']
+    list_filter = ['status', 'name']
+    search_fields = ['key']
+    readonly_fields = ['name', 'key', 'payload', 'handled', 'attempts', 'last_error', 'created_at', 'processed_at']
+    actions = ['retry']
+
+    @admin.action(description="Retry selected events")
+    def retry(self, request, queryset):
+        queryset.exclude(status='Done').update(status='Pending', attempts=0, available_at=timezone.now(), claimed_until=None)
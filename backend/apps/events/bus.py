@@ -0,0 +1,186 @@
+"""Transactional outbox for domain events.
+
+    publish('order.placed', {'order_id': order.id}, key=f'order:{order.id}')
+
+writes an OutboxEvent in the caller's transaction, so the event exists if and
+only if the state change it describes was committed. On commit the in-process
+dispatcher thread is woken; `manage.py dispatch_events` does the same work
+from a separate worker when EVENTS_DISPATCH_IN_PROCESS is off.
+
+Handlers subscribe with `@subscribe('order.placed')` (see each app's
+handlers.py) and receive the event payload. Delivery is at-least-once:
+a handler that raises is retried with backoff, handlers that already
+succeeded for that event are not re-run, and events with the same key are
+never delivered out of order. Handlers must therefore be idempotent.
+
+Delivered events are kept for EVENTS_RETENTION_DAYS and then removed by
+`manage.py prune_events` (see `prune_delivered`).
+"""
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import OutboxEvent
+
+ORDER_PLACED = 'order.placed'
+ORDER_STATUS_CHANGED = 'order.status_changed'
+USER_LOGGED_IN = 'user.logged_in'
+RETURN_STATUS_CHANGED = 'return.status_changed'
+
+_handlers = defaultdict(list)
+
+
+def subscribe(name):
+    def decorator(func):
+        _handlers[name].append(func)
+        return func
+    return decorator
+
+
+def handler_name(func):
+    return f"{func.__module__}.{func.__qualname__}"
+
+
+def publish(name, payload, key=''):
+    event = OutboxEvent.objects.create(name=name, payload=payload, key=key)
+    if settings.EVENTS_DISPATCH_IN_PROCESS:
+        transaction.on_commit(dispatcher.wake)
+    return event
+
+
+def publish_many(name, events):
+    """Publish (payload, key) pairs with a single INSERT."""
+    created = OutboxEvent.objects.bulk_create(
+        [OutboxEvent(name=name, payload=payload, key=key) for payload, key in events]
+    )
+    if created and settings.EVENTS_DISPATCH_IN_PROCESS:
+        transaction.on_commit(dispatcher.wake)
+    return created
+
+
+def _backoff(attempts):
+    return timedelta(seconds=min(2 ** attempts, 3600))
+
+
+def deliver(event):
+    """Run the event's outstanding handlers; the caller must hold the claim."""
+    handled = list(event.handled)
+    error = None
+    for handler in _handlers.get(event.name, ()):
+        name = handler_name(handler)
+        if name in handled:
+            continue
+        try:
+            handler(event.payload)
+        except Exception as e:
+            error = f"{name}: {e!r}"
+            break
+        handled.append(name)
+
+    now = timezone.now()
+    if error is None:
+        update = {'status': 'Done', 'processed_at': now, 'last_error': ''}
+    elif event.attempts >= settings.EVENTS_MAX_ATTEMPTS:
+        update = {'status': 'Failed', 'processed_at': now, 'last_error': error}
+    else:
+        update = {'status': 'Pending', 'available_at': now + _backoff(event.attempts), 'last_error': error}
+    OutboxEvent.objects.filter(pk=event.pk).update(handled=handled, claimed_until=None, **update)
+    return error is None
+
+
+def dispatch_pending(batch_size=100):
+    """Deliver every event that is ready now; returns how many were delivered.
+
+    Walks all open events in id order, `batch_size` at a time, so events that
+    are backing off or in flight never hide later ones from the dispatcher;
+    they only hold back later events with the same key.
+    """
+    delivered, last_id = 0, 0
+    lease = timedelta(seconds=settings.EVENTS_LEASE_SECONDS)
+    blocked_keys = set()
+    while True:
+        now = timezone.now()
+        batch = list(
+            OutboxEvent.objects
+            .filter(status__in=['Pending', 'Processing'], id__gt=last_id)
+            .order_by('id')[:batch_size]
+        )
+        if not batch:
+            return delivered
+        last_id = batch[-1].id
+
+        for event in batch:
+            if event.key and event.key in blocked_keys:
+                continue
+            ready = (
+                (event.status == 'Pending' and event.available_at <= now)
+                or (event.status == 'Processing' and event.claimed_until and event.claimed_until < now)
+            )
+            if not ready:
+                blocked_keys.add(event.key)  # an earlier event for this key is waiting or in flight
+                continue
+            claimed = OutboxEvent.objects.filter(pk=event.pk).filter(
+                Q(status='Pending', available_at__lte=now) | Q(status='Processing', claimed_until__lt=now)
+            ).update(status='Processing', claimed_until=now + lease, attempts=F('attempts') + 1)
+            if not claimed:
+                blocked_keys.add(event.key)  # another worker got there first
+                continue
+            event.attempts += 1
+            if deliver(event):
+                delivered += 1
+            else:
+                blocked_keys.add(event.key)
+
+
+def prune_delivered(older_than=None, batch_size=1000):
+    """Delete Done events processed before `older_than`; returns how many.
+
+    Deletes in primary key batches so no single statement holds locks on
+    a large part of the table.
+    """
+    if older_than is None:
+        older_than = timezone.now() - timedelta(days=settings.EVENTS_RETENTION_DAYS)
+    deleted = 0
+    while True:
+        pks = list(
+            OutboxEvent.objects.filter(status='Done', processed_at__lt=older_than)
+            .order_by('id').values_list('pk', flat=True)[:batch_size]
+        )
+        if not pks:
+            return deleted
+        deleted += OutboxEvent.objects.filter(pk__in=pks).delete()[0]
+
+
+class _Dispatcher:
+    """One background thread per process, woken on commit and polling for retries."""
+
+    def __init__(self):
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def wake(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='outbox-dispatcher', daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(settings.EVENTS_POLL_SECONDS)
+            self._wake.clear()
+            try:
+                dispatch_pending()
+            except Exception as e:
+                print(f"Event dispatch failed: {e}")
+            finally:
+                connections.close_all()
+
+
+dispatcher = _Dispatcher()
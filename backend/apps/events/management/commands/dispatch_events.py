@@ -0,0 +1,25 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.events.bus import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = "Deliver pending outbox events to their handlers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep polling instead of exiting when idle.")
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        while True:
+            delivered = dispatch_pending(options['batch_size'])
+            if delivered or not options['loop']:
+                self.stdout.write(f"Delivered {delivered} event(s).")
+            if not options['loop']:
+                break
+            connections.close_all()
+            time.sleep(settings.EVENTS_POLL_SECONDS)
@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.events.bus import prune_delivered
+
+
+class Command(BaseCommand):
+    help = "Delete delivered outbox events older than EVENTS_RETENTION_DAYS."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help=(
+            "Keep this many days of delivered events instead of EVENTS_RETENTION_DAYS."
+        ))
+
+    def handle(self, *args, **options):
+        days = options['days'] if options['days'] is not None else settings.EVENTS_RETENTION_DAYS
+        deleted = prune_delivered(timezone.now() - timedelta(days=days))
+        self.stdout.write(f"Deleted {deleted} delivered event(s) older than {days} day(s).")
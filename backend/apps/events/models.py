@@ -0,0 +1,32 @@
+from django.db import models
+from django.utils import timezone
+
+class OutboxEvent(models.Model):
+    """A domain event written in the same transaction as the state it describes."""
+    STATUS_CHOICES = (
+        ('Pending', 'Pending'),
+        ('Processing', 'Processing'),
+        ('Done', 'Done'),
+        ('Failed', 'Failed'),
+    )
+
+    name = models.CharField(max_length=64)
+    # Events sharing a key (e.g. 'order:42') are delivered strictly in id order.
+    key = models.CharField(max_length=64, blank=True)
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Pending')
+    attempts = models.PositiveIntegerField(default=0)
+    handled = models.JSONField(default=list, blank=True, help_text="Handlers that already succeeded")
+    last_error = models.TextField(blank=True)
+    available_at = models.DateTimeField(default=timezone.now)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'id'], name='outbox_status_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
@@ -0,0 +1,8 @@
+"""Outbox queries checked by `manage.py check_query_plans`."""
+from utils.query_plans import hot_query
+from .models import OutboxEvent
+
+
+@hot_query('events.dispatch_batch')
+def dispatch_batch():
+    return OutboxEvent.objects.filter(status__in=['Pending', 'Processing']).order_by('id')[:100]
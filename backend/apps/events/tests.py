@@ -0,0 +1,90 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from . import bus
+from .models import OutboxEvent
+
+
+@override_settings(EVENTS_DISPATCH_IN_PROCESS=False, EVENTS_MAX_ATTEMPTS=3)
+class OutboxDispatchTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.failing = set()  # payload ids whose handler raises
+        handlers = mock.patch.dict(bus._handlers, {'test.event': [self.record, self.flaky]}, clear=True)
+        handlers.start()
+        self.addCleanup(handlers.stop)
+        self.now = timezone.now() + timedelta(minutes=1)  # events are stamped with the real clock
+        clock = mock.patch('apps.events.bus.timezone.now', side_effect=lambda: self.now)
+        clock.start()
+        self.addCleanup(clock.stop)
+
+    def record(self, payload):
+        self.calls.append(('record', payload['id']))
+
+    def flaky(self, payload):
+        if payload['id'] in self.failing:
+            raise RuntimeError('down')
+        self.calls.append(('flaky', payload['id']))
+
+    def publish(self, id, key):
+        return bus.publish('test.event', {'id': id}, key=key)
+
+    def flaky_calls(self):
+        return [id for handler, id in self.calls if handler == 'flaky']
+
+    def test_events_with_the_same_key_wait_for_a_failed_one(self):
+        first = self.publish(1, 'order:1')
+        self.publish(2, 'order:1')
+        self.publish(3, 'order:2')
+        self.failing.add(1)
+
+        self.assertEqual(bus.dispatch_pending(), 1)
+        self.assertEqual(self.flaky_calls(), [3])  # 2 is held back behind 1
+
+        self.failing.clear()
+        self.now += bus._backoff(1)
+        self.assertEqual(bus.dispatch_pending(), 2)
+        self.assertEqual(self.flaky_calls(), [3, 1, 2])
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.attempts), ('Done', 2))
+
+    def test_failed_event_backs_off_and_skips_handlers_that_succeeded(self):
+        event = self.publish(1, 'order:1')
+        self.failing.add(1)
+        bus.dispatch_pending()
+
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('Pending', 1))
+        self.assertEqual(event.available_at, self.now + timedelta(seconds=2))
+        self.assertIn('RuntimeError', event.last_error)
+
+        self.now += timedelta(seconds=1)
+        self.assertEqual(bus.dispatch_pending(), 0)  # still backing off
+
+        self.failing.clear()
+        self.now += timedelta(seconds=1)
+        self.assertEqual(bus.dispatch_pending(), 1)
+        self.assertEqual(self.calls, [('record', 1), ('flaky', 1)])  # record ran once
+
+    def test_event_fails_after_max_attempts(self):
+        event = self.publish(1, '')
+        self.failing.add(1)
+        for attempt in range(1, 4):
+            bus.dispatch_pending()
+            self.now += bus._backoff(attempt)
+
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('Failed', 3))
+        self.assertEqual(bus.dispatch_pending(), 0)
+
+    def test_expired_claim_is_retried(self):
+        event = self.publish(1, '')
+        OutboxEvent.objects.filter(pk=event.pk).update(
+            status='Processing', attempts=1, claimed_until=self.now - timedelta(seconds=1)
+        )
+        self.assertEqual(bus.dispatch_pending(), 1)
+        event.refresh_from_db()
+        self.assertEqual((event.status, event.attempts), ('Done', 2))
@@ -1,4 +1,5 @@
 from django.contrib import admin
+from utils.admin import LargeTableAdmin
 from .models import Order, OrderItem
 
 class OrderItemInline(admin.TabularInline):
@@ -6,9 +7,32 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['product', 'price', 'quantity']
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('product')
+
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin):
     list_display = ['id', 'user', 'email', 'total_price', 'status', 'created_at']
     list_filter = ['status', 'created_at']
-    search_fields = ['email', 'id', 'full_name']
+    list_select_related = ['user']
+    # Order numbers are also matched exactly by LargeTableAdmin.
+    search_fields = ['email', 'full_name']
+    date_hierarchy = 'created_at'
+    autocomplete_fields = ['user']
+    readonly_fields = ['delivered_at']
     inlines = [OrderItemInline]
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if change and 'status' in form.changed_data and obj.status == 'Cancelled':
+            from apps.store.coupons import release_coupons
+            release_coupons(obj.pk)
+
+from .models import PaymentTransaction
+
+@admin.register(PaymentTransaction)
+class PaymentTransactionAdmin(LargeTableAdmin):
+    list_display = ['tran_id', 'order', 'amount', 'status', 'created_at']
+    list_filter = ['status']
+    search_fields = ['=tran_id']
+    readonly_fields = ['order', 'tran_id', 'amount', 'currency', 'val_id', 'payload', 'created_at', 'updated_at']
@@ -0,0 +1,121 @@
+import csv
+import json
+from datetime import datetime, time
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Order
+
+# One row per order line. Orders without items still produce a single row so
+# shipping-only or cancelled orders are not lost from the ledger.
+EXPORT_COLUMNS = [
+    'order_id', 'created_at', 'status', 'is_paid', 'payment_method',
+    'user_email', 'full_name', 'email', 'phone', 'city', 'country',
+    'coupon_code', 'shipping_price', 'discount_amount', 'total_price',
+    'item_product_id', 'item_product_name', 'item_size', 'item_color',
+    'item_quantity', 'item_price', 'item_line_total',
+]
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/x-ndjson',
+}
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+def _parse_bound(value, end_of_day=False):
+    """Accepts either a date (YYYY-MM-DD) or a full ISO datetime."""
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_queryset(date_from=None, date_to=None, status=None, is_paid=None):
+    queryset = Order.objects.select_related('user').prefetch_related('items__product')
+
+    start = _parse_bound(date_from)
+    end = _parse_bound(date_to, end_of_day=True)
+    if start:
+        queryset = queryset.filter(created_at__gte=start)
+    if end:
+        queryset = queryset.filter(created_at__lte=end)
+    if status:
+        queryset = queryset.filter(status__in=[s.strip() for s in status.split(',') if s.strip()])
+    if is_paid is not None:
+        queryset = queryset.filter(is_paid=is_paid)
+
+    return queryset.order_by('id')
+
+
+def iter_rows(queryset, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield export rows while holding at most one chunk of orders in memory."""
+    for order in queryset.iterator(chunk_size=chunk_size):
+        base = {
+            'order_id': order.id,
+            'created_at': order.created_at.isoformat(),
+            'status': order.status,
+            'is_paid': order.is_paid,
+            'payment_method': order.payment_method or '',
+            'user_email': order.user.email if order.user else '',
+            'full_name': order.full_name,
+            'email': order.email,
+            'phone': order.phone,
+            'city': order.city,
+            'country': order.country,
+            'coupon_code': order.coupon_code or '',
+            'shipping_price': str(order.shipping_price),
+            'discount_amount': str(order.discount_amount),
+            'total_price': str(order.total_price),
+        }
+        items = order.items.all()
+        if not items:
+            yield {**base, **{column: '' for column in EXPORT_COLUMNS if column.startswith('item_')}}
+            continue
+        for item in items:
+            yield {
+                **base,
+                'item_product_id': item.product_id or '',
+                'item_product_name': item.product.name if item.product else '',
+                'item_size': item.size or '',
+                'item_color': item.color or '',
+                'item_quantity': item.quantity,
+                'item_price': str(item.price),
+                'item_line_total': str(item.price * item.quantity),
+            }
+
+
+class _LineBuffer:
+    """File-like object that hands back whatever csv.writer just wrote."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(rows):
+    writer = csv.DictWriter(_LineBuffer(), fieldnames=EXPORT_COLUMNS)
+    yield writer.writeheader()
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_jsonl(rows):
+    for row in rows:
+        yield json.dumps(row) + '\n'
+
+
+def iter_export(fmt, rows):
+    if fmt == 'csv':
+        return iter_csv(rows)
+    if fmt == 'jsonl':
+        return iter_jsonl(rows)
+    raise ValueError(f"Unsupported export format: {fmt}")
@@ -0,0 +1,25 @@
+from apps.events.bus import ORDER_PLACED, ORDER_STATUS_CHANGED, RETURN_STATUS_CHANGED, subscribe
+from utils.email_service import EmailService
+from .models import Order, ReturnRequest
+
+
+@subscribe(ORDER_PLACED)
+def send_order_confirmation(payload):
+    order = Order.objects.get(pk=payload['order_id'])
+    if order.user_id is None:
+        return  # guest checkouts have never been sent a confirmation
+    EmailService.send_order_confirmation(order, background=False)
+
+
+@subscribe(ORDER_STATUS_CHANGED)
+def send_order_status_update(payload):
+    order = Order.objects.get(pk=payload['order_id'])
+    if order.status != payload['status']:
+        return  # superseded by a later change, which has its own event
+    EmailService.send_order_status_update(order, background=False)
+
+
+@subscribe(RETURN_STATUS_CHANGED)
+def send_return_status_update(payload):
+    return_request = ReturnRequest.objects.select_related('user', 'order').get(pk=payload['return_id'])
+    EmailService.send_return_status_update(return_request, background=False)
@@ -0,0 +1,39 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.orders.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, export_queryset, iter_export, iter_rows
+
+
+class Command(BaseCommand):
+    help = "Stream orders and their line items to CSV or JSONL for accounting."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', '-o', help="File to write to (defaults to stdout).")
+        parser.add_argument('--format', dest='fmt', choices=list(EXPORT_FORMATS), default='csv')
+        parser.add_argument('--date-from', help="Only orders created on/after this date (YYYY-MM-DD or ISO datetime).")
+        parser.add_argument('--date-to', help="Only orders created on/before this date.")
+        parser.add_argument('--status', help="Comma separated order statuses, e.g. Delivered,Shipped.")
+        parser.add_argument('--paid-only', action='store_true')
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            queryset = export_queryset(
+                date_from=options['date_from'],
+                date_to=options['date_to'],
+                status=options['status'],
+                is_paid=True if options['paid_only'] else None,
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        chunks = iter_export(options['fmt'], iter_rows(queryset, chunk_size=options['chunk_size']))
+        if options['output']:
+            with open(options['output'], 'w', newline='', encoding='utf-8') as fh:
+                for chunk in chunks:
+                    fh.write(chunk)
+            self.stdout.write(self.style.SUCCESS(f"Exported orders to {options['output']}"))
+        else:
+            for chunk in chunks:
+                sys.stdout.write(chunk)
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.models import PaymentTransaction
+from apps.orders.payments import validate_transaction
+
+
+class Command(BaseCommand):
+    help = "Retry gateway validation for callbacks that were received but never settled."
+
+    def handle(self, *args, **options):
+        pending = PaymentTransaction.objects.filter(status='Received').values_list('tran_id', flat=True)
+        count = 0
+        for tran_id in pending.iterator():
+            try:
+                validate_transaction(tran_id)
+                count += 1
+            except Exception as e:
+                self.stderr.write(f"{tran_id}: {e}")
+        self.stdout.write(self.style.SUCCESS(f"Validated {count} transaction(s)."))
@@ -0,0 +1,29 @@
+# Generated by Django 6.0 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0005_returnrequest'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PaymentTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tran_id', models.CharField(max_length=64, unique=True)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('currency', models.CharField(default='BDT', max_length=10)),
+                ('status', models.CharField(choices=[('Initiated', 'Initiated'), ('Received', 'Received'), ('Validated', 'Validated'), ('Failed', 'Failed'), ('Cancelled', 'Cancelled')], default='Initiated', max_length=20)),
+                ('val_id', models.CharField(blank=True, max_length=100, null=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='orders.order')),
+            ],
+        ),
+    ]
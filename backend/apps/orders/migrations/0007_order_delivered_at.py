@@ -0,0 +1,36 @@
+# Generated by Django 6.0 on 2026-10-19 13:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_delivered_at(apps, schema_editor):
+    # updated_at is the best record there is of when existing orders were
+    # delivered; it is what the return window used before this field.
+    Order = apps.get_model('orders', 'Order')
+    Order.objects.filter(status='Delivered', delivered_at__isnull=True).update(delivered_at=models.F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0006_paymenttransaction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='delivered_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_delivered_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['user', 'status', 'delivered_at'], name='order_user_delivered_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='returnrequest',
+            index=models.Index(fields=['status', '-created_at'], name='return_status_created_idx'),
+        ),
+    ]
@@ -1,7 +1,18 @@
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 from apps.store.models import Product
 
+class OrderQuerySet(models.QuerySet):
+    def returnable(self, window_days):
+        """Delivered orders still inside the return window (order_user_delivered_idx).
+
+        Open while at most `window_days` whole days have passed since delivery.
+        """
+        return self.filter(status='Delivered', delivered_at__gt=timezone.now() - timedelta(days=window_days + 1))
+
 class Order(models.Model):
     STATUS_CHOICES = (
         ('Pending', 'Pending'),
@@ -32,10 +43,55 @@ class Order(models.Model):
     is_paid = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set on the transition to Delivered; starts the return window.
+    delivered_at = models.DateTimeField(null=True, blank=True)
+
+    objects = OrderQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'status', 'delivered_at'], name='order_user_delivered_idx'),
+            models.Index(fields=['user', '-created_at'], name='order_user_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='order_status_created_idx'),
+            # Admin date hierarchy and date filters.
+            models.Index(fields=['created_at'], name='order_created_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if self.status != 'Delivered':
+            self.delivered_at = None
+        elif self.delivered_at is None:
+            self.delivered_at = timezone.now()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'status' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'delivered_at'}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Order {self.id}"
 
+class PaymentTransaction(models.Model):
+    STATUS_CHOICES = (
+        ('Initiated', 'Initiated'),
+        ('Received', 'Received'),
+        ('Validated', 'Validated'),
+        ('Failed', 'Failed'),
+        ('Cancelled', 'Cancelled'),
+    )
+
+    order = models.ForeignKey(Order, related_name='transactions', on_delete=models.CASCADE)
+    tran_id = models.CharField(max_length=64, unique=True)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=10, default='BDT')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='Initiated')
+    val_id = models.CharField(max_length=100, blank=True, null=True)
+    payload = models.JSONField(default=dict, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.tran_id} ({self.status})"
+
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, related_name='items', on_delete=models.CASCADE)
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
@@ -59,6 +115,12 @@ class ReturnRequest(models.Model):
     admin_note = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', '-created_at'], name='return_status_created_idx'),
+            models.Index(fields=['user', '-created_at'], name='return_user_created_idx'),
+        ]
+
     def __str__(self):
         return f"Return #{self.id} - Order #{self.order.id}"
 
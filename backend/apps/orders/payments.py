@@ -0,0 +1,184 @@
+import uuid
+from decimal import Decimal, InvalidOperation
+from threading import Thread
+
+from django.conf import settings
+from django.db import IntegrityError, connections
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Order, PaymentTransaction
+
+GATEWAY_HOST = 'https://sandbox.sslcommerz.com' if settings.SSL_IS_SANDBOX else 'https://securepay.sslcommerz.com'
+SESSION_URL = f"{GATEWAY_HOST}/gwprocess/v4/api.php"
+VALIDATION_URL = f"{GATEWAY_HOST}/validator/api/validationserverAPI.php"
+VALID_STATUSES = ('VALID', 'VALIDATED')
+# Ledger statuses of a callback we have accepted.
+ACCEPTED_STATUSES = ('Received', 'Validated')
+
+
+def new_tran_id(order):
+    return f"txn_{order.id}_{uuid.uuid4().hex[:6]}"
+
+
+def start_session(order, post_body):
+    """Store the transaction in the ledger and open a gateway session."""
+    PaymentTransaction.objects.create(
+        order=order,
+        tran_id=post_body['tran_id'],
+        amount=order.total_price,
+        currency=post_body['currency'],
+    )
+    import requests  # only payment calls need the HTTP client; keeps worker start-up light
+    try:
+        response = requests.post(SESSION_URL, data=post_body, timeout=30)
+        return response.json()
+    except Exception:
+        close_transaction(post_body['tran_id'], 'Failed')
+        raise
+
+
+def _order_id_from_tran_id(tran_id):
+    # Legacy format txn_{order_id}_{suffix}; only used for callbacks whose
+    # session predates the ledger.
+    try:
+        return int(tran_id.split('_')[1])
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def record_callback(payload):
+    """Record a success/IPN callback; returns True if its val_id needs validating.
+
+    That is the first delivery of a tran_id, and also a later one carrying a
+    different val_id while the transaction is still unsettled: callbacks are
+    unauthenticated, so the first val_id may be forged, and the real one must
+    not be dropped as a retry. Plain retries and unknown transactions return
+    False. The common path is a single conditional UPDATE on the unique
+    tran_id index; no rows are read.
+    """
+    tran_id = payload.get('tran_id')
+    if not tran_id:
+        return False
+    val_id = payload.get('val_id')
+
+    received = PaymentTransaction.objects.filter(tran_id=tran_id, status='Initiated').update(
+        status='Received',
+        val_id=val_id,
+        payload=dict(payload.items()),
+        updated_at=timezone.now(),
+    )
+    if received:
+        return True
+    if val_id and PaymentTransaction.objects.filter(tran_id=tran_id, status='Received').exclude(val_id=val_id).exists():
+        # Another val_id for an unsettled transaction: validate it as well,
+        # without replacing the stored one.
+        return True
+
+    order_id = _order_id_from_tran_id(tran_id)
+    # The amount the gateway must confirm comes from the order, never from
+    # the (unauthenticated) callback.
+    total_price = Order.objects.filter(pk=order_id).values_list('total_price', flat=True).first() if order_id else None
+    if total_price is None:
+        return False
+    try:
+        PaymentTransaction.objects.create(
+            order_id=order_id,
+            tran_id=tran_id,
+            amount=total_price,
+            status='Received',
+            val_id=payload.get('val_id'),
+            payload=dict(payload.items()),
+        )
+    except IntegrityError:
+        return False  # already recorded by a concurrent or earlier callback
+    return True
+
+
+def is_accepted(tran_id):
+    """Whether the ledger holds an accepted (received or validated) transaction."""
+    return bool(tran_id) and PaymentTransaction.objects.filter(tran_id=tran_id, status__in=ACCEPTED_STATUSES).exists()
+
+
+def _amount(value):
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, TypeError):
+        return None
+
+
+def close_transaction(tran_id, status):
+    """Mark a still-open transaction as Failed/Cancelled and give back its order's coupons."""
+    if not tran_id:
+        return
+    closed = PaymentTransaction.objects.filter(tran_id=tran_id, status='Initiated').update(
+        status=status, updated_at=timezone.now()
+    )
+    if closed:
+        order_id = PaymentTransaction.objects.filter(tran_id=tran_id).values_list('order_id', flat=True).first()
+        if not Order.objects.filter(pk=order_id, is_paid=True).exists():
+            from apps.store.coupons import release_coupons
+            release_coupons(order_id)
+
+
+def mark_order_paid(order_id):
+    """Conditional update so replays never touch an already-paid order."""
+    return Order.objects.filter(pk=order_id, is_paid=False).update(
+        is_paid=True,
+        payment_method='SSLCommerz',
+        status=Case(When(status='Pending', then=Value('Processing')), default=F('status')),
+        updated_at=timezone.now(),
+    )
+
+
+def validate_transaction(tran_id, val_id=None):
+    """Confirm a received transaction with the gateway and settle the order.
+
+    `val_id` defaults to the one stored with the transaction. A val_id the
+    gateway rejects is never final: if it was the stored one, the transaction
+    goes back to Initiated so the genuine callback can still be recorded.
+    """
+    try:
+        transaction = PaymentTransaction.objects.get(tran_id=tran_id, status='Received')
+    except PaymentTransaction.DoesNotExist:
+        return
+    val_id = val_id or transaction.val_id
+
+    import requests
+    response = requests.get(VALIDATION_URL, params={
+        'val_id': val_id,
+        'store_id': settings.SSL_STORE_ID,
+        'store_passwd': settings.SSL_STORE_PASSWORD,
+        'format': 'json',
+    }, timeout=30)
+    data = response.json()
+
+    is_valid = (
+        data.get('status') in VALID_STATUSES
+        and data.get('tran_id') == tran_id
+        and _amount(data.get('amount')) == transaction.amount
+    )
+    if is_valid:
+        PaymentTransaction.objects.filter(pk=transaction.pk, status='Received').update(
+            status='Validated', val_id=val_id, updated_at=timezone.now(),
+        )
+        mark_order_paid(transaction.order_id)
+    else:
+        PaymentTransaction.objects.filter(pk=transaction.pk, status='Received', val_id=val_id).update(
+            status='Initiated', val_id=None, updated_at=timezone.now(),
+        )
+
+
+def _validate_async(tran_id, val_id):
+    try:
+        validate_transaction(tran_id, val_id)
+    except Exception as e:
+        # Stays 'Received'; `manage.py validate_payments` picks it up again.
+        print(f"Payment validation failed for {tran_id}: {e}")
+    finally:
+        connections.close_all()
+
+
+def validate_in_background(tran_id, val_id=None):
+    # Same pattern as EmailService: keep the gateway round-trip off the request.
+    Thread(target=_validate_async, args=(tran_id, val_id)).start()
@@ -0,0 +1,44 @@
+"""Hot order and return queries checked by `manage.py check_query_plans`."""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from utils.query_plans import hot_query
+from .models import Order, ReturnRequest
+
+
+@hot_query('orders.user_history')
+def user_history():
+    return Order.objects.filter(user_id=1).order_by('-created_at')
+
+
+@hot_query('orders.by_status')
+def by_status():
+    return Order.objects.filter(status='Pending').order_by('-created_at')
+
+
+@hot_query('orders.returnable')
+def returnable():
+    return Order.objects.filter(user_id=1).returnable(14)
+
+
+@hot_query('orders.verified_purchase')
+def verified_purchase():
+    return Order.objects.filter(user_id=1, items__product_id=1, status='Delivered')
+
+
+@hot_query('orders.return_queue')
+def return_queue():
+    return ReturnRequest.objects.select_related('order', 'user').filter(status='Pending').order_by('-created_at')[:25]
+
+
+@hot_query('orders.user_returns')
+def user_returns():
+    return ReturnRequest.objects.filter(user_id=1).order_by('-created_at')
+
+
+@hot_query('orders.admin_by_date')
+def admin_by_date():
+    # Admin date hierarchy drilled down to one day.
+    day = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    return Order.objects.filter(created_at__gte=day, created_at__lt=day + timedelta(days=1)).order_by('-created_at')[:100]
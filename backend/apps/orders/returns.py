@@ -0,0 +1,51 @@
+"""Deciding return requests, one at a time or in bulk.
+
+Only Pending requests change, so re-submitting a decision is a no-op.
+Approving restocks every item of the returned orders with one batched
+UPDATE (see store.inventory.release_many) and one RETURN movement per
+order and product. The customer emails are queued
+as outbox events in a single INSERT and sent after commit.
+"""
+from django.db import transaction
+from django.db.models import Sum
+
+from apps.events.bus import RETURN_STATUS_CHANGED, publish_many
+from apps.store.inventory import release_many
+from .models import OrderItem, ReturnRequest
+
+DECISIONS = ('Approved', 'Rejected')
+
+
+def restock_orders(order_ids):
+    rows = (
+        OrderItem.objects
+        .filter(order_id__in=order_ids, product__isnull=False)
+        .values('order_id', 'product_id')
+        .annotate(quantity=Sum('quantity'))
+        .order_by()
+    )
+    release_many([(row['product_id'], row['quantity'], f"order:{row['order_id']}") for row in rows])
+
+
+@transaction.atomic
+def decide_returns(return_ids, status, admin_note=None):
+    """Approve or reject the Pending requests among `return_ids`; returns the ids changed."""
+    if status not in DECISIONS:
+        raise ValueError(f"status must be one of {', '.join(DECISIONS)}")
+    pending = ReturnRequest.objects.select_for_update().filter(pk__in=return_ids, status='Pending')
+    rows = list(pending.values_list('id', 'order_id'))
+    if not rows:
+        return []
+    ids = [return_id for return_id, _ in rows]
+    update = {'status': status}
+    if admin_note is not None:
+        update['admin_note'] = admin_note
+    ReturnRequest.objects.filter(pk__in=ids).update(**update)
+
+    if status == 'Approved':
+        restock_orders({order_id for _, order_id in rows})
+    publish_many(RETURN_STATUS_CHANGED, [
+        ({'return_id': return_id, 'status': status, 'previous_status': 'Pending'}, f"return:{return_id}")
+        for return_id in ids
+    ])
+    return ids
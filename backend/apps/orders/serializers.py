@@ -1,8 +1,12 @@
+from django.db import transaction
 from rest_framework import serializers
+from utils.sparse_fields import SparseFieldsetMixin
 from .models import Order, OrderItem
 from apps.store.models import Product
+from apps.store.coupons import CouponError, redeem_coupon
+from apps.store.inventory import InsufficientStock, reserve_many
 
-class OrderItemSerializer(serializers.ModelSerializer):
+class OrderItemSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     product_slug = serializers.CharField(write_only=True)
     product_name = serializers.CharField(source='product.name', read_only=True)
     product_image = serializers.SerializerMethodField()
@@ -10,6 +14,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
     class Meta:
         model = OrderItem
         fields = ['product_slug', 'product_name', 'product_image', 'price', 'quantity', 'size', 'color']
+        relation_hints = {'product_image': 'product.image'}
 
     def get_product_image(self, obj):
         if obj.product and obj.product.image:
@@ -19,7 +24,7 @@ class OrderItemSerializer(serializers.ModelSerializer):
             return obj.product.image.url
         return None
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     items = OrderItemSerializer(many=True)
     
     class Meta:
@@ -29,9 +34,10 @@ class OrderSerializer(serializers.ModelSerializer):
             'address_line_1', 'address_line_2', 'city', 'state', 
             'postal_code', 'country', 'items', 'total_price', 
             'shipping_price', 'discount_amount', 'coupon_code',
-            'status', 'payment_method', 'is_paid', 'created_at'
+            'status', 'payment_method', 'is_paid', 'created_at', 'delivered_at'
         ]
-        read_only_fields = ['user']
+        read_only_fields = ['user', 'delivered_at']
+        expandable_fields = ['items']
 
     def create(self, validated_data):
         items_data = validated_data.pop('items')
@@ -46,54 +52,90 @@ class OrderSerializer(serializers.ModelSerializer):
                 raise serializers.ValidationError(f"Product with slug '{product_slug}' does not exist.")
             
             quantity = item_data['quantity']
-            if product.stock < quantity:
+            if not product.sharded_stock and product.stock < quantity:
                 raise serializers.ValidationError(f"Insufficient stock for '{product.name}'. Available: {product.stock}, Requested: {quantity}")
             
             order_items_to_create.append({
                 'product': product,
                 'quantity': quantity,
-                'price': product.price, # Take current price
+                'price': product.effective_price, # Current price, sales included
                 'size': item_data.get('size'),
                 'color': item_data.get('color')
             })
 
         # 2. Create the Order
         shipping_price = validated_data.get('shipping_price', 0)
-        discount_amount = validated_data.get('discount_amount', 0)
-        order = Order.objects.create(**validated_data)
-        
-        # 3. Process items and decrement stock
-        total_items_price = 0
-        for item in order_items_to_create:
-            product = item['product']
-            quantity = item['quantity']
-            price = item['price']
-            
-            # Create OrderItem
-            OrderItem.objects.create(
-                order=order, 
-                product=product, 
-                price=price, 
-                quantity=quantity,
-                size=item.get('size'),
-                color=item.get('color')
-            )
-            
-            # Decrement Stock
-            product.stock -= quantity
-            product.save()
-            
-            total_items_price += price * quantity
-        
-        # 4. Finalize order totals
-        order.total_price = total_items_price + shipping_price - discount_amount
-        order.save()
+        coupon_code = validated_data.get('coupon_code')
+        validated_data['discount_amount'] = 0
+        with transaction.atomic():
+            order = Order.objects.create(**validated_data)
+
+            # 3. Reserve stock and record the sales in the ledger. The check
+            # above is only a fast path; the conditional update here is what
+            # prevents overselling.
+            try:
+                reserve_many(
+                    [(item['product'], item['quantity']) for item in order_items_to_create],
+                    reference=f"order:{order.id}",
+                )
+            except InsufficientStock as e:
+                raise serializers.ValidationError(str(e))
+
+            total_items_price = 0
+            for item in order_items_to_create:
+                product = item['product']
+                quantity = item['quantity']
+                price = item['price']
+
+                # Create OrderItem
+                OrderItem.objects.create(
+                    order=order, 
+                    product=product, 
+                    price=price, 
+                    quantity=quantity,
+                    size=item.get('size'),
+                    color=item.get('color')
+                )
+
+                total_items_price += price * quantity
+
+            # 4. Redeem the coupon, if any. The discount is computed here rather
+            # than trusted from the client, and the caps are enforced atomically.
+            if coupon_code:
+                try:
+                    order.discount_amount = redeem_coupon(coupon_code, order, total_items_price)
+                except CouponError as e:
+                    raise serializers.ValidationError({'coupon_code': str(e)})
+
+            # 5. Finalize order totals
+            order.total_price = total_items_price + shipping_price - order.discount_amount
+            order.save()
         return order
 
 from .models import ReturnRequest
 
-class ReturnRequestSerializer(serializers.ModelSerializer):
+class ReturnRequestSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ReturnRequest
         fields = ['id', 'order', 'user', 'reason', 'image', 'status', 'admin_note', 'created_at']
         read_only_fields = ['user', 'created_at']
+
+    def get_fields(self):
+        fields = super().get_fields()
+        # Only staff decide returns; approving one restocks the order's items.
+        request = self.context.get('request')
+        if not (request and request.user.is_staff):
+            for name in ('status', 'admin_note'):
+                fields[name].read_only = True
+        return fields
+
+class ReturnQueueSerializer(serializers.ModelSerializer):
+    """Admin queue row; the view selects the order and user in the same query."""
+    user_email = serializers.EmailField(source='user.email', read_only=True)
+    order_total = serializers.DecimalField(source='order.total_price', max_digits=10, decimal_places=2, read_only=True)
+    delivered_at = serializers.DateTimeField(source='order.delivered_at', read_only=True)
+
+    class Meta:
+        model = ReturnRequest
+        fields = ['id', 'order', 'user', 'user_email', 'order_total', 'delivered_at',
+                  'reason', 'image', 'status', 'admin_note', 'created_at']
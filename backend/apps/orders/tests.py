@@ -1,3 +1,58 @@
+from decimal import Decimal
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from . import payments
+from .models import Order, PaymentTransaction
+
+
+def gateway_says(valid_val_ids, tran_id, amount):
+    """Stub for requests.get: VALID only for the given val_ids."""
+    def get(url, params, timeout):
+        response = mock.Mock()
+        status = 'VALID' if params['val_id'] in valid_val_ids else 'INVALID_TRANSACTION'
+        response.json.return_value = {'status': status, 'tran_id': tran_id, 'amount': str(amount)}
+        return response
+    return get
+
+
+class PaymentCallbackTests(TestCase):
+    def setUp(self):
+        self.order = Order.objects.create(
+            full_name='Customer', email='c@example.com', phone='1', address_line_1='Road 1',
+            city='Dhaka', state='Dhaka', postal_code='1200', country='BD', total_price=Decimal('150.00'),
+        )
+        self.tran_id = f"txn_{self.order.id}_abc123"
+        PaymentTransaction.objects.create(order=self.order, tran_id=self.tran_id, amount=self.order.total_price)
+
+    def callback(self, val_id):
+        return payments.record_callback({'tran_id': self.tran_id, 'val_id': val_id})
+
+    def validate(self, val_id):
+        with mock.patch('requests.get', gateway_says({'real'}, self.tran_id, '150.00')):
+            payments.validate_transaction(self.tran_id, val_id)
+
+    def status(self):
+        return PaymentTransaction.objects.get(tran_id=self.tran_id).status
+
+    def test_forged_val_id_first_does_not_block_the_real_callback(self):
+        self.assertTrue(self.callback('forged'))
+        self.assertTrue(self.callback('real'))  # not dropped as a retry
+        self.validate('real')
+        self.validate('forged')
+        self.assertEqual(self.status(), 'Validated')
+        self.order.refresh_from_db()
+        self.assertTrue(self.order.is_paid)
+
+    def test_rejected_val_id_reopens_the_transaction(self):
+        self.callback('forged')
+        self.validate('forged')
+        self.assertEqual(self.status(), 'Initiated')
+        self.assertTrue(self.callback('real'))
+        self.validate('real')
+        self.assertEqual(self.status(), 'Validated')
+
+    def test_retry_with_the_same_val_id_is_ignored(self):
+        self.assertTrue(self.callback('real'))
+        self.assertFalse(self.callback('real'))
@@ -1,8 +1,16 @@
 from rest_framework import viewsets, mixins, permissions
+from rest_framework.decorators import action
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from utils.sparse_fields import SparseFieldsetViewMixin
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from apps.events.bus import ORDER_PLACED, ORDER_STATUS_CHANGED, RETURN_STATUS_CHANGED, publish
 from .models import Order
 from .serializers import OrderSerializer
 
-class OrderViewSet(mixins.CreateModelMixin, 
+class OrderViewSet(SparseFieldsetViewMixin,
+                   mixins.CreateModelMixin, 
                    mixins.RetrieveModelMixin, 
                    mixins.ListModelMixin,
                    mixins.UpdateModelMixin,
@@ -22,95 +30,72 @@ class OrderViewSet(mixins.CreateModelMixin,
         if getattr(self, 'action', None) == 'list':
             return Order.objects.none()
         return Order.objects.all()
+
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def export(self, request):
+        # Streams line items for accounting without materialising the order history.
+        # `format` is reserved by DRF for renderer negotiation, hence `output`.
+        from rest_framework.exceptions import ValidationError
+        from .export import EXPORT_FORMATS, export_queryset, iter_export, iter_rows
+
+        fmt = request.query_params.get('output', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Choose one of: {', '.join(EXPORT_FORMATS)}."})
+
+        is_paid = request.query_params.get('is_paid')
+        try:
+            queryset = export_queryset(
+                date_from=request.query_params.get('date_from'),
+                date_to=request.query_params.get('date_to'),
+                status=request.query_params.get('status'),
+                is_paid=None if is_paid is None else is_paid.lower() in ('1', 'true', 'yes'),
+            )
+        except ValueError as e:
+            raise ValidationError({'detail': str(e)})
+
+        response = StreamingHttpResponse(iter_export(fmt, iter_rows(queryset)), content_type=EXPORT_FORMATS[fmt])
+        response['Content-Disposition'] = f'attachment; filename="orders.{fmt}"'
+        return response
     
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAuthenticated])
+    def returnable(self, request):
+        # Ids of the user's orders a return can still be requested for.
+        from apps.store.models import SiteSettings
+
+        window_days = SiteSettings.cached().return_window_days
+        ids = Order.objects.filter(user=request.user).returnable(window_days).values_list('id', flat=True)
+        return Response(list(ids))
+
     def perform_update(self, serializer):
-        instance = serializer.save()
-        
-        # Send Status Update Email if status changed (implied by this being a patch to status)
-        # In a real app we'd check if 'status' was in validated_data and diff it.
-        # Here we assume any update to this viewset might be a status update or we check explicitly.
-        if 'status' in serializer.validated_data:
-             from utils.email_service import EmailService
-             EmailService.send_order_status_update(instance)
+        previous_status = serializer.instance.status
+        with transaction.atomic():
+            order = serializer.save()
+            if order.status == 'Cancelled' and previous_status != 'Cancelled':
+                from apps.store.coupons import release_coupons
+                release_coupons(order.id)
+            if order.status != previous_status:
+                publish(ORDER_STATUS_CHANGED, {
+                    'order_id': order.id, 'status': order.status, 'previous_status': previous_status,
+                }, key=f"order:{order.id}")
 
     def perform_create(self, serializer):
-        if self.request.user.is_authenticated:
-            # Save the order first
-            order = serializer.save(user=self.request.user)
-            
-            # --- Smart Coupon Logic: Order Amount Trigger ---
-            try:
-                from django.utils import timezone
-                from apps.store.models import CouponRule, UserCouponHistory
-                from utils.email_service import EmailService
-
-                now = timezone.now()
-                # Find active order amount rules
-                order_rules = CouponRule.objects.filter(
-                    trigger_event='ORDER_OVER_AMOUNT',
-                    is_active=True,
-                    start_date__lte=now,
-                    end_date__gte=now,
-                    min_amount__lte=order.total_price # Check logic in DB query
-                )
-
-                for rule in order_rules:
-                    # Check if already sent (optional: allow multiple times for order rules? usually yes, but let's stick to history check for spam prevention or maybe allow once per day? 
-                    # For now, let's allow it if they haven't received THIS specific rule before. 
-                    # If we want recurring, we would need a more complex history check or a recurring flag.
-                    # Assuming "One-time reward per campaign" for now directly from UserCouponHistory logic.
-                    if not UserCouponHistory.objects.filter(user=self.request.user, rule=rule).exists():
-                         UserCouponHistory.objects.create(user=self.request.user, rule=rule)
-                         
-                         subject = f"Big Spender Reward: {rule.name}"
-                         message = f"Hi {order.full_name},\n\nThank you for your purchase of {order.total_price}! You've qualified for a special reward:\n\nCode: {rule.coupon.code}\nDiscount: {rule.coupon.discount_value} ({rule.coupon.discount_type})\n\nUse it on your next order!\nLuxStore Team"
-                         EmailService.send_email(subject, message, [order.email])
-            except Exception as e:
-                print(f"Coupon Rule Order Error: {e}")
-            # ------------------------------------------------
-
-            # Auto-save Address Logic
-            try:
-                from apps.accounts.models import Address
-                
-                # Check for existing duplicate address
-                address_exists = Address.objects.filter(
-                    user=self.request.user,
-                    street_address=order.address_line_1,
-                    city=order.city,
-                    postal_code=order.postal_code,
-                    country=order.country
-                ).exists()
-                
-                if not address_exists:
-                    # Check if user already has a default address
-                    has_default = Address.objects.filter(user=self.request.user, is_default=True).exists()
-                    
-                    Address.objects.create(
-                        user=self.request.user,
-                        street_address=order.address_line_1,
-                        city=order.city,
-                        state=order.state,
-                        postal_code=order.postal_code,
-                        country=order.country,
-                        is_default=not has_default # Set as default if no default exists
-                    )
-            except Exception as e:
-                # Log error but don't fail the order creation
-                pass
-        
-            # Send Order Confirmation Email
-            from utils.email_service import EmailService
-            EmailService.send_order_confirmation(order)
-            
-        else:
-            serializer.save()
+        # Coupon rewards, address book and confirmation email are event
+        # handlers (see each app's handlers.py), delivered after commit.
+        user = self.request.user if self.request.user.is_authenticated else None
+        with transaction.atomic():
+            order = serializer.save(user=user)
+            publish(ORDER_PLACED, {'order_id': order.id}, key=f"order:{order.id}")
 
 
 from .models import ReturnRequest
 from .serializers import ReturnRequestSerializer
 
-class ReturnRequestViewSet(viewsets.ModelViewSet):
+class ReturnQueuePagination(PageNumberPagination):
+    page_size = 25
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+class ReturnRequestViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     serializer_class = ReturnRequestSerializer
     permission_classes = [permissions.IsAuthenticated]
 
@@ -120,13 +105,55 @@ class ReturnRequestViewSet(viewsets.ModelViewSet):
             return ReturnRequest.objects.all().order_by('-created_at')
         return ReturnRequest.objects.filter(user=user).order_by('-created_at')
 
-        return ReturnRequest.objects.filter(user=user).order_by('-created_at')
+    @action(detail=False, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def queue(self, request):
+        from .serializers import ReturnQueueSerializer
+
+        queryset = ReturnRequest.objects.select_related('order', 'user').order_by('-created_at')
+        status = request.query_params.get('status')
+        if status:
+            queryset = queryset.filter(status=status)
+        paginator = ReturnQueuePagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(
+            ReturnQueueSerializer(page, many=True, context=self.get_serializer_context()).data
+        )
+
+    @action(detail=False, methods=['post'], permission_classes=[permissions.IsAdminUser])
+    def bulk(self, request):
+        from .returns import DECISIONS, decide_returns
+
+        ids = request.data.get('ids')
+        status = request.data.get('status')
+        if not isinstance(ids, list) or not all(isinstance(i, int) for i in ids):
+            return Response({'error': 'ids must be a list of return request ids.'}, status=400)
+        if status not in DECISIONS:
+            return Response({'error': f"status must be one of {', '.join(DECISIONS)}."}, status=400)
+        updated = decide_returns(ids, status, request.data.get('admin_note'))
+        return Response({'updated': updated, 'skipped': sorted(set(ids) - set(updated))})
 
     def perform_update(self, serializer):
-        instance = serializer.save()
-        if 'status' in serializer.validated_data:
-            from utils.email_service import EmailService
-            EmailService.send_return_status_update(instance)
+        from .returns import DECISIONS, decide_returns
+
+        status = serializer.validated_data.pop('status', None)
+        with transaction.atomic():
+            # Lock first, so a concurrent returns/bulk/ decision is seen (and
+            # not overwritten by the save below) and the order is restocked once.
+            previous_status = ReturnRequest.objects.select_for_update().values_list('status', flat=True).get(
+                pk=serializer.instance.pk
+            )
+            serializer.instance.status = previous_status
+            return_request = serializer.save()
+            if status is None or status == previous_status:
+                return
+            if previous_status == 'Pending' and status in DECISIONS:
+                decide_returns([return_request.pk], status)
+            else:
+                ReturnRequest.objects.filter(pk=return_request.pk).update(status=status)
+                publish(RETURN_STATUS_CHANGED, {
+                    'return_id': return_request.id, 'status': status, 'previous_status': previous_status,
+                }, key=f"return:{return_request.id}")
+            return_request.status = status
 
     def perform_create(self, serializer):
         from django.utils import timezone
@@ -143,31 +170,31 @@ class ReturnRequestViewSet(viewsets.ModelViewSet):
         if order.status != 'Delivered':
              raise ValidationError("Order must be delivered before requesting a return.")
 
-        # Check return window
-        settings = SiteSettings.load()
-        window_days = settings.return_window_days
-        
-        # specific logic: assuming order.updated_at is delivery time if status is Delivered, 
-        # or we might need a specific 'delivered_at' field. For now using updated_at as proxy for status change.
-        # Ideally we should have a delivered_at field. Let's stick to updated_at for now.
-        delta = timezone.now() - order.updated_at
+        # Check return window, counted from delivery (Order.returnable is the
+        # same rule as a query).
+        window_days = SiteSettings.cached().return_window_days
+        delta = timezone.now() - order.delivered_at
         if delta.days > window_days:
             raise ValidationError(f"Return period of {window_days} days has expired.")
 
         serializer.save(user=self.request.user)
 # --- SSLCommerz Payment Views ---
 
-import uuid
-import requests
 from django.conf import settings
 from django.shortcuts import redirect
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
+from utils.throttling import SlidingWindowThrottle
+from . import payments
+
+class PaymentInitThrottle(SlidingWindowThrottle):
+    scope = 'payment_init'
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+@throttle_classes([PaymentInitThrottle])
 def init_payment(request):
     order_id = request.data.get('order_id')
     try:
@@ -183,10 +210,11 @@ def init_payment(request):
         'store_passwd': settings.SSL_STORE_PASSWORD,
         'total_amount': str(order.total_price),
         'currency': 'BDT',
-        'tran_id': f"txn_{order.id}_{uuid.uuid4().hex[:6]}",
+        'tran_id': payments.new_tran_id(order),
         'success_url': f"{base_url}/api/payment/success/",
         'fail_url': f"{base_url}/api/payment/fail/",
         'cancel_url': f"{base_url}/api/payment/cancel/",
+        'ipn_url': f"{base_url}/api/payment/ipn/",
         'emi_option': 0,
         'cus_name': order.full_name,
         'cus_email': order.email,
@@ -200,15 +228,13 @@ def init_payment(request):
         'product_profile': 'general',
     }
 
-    url = 'https://sandbox.sslcommerz.com/gwprocess/v4/api.php' if settings.SSL_IS_SANDBOX else 'https://securepay.sslcommerz.com/gwprocess/v4/api.php'
-
     try:
-        response = requests.post(url, data=post_body)
-        data = response.json()
+        data = payments.start_session(order, post_body)
         
         if data.get('status') == 'SUCCESS':
             return Response({'gateway_url': data.get('GatewayPageURL')})
         else:
+            payments.close_transaction(post_body['tran_id'], 'Failed')
             return Response({'error': 'Failed to initiate payment', 'details': data}, status=400)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
@@ -217,36 +243,37 @@ def init_payment(request):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def payment_success(request):
+    # Record the callback once and leave gateway validation (val_id lookup)
+    # and the order update to the background path; retries are a no-op.
     payload = request.POST
-    tran_id = payload.get('tran_id')
-    # val_id = payload.get('val_id') 
-    
-    # Ideally verify payment with val_id here calling SSLCommerz validation API
-    
-    # Extract Order ID from tran_id (assuming format txn_{order_id}_{uuid})
-    try:
-        parts = tran_id.split('_')
-        order_id = parts[1]
-        order = Order.objects.get(id=order_id)
-        order.is_paid = True
-        order.payment_method = 'SSLCommerz'
-        order.status = 'Processing' # Advance status
-        order.save()
-        
-        # Redirect to frontend success page
+    if payments.record_callback(payload):
+        payments.validate_in_background(payload.get('tran_id'), payload.get('val_id'))
         return redirect(f"{settings.FRONTEND_URL}/payment/status?status=success")
-    except Exception as e:
-        # Log error in production
-        return redirect(f"{settings.FRONTEND_URL}/payment/status?status=error")
+    if payments.is_accepted(payload.get('tran_id')):
+        # Duplicate submit of a callback we have already accepted.
+        return redirect(f"{settings.FRONTEND_URL}/payment/status?status=success")
+    return redirect(f"{settings.FRONTEND_URL}/payment/status?status=error")
+
+@csrf_exempt
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def payment_ipn(request):
+    # Server-to-server notification; the gateway retries until it gets a 200.
+    payload = request.POST
+    if payments.record_callback(payload):
+        payments.validate_in_background(payload.get('tran_id'), payload.get('val_id'))
+    return Response({'status': 'received'})
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def payment_fail(request):
+    payments.close_transaction(request.POST.get('tran_id'), 'Failed')
     return redirect(f"{settings.FRONTEND_URL}/payment/status?status=fail")
 
 @csrf_exempt
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def payment_cancel(request):
+    payments.close_transaction(request.POST.get('tran_id'), 'Cancelled')
     return redirect(f"{settings.FRONTEND_URL}/payment/status?status=cancel")
@@ -1,23 +1,81 @@
 from django.contrib import admin
+from utils.admin import LargeTableAdmin
 from .models import Category, SubCategory, Product
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'slug']
+    search_fields = ['name']
     prepopulated_fields = {'slug': ('name',)}
 
 @admin.register(SubCategory)
 class SubCategoryAdmin(admin.ModelAdmin):
     list_display = ['name', 'category', 'slug']
     list_filter = ['category']
+    search_fields = ['name', 'category__name']
+    ordering = ['category__name', 'name']
     prepopulated_fields = {'slug': ('name',)}
 
+    def get_queryset(self, request):
+        # SubCategory.__str__ reads the category; this also serves autocomplete.
+        return super().get_queryset(request).select_related('category')
+
+class SubCategoryListFilter(admin.RelatedFieldListFilter):
+    def field_choices(self, field, request, model_admin):
+        subcategories = SubCategory.objects.select_related('category').order_by('category__name', 'name')
+        return [(sub.pk, str(sub)) for sub in subcategories]
+
+from .models import StockShard
+
+class StockShardInline(admin.TabularInline):
+    model = StockShard
+    extra = 0
+    readonly_fields = ['shard', 'quantity']
+    can_delete = False
+
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ['name', 'price', 'stock', 'category', 'subcategory', 'is_available']
-    list_filter = ['is_available', 'category', 'subcategory']
+class ProductAdmin(LargeTableAdmin):
+    list_display = ['name', 'price', 'effective_price', 'stock', 'sharded_stock', 'category', 'subcategory', 'is_available']
+    list_filter = ['is_available', 'sharded_stock', 'category', ('subcategory', SubCategoryListFilter)]
+    list_select_related = ['category', 'subcategory__category']
     search_fields = ['name', 'description']
+    autocomplete_fields = ['category', 'subcategory']
     prepopulated_fields = {'slug': ('name',)}
+    readonly_fields = ['sharded_stock', 'effective_price']
+    inlines = [StockShardInline]
+    actions = ['shard_stock', 'merge_stock_shards']
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        # Product.save() only writes stock for new products; later edits go
+        # through the ledger.
+        if change and 'stock' in form.changed_data:
+            from .inventory import set_stock
+            set_stock(obj, form.cleaned_data['stock'], reference=f"admin:{request.user.pk}")
+
+    def get_inlines(self, request, obj):
+        return self.inlines if obj and obj.sharded_stock else []
+
+    def get_readonly_fields(self, request, obj=None):
+        # Sharded stock is edited through the API (inventory.set_stock), which
+        # spreads it over the shards.
+        if obj and obj.sharded_stock:
+            return [*self.readonly_fields, 'stock']
+        return self.readonly_fields
+
+    @admin.action(description="Shard stock (for flash sales)")
+    def shard_stock(self, request, queryset):
+        from .inventory import shard_stock
+        for product in queryset:
+            shard_stock(product)
+        self.message_user(request, f"Sharded stock for {len(queryset)} product(s).")
+
+    @admin.action(description="Merge stock shards back")
+    def merge_stock_shards(self, request, queryset):
+        from .inventory import merge_shards
+        for product in queryset.filter(sharded_stock=True):
+            merge_shards(product)
+        self.message_user(request, "Merged stock shards.")
 
 from .models import SiteSettings, ShippingLocation
 
@@ -30,3 +88,46 @@ class ShippingLocationAdmin(admin.ModelAdmin):
     list_display = ['name', 'charge', 'is_active']
     list_filter = ['is_active']
     search_fields = ['name']
+
+from .models import UploadSession
+
+@admin.register(UploadSession)
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ['filename', 'product', 'user', 'offset', 'size', 'status', 'updated_at']
+    list_filter = ['status']
+    list_select_related = ['product', 'user']
+    autocomplete_fields = ['product', 'user']
+    readonly_fields = ['offset', 'status']
+
+from .models import StockMovement
+
+@admin.register(StockMovement)
+class StockMovementAdmin(LargeTableAdmin):
+    """The ledger is append-only: movements are written by store.inventory."""
+    list_display = ['created_at', 'product', 'quantity', 'reason', 'reference']
+    list_filter = ['reason']
+    list_select_related = ['product']
+    search_fields = ['reference']
+    date_hierarchy = 'created_at'
+    raw_id_fields = ['product']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+from .models import PriceRule
+
+@admin.register(PriceRule)
+class PriceRuleAdmin(admin.ModelAdmin):
+    list_display = ['name', 'product', 'category', 'subcategory', 'discount_type', 'discount_value',
+                    'starts_at', 'ends_at', 'is_active', 'is_live']
+    list_filter = ['is_active', 'is_live', 'discount_type']
+    list_select_related = ['product', 'category', 'subcategory__category']
+    search_fields = ['name']
+    autocomplete_fields = ['product', 'category', 'subcategory']
+    readonly_fields = ['is_live']
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 class StoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.store'
+
+    def ready(self):
+        from . import handlers, signals
@@ -0,0 +1,97 @@
+"""Single-use coupon codes for CouponRule campaigns.
+
+`mint_codes(rule, count)` copies the rule's coupon into `count` single-use
+codes (max_uses=1) linked to the rule. Codes are 10 random characters from
+a 32-letter alphabet without look-alikes (0/O, 1/I), i.e. 50 bits, drawn
+from `secrets`. Each chunk is inserted with bulk_create(ignore_conflicts=True)
+against the unique `code` index and read back. Any code that collided with
+an existing one is simply missing from the read-back and replaced in the
+next pass, so no per-code existence check is needed.
+
+Rules with `unique_codes` set hand out these codes from their reward
+handlers: `claim_code` locks the lowest unclaimed code through the partial
+`coupon_campaign_unclaimed_idx` index with SKIP LOCKED, so concurrent
+claimers each take a different code in one step instead of racing for the
+same one.
+"""
+import csv
+import secrets
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Coupon
+
+ALPHABET = 'ABCDEFGHJKLMNPQRSTUVWXYZ23456789'
+CODE_LENGTH = 10
+DEFAULT_CHUNK_SIZE = 2000
+CSV_COLUMNS = ['code', 'claimed_by', 'claimed_at', 'used']
+
+
+class CampaignExhausted(Exception):
+    pass
+
+
+def generate_code(prefix=''):
+    # 32 divides 256, so masking a random byte keeps every letter equally likely.
+    return prefix + ''.join(ALPHABET[byte & 31] for byte in secrets.token_bytes(CODE_LENGTH))
+
+
+def mint_codes(rule, count, prefix='', chunk_size=DEFAULT_CHUNK_SIZE):
+    """Create `count` new codes for `rule`, yielding each code once it is stored."""
+    template = rule.coupon
+    remaining = count
+    while remaining > 0:
+        batch = {generate_code(prefix) for _ in range(min(chunk_size, remaining))}
+        with transaction.atomic():
+            Coupon.objects.bulk_create(
+                [
+                    Coupon(
+                        code=code, campaign=rule, max_uses=1,
+                        discount_type=template.discount_type, discount_value=template.discount_value,
+                        min_purchase=template.min_purchase, expiry_date=template.expiry_date,
+                    )
+                    for code in batch
+                ],
+                ignore_conflicts=True,
+            )
+            minted = list(Coupon.objects.filter(code__in=batch, campaign=rule).values_list('code', flat=True))
+        remaining -= len(minted)
+        yield from minted
+
+
+def claim_code(rule, user):
+    """Assign the next unclaimed code of `rule` to `user`."""
+    with transaction.atomic():
+        coupon = (
+            Coupon.objects
+            .select_for_update(skip_locked=True)
+            .filter(campaign=rule, claimed_by__isnull=True)
+            .order_by('id')
+            .first()
+        )
+        if coupon is None:
+            raise CampaignExhausted(f"No unclaimed codes left for rule '{rule.name}'.")
+        coupon.claimed_by = user
+        coupon.claimed_at = timezone.now()
+        coupon.save(update_fields=['claimed_by', 'claimed_at'])
+    return coupon
+
+
+class _LineBuffer:
+    def write(self, value):
+        return value
+
+
+def iter_codes_csv(rule, chunk_size=5000):
+    """CSV lines for every code of `rule`, streamed from the database."""
+    writer = csv.writer(_LineBuffer())
+    yield writer.writerow(CSV_COLUMNS)
+    rows = (
+        Coupon.objects
+        .filter(campaign=rule)
+        .order_by('id')
+        .values_list('code', 'claimed_by__email', 'claimed_at', 'used')
+    )
+    for code, email, claimed_at, used in rows.iterator(chunk_size=chunk_size):
+        yield writer.writerow([code, email or '', claimed_at.isoformat() if claimed_at else '', used])
@@ -0,0 +1,113 @@
+"""Coupon validation and redemption.
+
+`check_coupon` is the advisory check behind `coupons/apply/`. The limits are
+enforced by `redeem_coupon` at order creation, inside the order's transaction:
+
+    UPDATE coupon SET used = used + 1 WHERE id = .. AND used < max_uses
+
+and the same against the user's CouponUsage row for max_uses_per_user. Each
+is a single-row conditional update, so concurrent checkouts on a popular code
+can't over-redeem, and nothing counts redemption rows. A CouponRedemption row,
+unique per (coupon, order), records what was granted.
+
+`release_coupons` gives the redemptions of a cancelled order, or one whose
+payment failed, back: the counters go down by one, again conditionally, and
+the CouponRedemption row is deleted, so a single-use code can be used again.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Coupon, CouponRedemption, CouponUsage
+
+CENTS = Decimal('0.01')
+
+
+class CouponError(Exception):
+    pass
+
+
+def coupon_discount(coupon, amount):
+    """Discount on an items total of `amount`, never more than the total."""
+    amount = Decimal(amount)
+    if coupon.discount_type == 'FLAT':
+        discount = coupon.discount_value
+    else:
+        discount = amount * coupon.discount_value / 100
+    return min(discount, amount).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def check_coupon(coupon, amount, user=None):
+    """Raise CouponError if `coupon` can't currently be used on `amount`."""
+    if not coupon.is_active:
+        raise CouponError('Invalid coupon code.')
+    if coupon.expiry_date < timezone.now():
+        raise CouponError('Coupon has expired.')
+    if Decimal(amount) < coupon.min_purchase:
+        raise CouponError(f'Minimum purchase of ৳{coupon.min_purchase} required.')
+    if coupon.claimed_by_id is not None and (user is None or coupon.claimed_by_id != user.pk):
+        raise CouponError('This code belongs to another account.')
+    if coupon.max_uses is not None and coupon.used >= coupon.max_uses:
+        raise CouponError('Coupon has been fully redeemed.')
+    if coupon.max_uses_per_user is not None:
+        if user is None or not user.is_authenticated:
+            raise CouponError('Please sign in to use this coupon.')
+        used = CouponUsage.objects.filter(coupon=coupon, user=user).values_list('used', flat=True).first() or 0
+        if used >= coupon.max_uses_per_user:
+            raise CouponError('You have already used this coupon.')
+
+
+@transaction.atomic
+def redeem_coupon(code, order, amount):
+    """Redeem `code` for `order` with an items total of `amount`; returns the discount."""
+    try:
+        coupon = Coupon.objects.get(code=code, is_active=True)
+    except Coupon.DoesNotExist:
+        raise CouponError('Invalid coupon code.')
+    user = order.user
+    check_coupon(coupon, amount, user)
+
+    claimed = (
+        Coupon.objects
+        .filter(pk=coupon.pk, is_active=True, expiry_date__gte=timezone.now())
+        .filter(Q(max_uses__isnull=True) | Q(used__lt=F('max_uses')))
+        .update(used=F('used') + 1)
+    )
+    if not claimed:
+        raise CouponError('Coupon has been fully redeemed.')
+
+    if coupon.max_uses_per_user is not None:
+        usage, _ = CouponUsage.objects.get_or_create(coupon=coupon, user=user)
+        claimed = (
+            CouponUsage.objects
+            .filter(pk=usage.pk, used__lt=coupon.max_uses_per_user)
+            .update(used=F('used') + 1)
+        )
+        if not claimed:
+            raise CouponError('You have already used this coupon.')
+
+    discount = coupon_discount(coupon, amount)
+    CouponRedemption.objects.create(coupon=coupon, user=user, order=order, amount=discount)
+    return discount
+
+
+@transaction.atomic
+def release_coupons(order_id):
+    """Undo the coupon redemptions of order `order_id`; returns how many were released.
+
+    Safe to call more than once: the redemption rows are locked and deleted,
+    so a second call finds nothing to give back.
+    """
+    redemptions = list(
+        CouponRedemption.objects.select_for_update(of=('self',))
+        .filter(order_id=order_id)
+        .values_list('pk', 'coupon_id', 'user_id', 'coupon__max_uses_per_user')
+    )
+    for _, coupon_id, user_id, max_uses_per_user in redemptions:
+        Coupon.objects.filter(pk=coupon_id, used__gt=0).update(used=F('used') - 1)
+        if max_uses_per_user is not None and user_id is not None:
+            CouponUsage.objects.filter(coupon_id=coupon_id, user_id=user_id, used__gt=0).update(used=F('used') - 1)
+    CouponRedemption.objects.filter(pk__in=[pk for pk, _, _, _ in redemptions]).delete()
+    return len(redemptions)
@@ -0,0 +1,56 @@
+"""Coupon rule rewards, driven by domain events (see apps.events.bus)."""
+from django.db import transaction
+from django.utils import timezone
+
+from apps.events.bus import ORDER_PLACED, USER_LOGGED_IN, subscribe
+from utils.email_service import EmailService
+from .campaigns import claim_code
+from .models import CouponRule, UserCouponHistory
+
+
+def _active_rules(trigger_event, **filters):
+    now = timezone.now()
+    return CouponRule.objects.filter(
+        trigger_event=trigger_event,
+        is_active=True,
+        start_date__lte=now,
+        end_date__gte=now,
+        **filters,
+    ).select_related('coupon')
+
+
+def _reward(user, rule, subject, build_message, email):
+    # One reward per user and rule. History, code claim and email commit
+    # together so a failed send is retried with the event instead of being lost.
+    with transaction.atomic():
+        history, created = UserCouponHistory.objects.get_or_create(user=user, rule=rule)
+        if created:
+            coupon = claim_code(rule, user) if rule.unique_codes else rule.coupon
+            history.coupon = coupon
+            history.save(update_fields=['coupon'])
+            EmailService.send_email(subject, build_message(coupon.code), [email], background=False)
+
+
+@subscribe(USER_LOGGED_IN)
+def reward_login(payload):
+    from apps.accounts.models import User
+
+    user = User.objects.get(pk=payload['user_id'])
+    name = user.get_full_name() or user.email
+    for rule in _active_rules('LOGIN'):
+        subject = f"You've unlocked a reward: {rule.name}"
+        message = lambda code: f"Hi {name},\n\nThanks for logging in! As a special treat, here is a coupon code just for you:\n\nCode: {code}\nDiscount: {rule.coupon.discount_value} ({rule.coupon.discount_type})\n\nEnjoy shopping!\nLuxStore Team"
+        _reward(user, rule, subject, message, user.email)
+
+
+@subscribe(ORDER_PLACED)
+def reward_order_amount(payload):
+    from apps.orders.models import Order
+
+    order = Order.objects.select_related('user').get(pk=payload['order_id'])
+    if order.user is None:
+        return
+    for rule in _active_rules('ORDER_OVER_AMOUNT', min_amount__lte=order.total_price):
+        subject = f"Big Spender Reward: {rule.name}"
+        message = lambda code: f"Hi {order.full_name},\n\nThank you for your purchase of {order.total_price}! You've qualified for a special reward:\n\nCode: {code}\nDiscount: {rule.coupon.discount_value} ({rule.coupon.discount_type})\n\nUse it on your next order!\nLuxStore Team"
+        _reward(order.user, rule, subject, message, order.email)
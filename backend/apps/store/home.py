@@ -0,0 +1,66 @@
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from utils.cache_tags import cached_document
+from .inventory import shard_total
+from .models import Banner, Product, SiteSettings
+from .navigation import get_navigation_tree
+from .serializers import BannerSerializer, ProductCardSerializer, SiteSettingsSerializer
+
+CACHE_KEY = 'store:home'
+CACHE_TAGS = ['banners', 'products', 'navigation', 'site-settings']
+
+BANNER_LIMIT = 10
+NEW_ARRIVALS_LIMIT = 8
+HIGHLIGHT_CATEGORY_LIMIT = 6
+HIGHLIGHT_PRODUCTS_PER_CATEGORY = 4
+SETTINGS_SUMMARY_FIELDS = ['brand_name', 'about_text', 'delivery_charge', 'return_window_days']
+
+
+def _live_products():
+    return Product.objects.filter(is_available=True).select_related('category').annotate(shards_total=shard_total())
+
+
+def build_home_document():
+    banners = Banner.objects.filter(is_active=True).order_by('-created_at')[:BANNER_LIMIT]
+    new_arrivals = _live_products().order_by('-created_at')[:NEW_ARRIVALS_LIMIT]
+
+    # Reuse the navigation document for the category list instead of counting again.
+    tree, _ = get_navigation_tree()
+    categories = [c for c in tree if c['product_count'] > 0][:HIGHLIGHT_CATEGORY_LIMIT]
+
+    # Newest N products per category in a single windowed query.
+    highlighted = (_live_products()
+                   .filter(category_id__in=[c['id'] for c in categories])
+                   .annotate(rank=Window(RowNumber(), partition_by=F('category_id'), order_by=F('created_at').desc()))
+                   .filter(rank__lte=HIGHLIGHT_PRODUCTS_PER_CATEGORY)
+                   .order_by('category_id', 'rank'))
+    by_category = {}
+    for product in highlighted:
+        by_category.setdefault(product.category_id, []).append(product)
+
+    settings = SiteSettingsSerializer(SiteSettings.cached()).data
+    return {
+        'banners': BannerSerializer(banners, many=True).data,
+        'new_arrivals': ProductCardSerializer(new_arrivals, many=True).data,
+        'category_highlights': [
+            {
+                'id': c['id'],
+                'name': c['name'],
+                'slug': c['slug'],
+                'image': c['image'],
+                'product_count': c['product_count'],
+                'products': ProductCardSerializer(by_category.get(c['id'], []), many=True).data,
+            }
+            for c in categories
+        ],
+        'settings': {key: settings[key] for key in SETTINGS_SUMMARY_FIELDS},
+    }
+
+
+def get_home_document():
+    # On a fresh install this creates the settings row, which bumps the
+    # site-settings tag; do it before the document's version is computed,
+    # or the first build would be cached under a version that is already stale.
+    SiteSettings.cached()
+    return cached_document(CACHE_KEY, CACHE_TAGS, build_home_document)
@@ -0,0 +1,207 @@
+"""Stock reservations.
+
+All stock changes are single conditional UPDATEs (`stock >= n`), so two
+checkouts can never oversell and no row is read before it is written.
+
+Products flagged `sharded_stock` spread their stock over StockShard rows.
+A reservation starts at a random shard, so concurrent checkouts for a hot SKU
+lock different rows instead of queueing on the Product row. If no single
+shard can cover the quantity it is collected across shards inside one
+transaction. Product.stock then only holds what isn't in a shard (normally
+0); available stock is Product.stock plus the shards. `rebalance_stock_shards`
+evens the shards out again, or merges them back into Product.stock.
+
+Every change that alters the total is also appended to the StockMovement
+ledger, in the same transaction and one bulk INSERT per call; moving units
+between shards is not a movement. See store.stock_ledger for snapshots and
+reconciliation.
+"""
+import random
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import Product, StockMovement, StockShard
+
+
+class InsufficientStock(Exception):
+    def __init__(self, product, requested):
+        self.product = product
+        self.requested = requested
+        self.available = available_stock(product)
+        super().__init__(
+            f"Insufficient stock for '{product.name}'. Available: {self.available}, Requested: {requested}"
+        )
+
+
+class _Shortfall(Exception):
+    """Rolls back a partial gather before InsufficientStock is raised."""
+
+
+def available_stock(product):
+    if not product.sharded_stock:
+        return Product.objects.filter(pk=product.pk).values_list('stock', flat=True).first() or 0
+    shards = StockShard.objects.filter(product_id=product.pk).aggregate(total=Sum('quantity'))['total'] or 0
+    return shards + (Product.objects.filter(pk=product.pk).values_list('stock', flat=True).first() or 0)
+
+
+def shard_total(product_ref='pk'):
+    """Correlated sum of the outer product's shards, for annotating list queries.
+
+    Serializers read it as `shards_total` instead of one query per product
+    (see ShardedStockMixin).
+    """
+    total = (
+        StockShard.objects.filter(product_id=OuterRef(product_ref))
+        .order_by().values('product_id').annotate(total=Sum('quantity')).values('total')
+    )
+    return Coalesce(Subquery(total, output_field=IntegerField()), Value(0))
+
+
+def _take(queryset, field, quantity):
+    return queryset.filter(**{f"{field}__gte": quantity}).update(**{field: F(field) - quantity})
+
+
+def record_movements(lines, reason):
+    """Append (product_id, quantity, reference) lines to the ledger in one INSERT."""
+    StockMovement.objects.bulk_create([
+        StockMovement(product_id=product_id, quantity=quantity, reason=reason, reference=reference)
+        for product_id, quantity, reference in lines if quantity
+    ])
+
+
+def reserve_many(items, reference=''):
+    """Take (product, quantity) items as sales, all or none; raises InsufficientStock."""
+    with transaction.atomic():
+        # Lock rows in primary key order, so two orders sharing products
+        # can't each hold one row while waiting for the other's.
+        for product, quantity in sorted(items, key=lambda item: item[0].pk):
+            _reserve(product, quantity)
+        record_movements([(product.pk, -quantity, reference) for product, quantity in items], 'SALE')
+
+
+def reserve_stock(product, quantity, reference=''):
+    reserve_many([(product, quantity)], reference)
+
+
+def _reserve(product, quantity):
+    if not product.sharded_stock:
+        if not _take(Product.objects.filter(pk=product.pk), 'stock', quantity):
+            raise InsufficientStock(product, quantity)
+        return
+
+    shards = StockShard.objects.filter(product_id=product.pk)
+    count = product.stock_shard_count or 1
+    start = random.randrange(count)
+    order = [(start + offset) % count for offset in range(count)]
+    for shard in order:
+        if _take(shards.filter(shard=shard), 'quantity', quantity):
+            return
+
+    # No shard covers it alone: gather across shards (and the unsharded
+    # remainder) atomically, so a failure gives everything back.
+    try:
+        with transaction.atomic():
+            remaining = quantity
+            for shard in order:
+                held = shards.filter(shard=shard).values_list('quantity', flat=True).first() or 0
+                take = min(held, remaining)
+                if take and _take(shards.filter(shard=shard), 'quantity', take):
+                    remaining -= take
+                if not remaining:
+                    return
+            held = Product.objects.filter(pk=product.pk).values_list('stock', flat=True).first() or 0
+            take = min(held, remaining)
+            if not take or not _take(Product.objects.filter(pk=product.pk), 'stock', take) or take < remaining:
+                raise _Shortfall
+    except _Shortfall:
+        raise InsufficientStock(product, quantity)
+
+
+def _release(product, quantity):
+    if product.sharded_stock:
+        shard = random.randrange(product.stock_shard_count or 1)
+        if StockShard.objects.filter(product_id=product.pk, shard=shard).update(quantity=F('quantity') + quantity):
+            return
+    Product.objects.filter(pk=product.pk).update(stock=F('stock') + quantity)
+
+
+@transaction.atomic
+def release_many(lines, reason='RETURN'):
+    """Put back (product_id, quantity, reference) lines for many products in one UPDATE.
+
+    Each line becomes its own movement; sharded products are released one by one.
+    """
+    lines = [line for line in lines if line[1]]
+    if not lines:
+        return
+    quantities = {}
+    for product_id, quantity, _ in lines:
+        quantities[product_id] = quantities.get(product_id, 0) + quantity
+    sharded = list(Product.objects.filter(pk__in=quantities, sharded_stock=True).order_by('pk'))
+    for product in sharded:
+        _release(product, quantities.pop(product.pk))
+    if quantities:
+        Product.objects.filter(pk__in=quantities).update(stock=F('stock') + Case(
+            *[When(pk=pk, then=Value(quantity)) for pk, quantity in quantities.items()],
+            default=Value(0), output_field=IntegerField(),
+        ))
+    record_movements(lines, reason)
+
+
+def _split(total, shards):
+    base, extra = divmod(total, shards)
+    return [base + (1 if index < extra else 0) for index in range(shards)]
+
+
+@transaction.atomic
+def shard_stock(product, shards=None):
+    """Turn sharding on (or re-spread an already sharded product) evenly over N shards."""
+    shards = shards or settings.STOCK_SHARDS
+    locked = Product.objects.select_for_update().get(pk=product.pk)
+    existing = list(StockShard.objects.select_for_update().filter(product=locked))
+    total = locked.stock + sum(shard.quantity for shard in existing)
+    StockShard.objects.filter(product=locked).delete()
+    StockShard.objects.bulk_create([
+        StockShard(product=locked, shard=index, quantity=quantity)
+        for index, quantity in enumerate(_split(total, shards))
+    ])
+    Product.objects.filter(pk=locked.pk).update(stock=0, sharded_stock=True, stock_shard_count=shards)
+    product.stock_shard_count = shards
+    return total
+
+
+def rebalance(product):
+    return shard_stock(product, product.stock_shard_count or None)
+
+
+@transaction.atomic
+def merge_shards(product):
+    """Fold every shard back into Product.stock and turn sharding off."""
+    locked = Product.objects.select_for_update().get(pk=product.pk)
+    shards = StockShard.objects.select_for_update().filter(product=locked)
+    total = locked.stock + (shards.aggregate(total=Sum('quantity'))['total'] or 0)
+    shards.delete()
+    Product.objects.filter(pk=locked.pk).update(stock=total, sharded_stock=False, stock_shard_count=0)
+    return total
+
+
+@transaction.atomic
+def set_stock(product, total, reason='ADJUSTMENT', reference=''):
+    """Set the total available stock, keeping the product's current layout.
+
+    The row is locked while the difference to the current total is recorded.
+    """
+    locked = Product.objects.select_for_update().get(pk=product.pk)
+    shards = StockShard.objects.select_for_update().filter(product_id=product.pk)
+    current = locked.stock + (shards.aggregate(total=Sum('quantity'))['total'] or 0)
+    if locked.sharded_stock:
+        Product.objects.filter(pk=product.pk).update(stock=total)
+        shards.update(quantity=0)
+        shard_stock(product, locked.stock_shard_count or None)
+    else:
+        Product.objects.filter(pk=product.pk).update(stock=total)
+        product.stock = total
+    record_movements([(product.pk, total - current, reference)], reason)
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.store.recommendations import METRICS, build
+
+
+class Command(BaseCommand):
+    help = "Fold new orders into the co-purchase matrix and refresh product recommendations."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true', help="Rebuild from every order instead of only new ones.")
+        parser.add_argument('--top-k', type=int, help="Recommendations kept per product (default RECOMMENDATIONS_TOP_K).")
+        parser.add_argument('--metric', choices=METRICS, help="Scoring (default RECOMMENDATIONS_METRIC).")
+        parser.add_argument('--min-support', type=int, default=1, help="Minimum shared orders for a pair.")
+
+    def handle(self, *args, **options):
+        try:
+            stats = build(options['full'], options['top_k'], options['metric'], options['min_support'])
+        except ValueError as e:
+            raise CommandError(e)
+        self.stdout.write(self.style.SUCCESS(
+            f"Folded in {stats['orders']} order(s); {stats['recommendations']} recommendation(s) "
+            f"for {stats['products']} product(s)."
+        ))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.query_plans import full_scans, registered_queries
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the registered hot queries and fail if any of them reads a whole table."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help="Only check these queries (default: all).")
+        parser.add_argument('--show-plans', action='store_true', help="Print every query plan.")
+
+    def handle(self, *args, **options):
+        queries = registered_queries()
+        unknown = set(options['names']) - set(queries)
+        if unknown:
+            raise CommandError(f"Unknown queries: {', '.join(sorted(unknown))}")
+        if options['names']:
+            queries = {name: queries[name] for name in options['names']}
+
+        failures = []
+        for name, (build, allow_scan) in queries.items():
+            try:
+                scans, plan = full_scans(build(), allow_scan)
+            except NotImplementedError as e:
+                raise CommandError(str(e))
+            if scans:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f"FULL SCAN  {name}: {', '.join(scans)}"))
+            else:
+                self.stdout.write(f"ok         {name}")
+            if scans or options['show_plans']:
+                self.stdout.write('\n'.join(f"    {line}" for line in plan.splitlines()))
+
+        if failures:
+            raise CommandError(f"{len(failures)} of {len(queries)} hot queries scan a full table.")
+        self.stdout.write(self.style.SUCCESS(f"All {len(queries)} hot queries use an index."))
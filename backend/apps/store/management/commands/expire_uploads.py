@@ -0,0 +1,17 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from apps.store.uploads import expire_sessions
+
+
+class Command(BaseCommand):
+    help = "Delete abandoned chunked uploads and their partial files."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, help="Age in hours (default UPLOAD_SESSION_TTL_HOURS).")
+
+    def handle(self, *args, **options):
+        max_age = timedelta(hours=options['hours']) if options['hours'] else None
+        count = expire_sessions(max_age)
+        self.stdout.write(self.style.SUCCESS(f"Removed {count} abandoned upload(s)."))
@@ -0,0 +1,48 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from utils.startup import cold_start_ms, profile_imports
+
+
+def _package(module):
+    parts = module.split('.')
+    # apps.store.views -> apps.store, django.contrib.admin.options -> django.contrib.admin
+    return '.'.join(parts[:3 if parts[:2] == ['django', 'contrib'] else 2 if parts[0] == 'apps' else 1])
+
+
+class Command(BaseCommand):
+    help = "Report how long a fresh worker spends importing each module before serving its first request."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--api-only', action='store_true', help="Profile the API_ONLY settings mode.")
+        parser.add_argument('--top', type=int, default=25, help="Number of rows to show (default: 25).")
+        parser.add_argument('--by-package', action='store_true', help="Sum import time per package instead of per module.")
+        parser.add_argument('--budget', action='store_true', help=(
+            "Also time a cold start without -X importtime and fail if it exceeds COLD_START_BUDGET_MS."
+        ))
+
+    def handle(self, *args, **options):
+        timings = profile_imports(options['api_only'])
+        if options['by_package']:
+            totals = defaultdict(float)
+            for module, self_ms, _ in timings:
+                totals[_package(module)] += self_ms
+            rows = [(package, ms, None) for package, ms in totals.items()]
+        else:
+            rows = timings
+        rows = sorted(rows, key=lambda row: row[1], reverse=True)[:options['top']]
+
+        self.stdout.write(f"{'self ms':>9} {'cumul. ms':>10}  module")
+        for module, self_ms, cumulative_ms in rows:
+            cumulative = f"{cumulative_ms:10.1f}" if cumulative_ms is not None else f"{'':10}"
+            self.stdout.write(f"{self_ms:9.1f} {cumulative}  {module}")
+        total = sum(self_ms for _, self_ms, _ in timings)
+        self.stdout.write(f"{len(timings)} modules, {total:.0f} ms of imports (inflated by -X importtime).")
+
+        if options['budget']:
+            elapsed, budget = cold_start_ms(options['api_only']), settings.COLD_START_BUDGET_MS
+            if elapsed > budget:
+                raise CommandError(f"Cold start took {elapsed:.0f} ms, over the {budget} ms budget.")
+            self.stdout.write(self.style.SUCCESS(f"Cold start took {elapsed:.0f} ms (budget {budget} ms)."))
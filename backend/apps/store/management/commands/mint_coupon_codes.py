@@ -0,0 +1,43 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.store.campaigns import DEFAULT_CHUNK_SIZE, mint_codes
+from apps.store.models import CouponRule
+
+
+class Command(BaseCommand):
+    help = "Mint single-use coupon codes for a coupon rule and stream them out as CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument('rule', type=int, help="CouponRule id; codes copy the discount of its coupon.")
+        parser.add_argument('--count', type=int, required=True, help="Number of codes to create.")
+        parser.add_argument('--prefix', default='', help="Prepended to every code, e.g. SUMMER-.")
+        parser.add_argument('--output', '-o', help="CSV file to write to (defaults to stdout).")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+        parser.add_argument('--enable', action='store_true', help="Also switch the rule to hand out these codes.")
+
+    def handle(self, *args, **options):
+        try:
+            rule = CouponRule.objects.select_related('coupon').get(pk=options['rule'])
+        except CouponRule.DoesNotExist:
+            raise CommandError(f"No coupon rule with id {options['rule']}.")
+        if options['count'] <= 0:
+            raise CommandError("--count must be positive.")
+
+        started = time.perf_counter()
+        fh = open(options['output'], 'w', newline='', encoding='utf-8') if options['output'] else sys.stdout
+        try:
+            fh.write('code\n')
+            for code in mint_codes(rule, options['count'], options['prefix'], options['chunk_size']):
+                fh.write(f"{code}\n")
+        finally:
+            if options['output']:
+                fh.close()
+
+        if options['enable'] and not rule.unique_codes:
+            CouponRule.objects.filter(pk=rule.pk).update(unique_codes=True)
+        self.stderr.write(self.style.SUCCESS(
+            f"Minted {options['count']} code(s) for '{rule.name}' in {time.perf_counter() - started:.1f}s."
+        ))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.store.inventory import merge_shards, rebalance, shard_stock
+from apps.store.models import Product
+
+
+class Command(BaseCommand):
+    help = "Even out the stock shards of sharded products, or merge them back into Product.stock."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--product', help="Only this product (slug).")
+        parser.add_argument('--merge', action='store_true', help="Merge the shards back and turn sharding off.")
+        parser.add_argument('--enable', action='store_true', help="Turn sharding on for --product.")
+        parser.add_argument('--shards', type=int, help="Shard count for --enable (default STOCK_SHARDS).")
+
+    def handle(self, *args, **options):
+        if options['enable']:
+            if not options['product']:
+                raise CommandError("--enable needs --product.")
+            product = self._get(options['product'])
+            total = shard_stock(product, options['shards'])
+            self.stdout.write(self.style.SUCCESS(f"Sharded {total} unit(s) of '{product.slug}'."))
+            return
+
+        products = Product.objects.filter(sharded_stock=True)
+        if options['product']:
+            products = [self._get(options['product'])]
+        count = 0
+        for product in products:
+            total = merge_shards(product) if options['merge'] else rebalance(product)
+            self.stdout.write(f"{product.slug}: {total}")
+            count += 1
+        verb = 'Merged' if options['merge'] else 'Rebalanced'
+        self.stdout.write(self.style.SUCCESS(f"{verb} {count} product(s)."))
+
+    def _get(self, slug):
+        try:
+            return Product.objects.get(slug=slug)
+        except Product.DoesNotExist:
+            raise CommandError(f"No product with slug '{slug}'.")
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.store.stock_ledger import reconcile_stock
+
+
+class Command(BaseCommand):
+    help = "Compare every product's stock with its snapshot plus movements, and report drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--adjust', action='store_true', help=(
+            "Record an adjustment movement for each drifted product, so the ledger matches the stock on hand."
+        ))
+
+    def handle(self, *args, **options):
+        drifted = reconcile_stock(adjust=options['adjust'])
+        for product_id, expected, actual in drifted:
+            self.stdout.write(f"Product {product_id}: ledger says {expected}, stock is {actual} ({actual - expected:+d}).")
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Stock matches the ledger."))
+        elif options['adjust']:
+            self.stdout.write(f"Recorded {len(drifted)} adjustment(s).")
+        else:
+            raise CommandError(f"{len(drifted)} product(s) drifted from the ledger; rerun with --adjust to record it.")
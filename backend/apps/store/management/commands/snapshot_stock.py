@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from apps.store.stock_ledger import snapshot_stock
+
+
+class Command(BaseCommand):
+    help = "Fold recent stock movements into snapshot rows, so point-in-time stock reads stay bounded."
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Snapshotted {snapshot_stock()} product(s).")
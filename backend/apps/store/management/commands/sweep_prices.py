@@ -0,0 +1,30 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from apps.store.pricing import reprice, sweep
+
+
+class Command(BaseCommand):
+    help = "Apply price rules whose sale window opened or closed to Product.effective_price."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep sweeping instead of exiting.")
+        parser.add_argument('--all', action='store_true', help=(
+            "Reprice every product, e.g. after prices were changed with bulk updates."
+        ))
+
+    def handle(self, *args, **options):
+        if options['all']:
+            self.stdout.write(f"Repriced {reprice()} product(s).")
+            return
+        while True:
+            flipped, changed = sweep()
+            if flipped or not options['loop']:
+                self.stdout.write(f"{flipped} rule(s) started or ended; {changed} price(s) changed.")
+            if not options['loop']:
+                break
+            connections.close_all()
+            time.sleep(settings.PRICE_SWEEP_SECONDS)
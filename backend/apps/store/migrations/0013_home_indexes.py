@@ -0,0 +1,21 @@
+# Generated by Django 6.0 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0012_couponrule_usercouponhistory'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='banner',
+            index=models.Index(fields=['is_active', '-created_at'], name='banner_active_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_available', '-created_at'], name='product_live_newest_idx'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 6.0 on 2026-10-19 14:30
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0017_coupon_limits'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='coupon',
+            name='campaign',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='campaign_codes', to='store.couponrule'),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='claimed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='coupon',
+            name='claimed_by',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='couponrule',
+            name='unique_codes',
+            field=models.BooleanField(default=False, help_text='Give each user their own single-use code minted with `manage.py mint_coupon_codes` instead of the shared coupon.'),
+        ),
+        migrations.AddField(
+            model_name='usercouponhistory',
+            name='coupon',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='store.coupon'),
+        ),
+        migrations.AddIndex(
+            model_name='coupon',
+            index=models.Index(condition=models.Q(('claimed_by__isnull', True)), fields=['campaign', 'id'], name='coupon_campaign_unclaimed_idx'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 6.0 on 2026-10-19 15:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0018_coupon_campaign_codes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='banner',
+            name='banner_active_newest_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_live_newest_idx',
+        ),
+        migrations.AddIndex(
+            model_name='banner',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['-created_at'], name='banner_active_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='couponrule',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['trigger_event', 'start_date', 'end_date'], name='couponrule_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['-created_at'], name='product_live_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['category', '-created_at'], name='product_live_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['product', '-created_at'], name='review_product_newest_idx'),
+        ),
+    ]
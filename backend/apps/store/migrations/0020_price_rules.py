@@ -0,0 +1,63 @@
+# Generated by Django 6.0 on 2026-10-19 16:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_effective_price(apps, schema_editor):
+    # No price rules exist yet, so every product sells at its list price.
+    Product = apps.get_model('store', 'Product')
+    Product.objects.update(effective_price=models.F('price'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0019_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PriceRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('discount_type', models.CharField(choices=[('FLAT', 'Flat Amount'), ('PERCENTAGE', 'Percentage')], default='PERCENTAGE', max_length=10)),
+                ('discount_value', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField(blank=True, help_text='Leave empty for no end', null=True)),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_live', models.BooleanField(default=False, editable=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_effective_price, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['effective_price'], name='product_live_price_idx'),
+        ),
+        migrations.AddField(
+            model_name='pricerule',
+            name='category',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='store.category'),
+        ),
+        migrations.AddField(
+            model_name='pricerule',
+            name='product',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='store.product'),
+        ),
+        migrations.AddField(
+            model_name='pricerule',
+            name='subcategory',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='price_rules', to='store.subcategory'),
+        ),
+        migrations.AddConstraint(
+            model_name='pricerule',
+            constraint=models.CheckConstraint(condition=models.Q(models.Q(('category__isnull', True), ('product__isnull', False), ('subcategory__isnull', True)), models.Q(('category__isnull', False), ('product__isnull', True), ('subcategory__isnull', True)), models.Q(('category__isnull', True), ('product__isnull', True), ('subcategory__isnull', False)), _connector='OR'), name='pricerule_single_scope'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 6.0 on 2026-10-19 17:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def opening_snapshots(apps, schema_editor):
+    # The ledger starts from today's stock (shards included) as its opening balance.
+    Product = apps.get_model('store', 'Product')
+    StockShard = apps.get_model('store', 'StockShard')
+    StockSnapshot = apps.get_model('store', 'StockSnapshot')
+    shards = StockShard.objects.filter(product=OuterRef('pk')).order_by().values('product').annotate(total=Sum('quantity'))
+    rows = Product.objects.annotate(
+        shards=Coalesce(Subquery(shards.values('total'), output_field=models.IntegerField()), Value(0)),
+    ).values_list('pk', 'stock', 'shards')
+    now = timezone.now()
+    StockSnapshot.objects.bulk_create([
+        StockSnapshot(product_id=pk, quantity=stock + shards, taken_at=now) for pk, stock, shards in rows.iterator()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0020_price_rules'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField(help_text='Signed change: negative for units leaving stock')),
+                ('reason', models.CharField(choices=[('SALE', 'Sale'), ('RETURN', 'Return'), ('ADJUSTMENT', 'Adjustment'), ('IMPORT', 'Import')], max_length=10)),
+                ('reference', models.CharField(blank=True, max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='store.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'created_at'], name='stockmovement_product_time_idx'), models.Index(fields=['created_at'], name='stockmovement_time_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.IntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='store.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-taken_at'], name='stocksnapshot_latest_idx'), models.Index(fields=['-taken_at'], name='stocksnapshot_time_idx')],
+            },
+        ),
+        migrations.RunPython(opening_snapshots, migrations.RunPython.noop),
+    ]
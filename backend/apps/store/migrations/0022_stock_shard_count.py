@@ -0,0 +1,28 @@
+# Generated by Django 6.0 on 2026-10-19 17:30
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_shards(apps, schema_editor):
+    Product = apps.get_model('store', 'Product')
+    StockShard = apps.get_model('store', 'StockShard')
+    counts = StockShard.objects.order_by().values('product_id').annotate(n=Count('pk')).values_list('product_id', 'n')
+    for product_id, count in counts:
+        Product.objects.filter(pk=product_id).update(stock_shard_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('store', '0021_stock_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='stock_shard_count',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_shards, migrations.RunPython.noop),
+    ]
@@ -1,3 +1,4 @@
+from django.core.exceptions import ValidationError
 from django.db import models
 from django.conf import settings
 
@@ -11,6 +12,9 @@ class Review(models.Model):
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['product', '-created_at'], name='review_product_newest_idx'),
+        ]
 
     def __str__(self):
         return f"Review by {self.user} on {self.product}"
@@ -45,7 +49,14 @@ class Product(models.Model):
     slug = models.SlugField(unique=True)
     description = models.TextField()
     price = models.DecimalField(max_digits=10, decimal_places=2)
+    # `price` after the PriceRules live right now. Kept up to date by
+    # store.pricing, so the catalog and checkout read one indexed column.
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
     stock = models.PositiveIntegerField(default=0)
+    # Hot SKUs keep their stock in StockShard rows instead; see store.inventory.
+    sharded_stock = models.BooleanField(default=False)
+    # How many StockShard rows there are, so reservations don't count them.
+    stock_shard_count = models.PositiveSmallIntegerField(default=0, editable=False)
     is_available = models.BooleanField(default=True)
     image = models.ImageField(upload_to='products/')
     sizes = models.JSONField(default=list, blank=True)
@@ -53,6 +64,32 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # Partial rather than leading with the flag: Django renders
+            # `is_available=True` as a bare `WHERE is_available`, which SQLite
+            # can match against an index condition but not an index column.
+            models.Index(fields=['-created_at'], name='product_live_newest_idx', condition=models.Q(is_available=True)),
+            models.Index(fields=['category', '-created_at'], name='product_live_category_idx', condition=models.Q(is_available=True)),
+            models.Index(fields=['effective_price'], name='product_live_price_idx', condition=models.Q(is_available=True)),
+        ]
+
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is None and not self._state.adding:
+            # Stock only moves through store.inventory, which records every
+            # change in the StockMovement ledger; a plain save never writes it.
+            update_fields = kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'stock'
+            ]
+        if update_fields is None or {'price', 'category', 'subcategory'} & set(update_fields):
+            from .pricing import effective_price
+            self.effective_price = effective_price(self)
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'effective_price'}
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return self.name
 
@@ -72,6 +109,11 @@ class Banner(models.Model):
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at'], name='banner_active_newest_idx', condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return self.title or f"Banner {self.id}"
 
@@ -101,6 +143,12 @@ class SiteSettings(models.Model):
         obj, created = cls.objects.get_or_create(pk=1)
         return obj
 
+    @classmethod
+    def cached(cls):
+        """Read-only copy for request paths; saving the settings invalidates it."""
+        from utils.cache_tags import cached_document
+        return cached_document('site-settings:object', ['site-settings'], cls.load)[0]
+
     def __str__(self):
         return "Global Site Settings"
 
@@ -115,11 +163,61 @@ class Coupon(models.Model):
     min_purchase = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     expiry_date = models.DateTimeField()
     is_active = models.BooleanField(default=True)
+    # Redemption caps (blank = unlimited). `used` is only ever changed by a
+    # conditional UPDATE in store.coupons, never read-modify-written.
+    max_uses = models.PositiveIntegerField(null=True, blank=True)
+    max_uses_per_user = models.PositiveIntegerField(null=True, blank=True)
+    used = models.PositiveIntegerField(default=0)
+    # Single-use codes minted for a CouponRule campaign (see store.campaigns).
+    # Once handed to a user only that user can redeem it.
+    campaign = models.ForeignKey('CouponRule', null=True, blank=True, related_name='campaign_codes', on_delete=models.CASCADE)
+    claimed_by = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, related_name='+', on_delete=models.SET_NULL)
+    claimed_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Next unclaimed code of a campaign is one index probe.
+            models.Index(
+                fields=['campaign', 'id'], name='coupon_campaign_unclaimed_idx',
+                condition=models.Q(claimed_by__isnull=True),
+            ),
+        ]
+
     def __str__(self):
         return self.code
 
+class CouponUsage(models.Model):
+    """Per-user redemption counter for coupons with max_uses_per_user."""
+    coupon = models.ForeignKey(Coupon, related_name='usages', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    used = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['coupon', 'user'], name='couponusage_coupon_user_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} - {self.coupon}: {self.used}"
+
+class CouponRedemption(models.Model):
+    coupon = models.ForeignKey(Coupon, related_name='redemptions', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
+    order = models.ForeignKey('orders.Order', related_name='coupon_redemptions', on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            # The order determines the user, and a nullable user column would
+            # let guest rows through a (coupon, user, order) constraint.
+            models.UniqueConstraint(fields=['coupon', 'order'], name='couponredemption_coupon_order_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.coupon} on order {self.order_id}"
+
 class CouponRule(models.Model):
     TRIGGER_CHOICES = (
         ('LOGIN', 'On User Login'),
@@ -132,14 +230,21 @@ class CouponRule(models.Model):
     start_date = models.DateTimeField()
     end_date = models.DateTimeField()
     is_active = models.BooleanField(default=True)
+    unique_codes = models.BooleanField(default=False, help_text="Give each user their own single-use code minted with `manage.py mint_coupon_codes` instead of the shared coupon.")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['trigger_event', 'start_date', 'end_date'], name='couponrule_active_idx', condition=models.Q(is_active=True)),
+        ]
+
     def __str__(self):
         return self.name
 
 class UserCouponHistory(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     rule = models.ForeignKey(CouponRule, on_delete=models.CASCADE)
+    coupon = models.ForeignKey(Coupon, null=True, blank=True, on_delete=models.SET_NULL)  # the code sent
     sent_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
@@ -179,3 +284,144 @@ class ShippingLocation(models.Model):
 
     def __str__(self):
         return self.name
+
+import uuid
+
+class UploadSession(models.Model):
+    """A resumable, chunked upload of one gallery image (see store.uploads)."""
+    STATUS_CHOICES = (
+        ('Open', 'Open'),
+        ('Complete', 'Complete'),
+        ('Attached', 'Attached'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    product = models.ForeignKey(Product, related_name='upload_sessions', on_delete=models.CASCADE)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='Open')
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.filename} ({self.offset}/{self.size})"
+
+class ProductRecommendation(models.Model):
+    """Precomputed "frequently bought together" rows (see store.recommendations)."""
+    product = models.ForeignKey(Product, related_name='recommendations', on_delete=models.CASCADE)
+    recommended = models.ForeignKey(Product, related_name='+', on_delete=models.CASCADE)
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+    co_purchases = models.PositiveIntegerField()
+
+    class Meta:
+        ordering = ['product', 'rank']
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'rank'], name='recommendation_product_rank_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} -> {self.recommended_id} (#{self.rank})"
+
+class StockShard(models.Model):
+    """One of N counters holding part of a sharded product's stock."""
+    product = models.ForeignKey(Product, related_name='stock_shards', on_delete=models.CASCADE)
+    shard = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'shard'], name='stockshard_product_shard_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}#{self.shard}: {self.quantity}"
+
+class StockMovement(models.Model):
+    """Append-only record of a stock change, written by store.inventory in the
+    same transaction as the change itself."""
+    REASON_CHOICES = (
+        ('SALE', 'Sale'),
+        ('RETURN', 'Return'),
+        ('ADJUSTMENT', 'Adjustment'),
+        ('IMPORT', 'Import'),
+    )
+    product = models.ForeignKey(Product, related_name='stock_movements', on_delete=models.CASCADE)
+    quantity = models.IntegerField(help_text="Signed change: negative for units leaving stock")
+    reason = models.CharField(max_length=10, choices=REASON_CHOICES)
+    # What caused it, e.g. 'order:42', 'admin:3', 'reconcile'.
+    reference = models.CharField(max_length=64, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', 'created_at'], name='stockmovement_product_time_idx'),
+            models.Index(fields=['created_at'], name='stockmovement_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.quantity:+d} ({self.reason})"
+
+class StockSnapshot(models.Model):
+    """A product's stock according to the ledger at `taken_at`; see store.stock_ledger."""
+    product = models.ForeignKey(Product, related_name='stock_snapshots', on_delete=models.CASCADE)
+    quantity = models.IntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['product', '-taken_at'], name='stocksnapshot_latest_idx'),
+            models.Index(fields=['-taken_at'], name='stocksnapshot_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id}: {self.quantity} at {self.taken_at:%Y-%m-%d %H:%M}"
+
+class PriceRule(models.Model):
+    """A scheduled sale on one product, a category or a subcategory.
+
+    Rules are materialized into Product.effective_price: immediately when a
+    rule is saved, and by `manage.py sweep_prices` when a window opens or
+    closes. When several rules are live for a product the lowest price wins.
+    """
+    DISCOUNT_CHOICES = (
+        ('FLAT', 'Flat Amount'),
+        ('PERCENTAGE', 'Percentage'),
+    )
+    name = models.CharField(max_length=100)
+    product = models.ForeignKey(Product, null=True, blank=True, related_name='price_rules', on_delete=models.CASCADE)
+    category = models.ForeignKey(Category, null=True, blank=True, related_name='price_rules', on_delete=models.CASCADE)
+    subcategory = models.ForeignKey(SubCategory, null=True, blank=True, related_name='price_rules', on_delete=models.CASCADE)
+    discount_type = models.CharField(max_length=10, choices=DISCOUNT_CHOICES, default='PERCENTAGE')
+    discount_value = models.DecimalField(max_digits=10, decimal_places=2)
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField(null=True, blank=True, help_text="Leave empty for no end")
+    is_active = models.BooleanField(default=True)
+    # Whether the prices currently reflect this rule; flipped by the sweeper.
+    is_live = models.BooleanField(default=False, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=(
+                    models.Q(product__isnull=False, category__isnull=True, subcategory__isnull=True)
+                    | models.Q(product__isnull=True, category__isnull=False, subcategory__isnull=True)
+                    | models.Q(product__isnull=True, category__isnull=True, subcategory__isnull=False)
+                ),
+                name='pricerule_single_scope',
+            ),
+        ]
+
+    def clean(self):
+        if sum(value is not None for value in (self.product_id, self.category_id, self.subcategory_id)) != 1:
+            raise ValidationError("Choose exactly one of product, category or subcategory.")
+        if self.ends_at and self.ends_at <= self.starts_at:
+            raise ValidationError({'ends_at': "The sale must end after it starts."})
+        if self.discount_type == 'PERCENTAGE' and self.discount_value > 100:
+            raise ValidationError({'discount_value': "A percentage can't exceed 100."})
+
+    def __str__(self):
+        return self.name
@@ -0,0 +1,47 @@
+from django.db.models import Count, Q
+
+from utils.cache_tags import cached_document
+from .models import Category, SubCategory
+
+CACHE_KEY = 'store:navigation'
+CACHE_TAGS = ['navigation']
+
+# Product fields that move a product between branches or hide it from the tree.
+TRACKED_PRODUCT_FIELDS = ('category_id', 'subcategory_id', 'is_available')
+
+_live = Q(products__is_available=True)
+
+
+def build_navigation_tree():
+    """Categories with their subcategories and live product counts, in two queries."""
+    subcategories = {}
+    for sub in (SubCategory.objects
+                .annotate(product_count=Count('products', filter=_live))
+                .order_by('name')
+                .values('id', 'category_id', 'name', 'slug', 'product_count')):
+        subcategories.setdefault(sub['category_id'], []).append({
+            'id': sub['id'],
+            'category': sub['category_id'],
+            'name': sub['name'],
+            'slug': sub['slug'],
+            'product_count': sub['product_count'],
+        })
+
+    tree = []
+    for category in (Category.objects
+                     .annotate(product_count=Count('products', filter=_live))
+                     .order_by('id')):
+        tree.append({
+            'id': category.id,
+            'name': category.name,
+            'slug': category.slug,
+            'image': category.image.url if category.image else None,
+            'product_count': category.product_count,
+            'subcategories': subcategories.get(category.id, []),
+        })
+    return tree
+
+
+def get_navigation_tree():
+    """Return (tree, version). Rebuilt only after invalidate_navigation()."""
+    return cached_document(CACHE_KEY, CACHE_TAGS, build_navigation_tree)
@@ -0,0 +1,129 @@
+"""Scheduled price rules, materialized into Product.effective_price.
+
+Reads never evaluate rules. The catalog filters and sorts on the indexed
+`effective_price` column, and checkout charges it. Rules are applied when
+prices change instead:
+
+- Product.save() prices the product against the rules live right now;
+- saving or deleting a PriceRule reprices the products it covers (signals);
+- `sweep_prices`, run from cron every minute or with --loop, finds rules
+  whose window opened or closed since the last sweep (`is_live` disagrees
+  with the clock) and reprices only the products they cover.
+
+Repricing walks the affected products in primary key chunks and writes only
+the prices that actually changed, one bulk UPDATE per chunk. bulk_update
+sends no post_save, so repricing invalidates the 'products' cache tag itself
+whenever a price changed.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db.models import Q
+from django.utils import timezone
+
+from utils.cache_tags import invalidate_tags
+from .models import PriceRule, Product
+
+CENTS = Decimal('0.01')
+DEFAULT_BATCH_SIZE = 1000
+
+
+def live_rules(now=None):
+    now = now or timezone.now()
+    return PriceRule.objects.filter(is_active=True, starts_at__lte=now).filter(
+        Q(ends_at__isnull=True) | Q(ends_at__gt=now)
+    )
+
+
+def scope_filter(product_id, category_id, subcategory_id):
+    """Q matching the products a rule with this scope applies to."""
+    if product_id:
+        return Q(pk=product_id)
+    if category_id:
+        return Q(category_id=category_id)
+    return Q(subcategory_id=subcategory_id)
+
+
+def rule_scope(rule):
+    return scope_filter(rule.product_id, rule.category_id, rule.subcategory_id)
+
+
+def _applies(rule, product_id, category_id, subcategory_id):
+    return (
+        rule.product_id == product_id if rule.product_id
+        else rule.category_id == category_id if rule.category_id
+        else rule.subcategory_id == subcategory_id
+    )
+
+
+def _discounted(rule, price):
+    if rule.discount_type == 'FLAT':
+        discounted = price - rule.discount_value
+    else:
+        discounted = price * (100 - rule.discount_value) / 100
+    return max(discounted, Decimal(0)).quantize(CENTS, rounding=ROUND_HALF_UP)
+
+
+def price_with_rules(price, product_id, category_id, subcategory_id, rules):
+    """Lowest price any of `rules` gives the product, or `price` if none apply."""
+    price = Decimal(price)
+    candidates = [
+        _discounted(rule, price) for rule in rules
+        if _applies(rule, product_id, category_id, subcategory_id)
+    ]
+    return min([price, *candidates])
+
+
+def effective_price(product, rules=None):
+    if rules is None:
+        rules = list(live_rules())
+    return price_with_rules(product.price, product.pk, product.category_id, product.subcategory_id, rules)
+
+
+def reprice(products=None, batch_size=DEFAULT_BATCH_SIZE, now=None):
+    """Recompute effective_price for `products` (default: all); returns how many changed."""
+    rules = list(live_rules(now))
+    queryset = (products if products is not None else Product.objects.all()).order_by('pk')
+    fields = ('pk', 'price', 'category_id', 'subcategory_id', 'effective_price')
+    changed, last_pk = 0, 0
+    while True:
+        rows = list(queryset.filter(pk__gt=last_pk).values_list(*fields)[:batch_size])
+        if not rows:
+            if changed:
+                invalidate_tags('products')
+            return changed
+        updates = []
+        for pk, price, category_id, subcategory_id, current in rows:
+            new_price = price_with_rules(price, pk, category_id, subcategory_id, rules)
+            if new_price != current:
+                updates.append(Product(pk=pk, effective_price=new_price))
+        if updates:
+            Product.objects.bulk_update(updates, ['effective_price'])
+            changed += len(updates)
+        last_pk = rows[-1][0]
+
+
+def sweep(now=None):
+    """Apply rules whose window opened or closed; returns (rules flipped, prices changed)."""
+    now = now or timezone.now()
+    live = live_rules(now)
+    starting = list(live.filter(is_live=False))
+    ending = list(PriceRule.objects.filter(is_live=True).exclude(pk__in=live.values('pk')))
+    flipped = starting + ending
+    if not flipped:
+        return 0, 0
+
+    scope = Q()
+    for rule in flipped:
+        scope |= rule_scope(rule)
+    # Chunks commit as they go; the flags flip last, so an interrupted sweep
+    # is simply redone by the next one.
+    changed = reprice(Product.objects.filter(scope), now=now)
+    PriceRule.objects.filter(pk__in=[rule.pk for rule in starting]).update(is_live=True)
+    PriceRule.objects.filter(pk__in=[rule.pk for rule in ending]).update(is_live=False)
+    return len(flipped), changed
+
+
+def apply_rule_change(rule_id, scope):
+    """Reprice `scope` after a rule was saved or deleted, and record whether it is live."""
+    reprice(Product.objects.filter(scope))
+    PriceRule.objects.filter(pk=rule_id).update(is_live=live_rules().filter(pk=rule_id).exists())
@@ -0,0 +1,69 @@
+"""Hot storefront queries checked by `manage.py check_query_plans`."""
+from datetime import timedelta
+
+from django.utils import timezone
+
+from utils.query_plans import hot_query
+from .models import Banner, Coupon, CouponRule, Product, ProductRecommendation, Review, StockMovement, StockSnapshot
+
+
+@hot_query('store.new_arrivals')
+def new_arrivals():
+    return Product.objects.filter(is_available=True).order_by('-created_at')[:8]
+
+
+@hot_query('store.category_newest')
+def category_newest():
+    return Product.objects.filter(is_available=True, category_id=1).order_by('-created_at')[:8]
+
+
+@hot_query('store.product_by_slug')
+def product_by_slug():
+    return Product.objects.filter(slug='example')
+
+
+@hot_query('store.active_banners')
+def active_banners():
+    return Banner.objects.filter(is_active=True).order_by('-created_at')[:5]
+
+
+@hot_query('store.product_reviews')
+def product_reviews():
+    return Review.objects.filter(product_id=1).order_by('-created_at')
+
+
+@hot_query('store.product_recommendations')
+def product_recommendations():
+    return ProductRecommendation.objects.filter(product_id=1).order_by('rank')
+
+
+@hot_query('store.coupon_by_code')
+def coupon_by_code():
+    return Coupon.objects.filter(code='EXAMPLE', is_active=True)
+
+
+@hot_query('store.active_coupon_rules')
+def active_coupon_rules():
+    now = timezone.now()
+    return CouponRule.objects.filter(trigger_event='LOGIN', is_active=True, start_date__lte=now, end_date__gte=now)
+
+
+@hot_query('store.next_campaign_code')
+def next_campaign_code():
+    return Coupon.objects.filter(campaign_id=1, claimed_by__isnull=True).order_by('id')[:1]
+
+
+@hot_query('store.products_by_price')
+def products_by_price():
+    return Product.objects.filter(is_available=True, effective_price__gte=100, effective_price__lte=500).order_by('effective_price')[:24]
+
+
+@hot_query('store.stock_snapshot_before')
+def stock_snapshot_before():
+    return StockSnapshot.objects.filter(product_id=1, taken_at__lte=timezone.now()).order_by('-taken_at')[:1]
+
+
+@hot_query('store.stock_movements_since')
+def stock_movements_since():
+    now = timezone.now()
+    return StockMovement.objects.filter(product_id=1, created_at__gt=now - timedelta(hours=1), created_at__lte=now)
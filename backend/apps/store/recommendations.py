@@ -0,0 +1,166 @@
+""""Frequently bought together" recommendations from co-purchases.
+
+`manage.py build_recommendations` (run it from cron) turns OrderItem rows into
+a sparse product x product co-occurrence matrix:
+
+    baskets = orders x products, 1 where the order contains the product
+    counts  = baskets.T @ baskets      # counts[i, j]: orders containing i and j
+                                       # counts[i, i]: orders containing i
+
+The matrix, the number of orders seen and the last order id folded in are
+kept in RECOMMENDATIONS_DIR, so each run only reads orders placed since the
+previous one and adds their counts. Pairs are scored by cosine
+(c_ij / sqrt(c_ii * c_jj)) or lift (c_ij * N / (c_ii * c_jj)) and the top K per
+product are written to ProductRecommendation, which the API reads with one
+indexed query. Incremental runs rescore only products that appeared in new
+orders; `--full` rebuilds from scratch (and forgets orders cancelled since).
+"""
+import os
+from datetime import timedelta
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from scipy import sparse
+
+from .models import Product, ProductRecommendation
+
+STATE_FILE = 'copurchase.npz'
+# Orders newer than this are left for the next run so a transaction that
+# commits late with a lower id isn't skipped by the watermark.
+SETTLE_DELAY = timedelta(minutes=10)
+METRICS = ('cosine', 'lift')
+
+
+def _state_path():
+    return os.path.join(settings.RECOMMENDATIONS_DIR, STATE_FILE)
+
+
+def load_state():
+    """Return (counts, n_orders, watermark); empty when nothing was built yet."""
+    path = _state_path()
+    if not os.path.exists(path):
+        return sparse.csr_matrix((0, 0), dtype=np.int64), 0, 0
+    with np.load(path) as data:
+        counts = sparse.csr_matrix(
+            (data['data'], data['indices'], data['indptr']), shape=tuple(data['shape'])
+        )
+        return counts, int(data['n_orders']), int(data['watermark'])
+
+
+def save_state(counts, n_orders, watermark):
+    os.makedirs(settings.RECOMMENDATIONS_DIR, exist_ok=True)
+    path = _state_path()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as fh:
+        np.savez_compressed(
+            fh, data=counts.data, indices=counts.indices, indptr=counts.indptr,
+            shape=np.array(counts.shape), n_orders=n_orders, watermark=watermark,
+        )
+    os.replace(tmp_path, path)
+
+
+def fetch_pairs(after_order_id, until):
+    """(order_id, product_id) pairs of settled, non-cancelled orders after the watermark."""
+    from apps.orders.models import Order, OrderItem
+
+    orders = Order.objects.filter(id__gt=after_order_id, created_at__lt=until)
+    watermark = orders.aggregate(last=Max('id'))['last'] or after_order_id
+    rows = (
+        OrderItem.objects
+        .filter(order__in=orders.filter(id__lte=watermark).exclude(status='Cancelled'), product__isnull=False)
+        .values_list('order_id', 'product_id')
+    )
+    flat = np.fromiter(chain.from_iterable(rows.iterator(chunk_size=5000)), dtype=np.int64)
+    return flat.reshape(-1, 2), watermark
+
+
+def cooccurrence(pairs, size):
+    """Co-purchase counts for a batch of (order_id, product_id) pairs."""
+    order_ids, order_index = np.unique(pairs[:, 0], return_inverse=True)
+    baskets = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.int64), (order_index, pairs[:, 1])),
+        shape=(len(order_ids), size),
+    )
+    baskets.data[:] = 1  # the same product twice in one order counts once
+    return (baskets.T @ baskets).tocsr(), len(order_ids)
+
+
+def top_k(counts, n_orders, rows, k, metric='cosine', min_support=1, candidates=None):
+    """Score the given rows and keep the best k per row, without a Python loop.
+
+    `candidates` optionally limits which product ids may be recommended.
+
+    Returns parallel arrays (product_id, recommended_id, rank, score, co_purchases).
+    """
+    support = counts.diagonal().astype(np.float64)
+    block = counts[rows].tocoo()
+    product = rows[block.row]
+    recommended = block.col
+    co = block.data
+    keep = (recommended != product) & (co >= min_support)
+    if candidates is not None:
+        keep &= np.isin(recommended, candidates)
+    product, recommended, co = product[keep], recommended[keep], co[keep]
+
+    denominator = support[product] * support[recommended]
+    if metric == 'lift':
+        score = co * n_orders / denominator
+    else:
+        score = co / np.sqrt(denominator)
+
+    # Group by product, best score first (ties: more co-purchases first).
+    order = np.lexsort((-co, -score, product))
+    product, recommended, co, score = product[order], recommended[order], co[order], score[order]
+    group_start = np.searchsorted(product, product, side='left')
+    rank = np.arange(len(product)) - group_start
+    keep = rank < k
+    return product[keep], recommended[keep], rank[keep] + 1, score[keep], co[keep]
+
+
+def build(full=False, k=None, metric=None, min_support=1):
+    k = k or settings.RECOMMENDATIONS_TOP_K
+    metric = metric or settings.RECOMMENDATIONS_METRIC
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {', '.join(METRICS)}")
+
+    if full:
+        counts, n_orders, watermark = sparse.csr_matrix((0, 0), dtype=np.int64), 0, 0
+    else:
+        counts, n_orders, watermark = load_state()
+
+    pairs, new_watermark = fetch_pairs(watermark, timezone.now() - SETTLE_DELAY)
+    stats = {'orders': 0, 'products': 0, 'recommendations': 0}
+    if len(pairs):
+        size = max(counts.shape[0], int(pairs[:, 1].max()) + 1)
+        delta, stats['orders'] = cooccurrence(pairs, size)
+        counts = counts.copy()
+        counts.resize((size, size))
+        counts = (counts + delta).tocsr()
+        n_orders += stats['orders']
+
+    rows = np.flatnonzero(counts.diagonal()) if full else np.unique(pairs[:, 1])
+    existing = np.fromiter(Product.objects.values_list('id', flat=True).iterator(), dtype=np.int64)
+    rows = rows[np.isin(rows, existing)]
+    product, recommended, rank, score, co = top_k(counts, n_orders, rows, k, metric, min_support, existing)
+
+    with transaction.atomic():
+        stale = ProductRecommendation.objects.all() if full else ProductRecommendation.objects.filter(product_id__in=rows.tolist())
+        stale.delete()
+        ProductRecommendation.objects.bulk_create(
+            [
+                ProductRecommendation(product_id=p, recommended_id=r, rank=n, score=s, co_purchases=c)
+                for p, r, n, s, c in zip(
+                    product.tolist(), recommended.tolist(), rank.tolist(), score.tolist(), co.tolist()
+                )
+            ],
+            batch_size=1000,
+        )
+    save_state(counts, n_orders, new_watermark)
+
+    stats['products'] = len(rows)
+    stats['recommendations'] = len(product)
+    return stats
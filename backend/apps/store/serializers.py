@@ -1,8 +1,8 @@
 from rest_framework import serializers
-from rest_framework import serializers
+from utils.sparse_fields import SparseFieldsetMixin
 from .models import Category, SubCategory, Product, ProductImage, Banner, SiteSettings, Coupon, FooterSection, FooterLink, ShippingLocation, Review, CouponRule
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     user_name = serializers.CharField(source='user.full_name', read_only=True)
     
     class Meta:
@@ -10,33 +10,35 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = ['id', 'user_name', 'rating', 'comment', 'image', 'created_at']
         read_only_fields = ['user']
 
-class FooterLinkSerializer(serializers.ModelSerializer):
+class FooterLinkSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = FooterLink
         fields = '__all__'
 
-class FooterSectionSerializer(serializers.ModelSerializer):
+class FooterSectionSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     links = FooterLinkSerializer(many=True, read_only=True)
     class Meta:
         model = FooterSection
         fields = ['id', 'name', 'priority', 'links']
+        expandable_fields = ['links']
 
-class BannerSerializer(serializers.ModelSerializer):
+class BannerSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Banner
         fields = '__all__'
 
-class SiteSettingsSerializer(serializers.ModelSerializer):
+class SiteSettingsSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = SiteSettings
         fields = '__all__'
 
-class CouponSerializer(serializers.ModelSerializer):
+class CouponSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = Coupon
         fields = '__all__'
+        read_only_fields = ['used']
 
-class CouponRuleSerializer(serializers.ModelSerializer):
+class CouponRuleSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     coupon_code = serializers.CharField(source='coupon.code', read_only=True)
     
     class Meta:
@@ -44,25 +46,41 @@ class CouponRuleSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
-class SubCategorySerializer(serializers.ModelSerializer):
+class SubCategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     category_name = serializers.ReadOnlyField(source='category.name')
     
     class Meta:
         model = SubCategory
         fields = ['id', 'category', 'category_name', 'name', 'slug']
 
-class CategorySerializer(serializers.ModelSerializer):
+class CategorySerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     subcategories = SubCategorySerializer(many=True, read_only=True)
     class Meta:
         model = Category
         fields = ['id', 'name', 'slug', 'image', 'subcategories']
+        expandable_fields = ['subcategories']
 
-class ProductImageSerializer(serializers.ModelSerializer):
+class ProductImageSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ProductImage
         fields = ['id', 'image', 'created_at']
 
-class ProductSerializer(serializers.ModelSerializer):
+class ShardedStockMixin:
+    """Report the summed stock of products whose stock lives in StockShard rows."""
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if 'stock' in data and instance.sharded_stock:
+            shards = getattr(instance, 'shards_total', None)
+            if shards is not None:
+                # Annotated by the queryset (inventory.shard_total).
+                data['stock'] = instance.stock + shards
+            else:
+                from .inventory import available_stock
+                data['stock'] = available_stock(instance)
+        return data
+
+class ProductSerializer(ShardedStockMixin, SparseFieldsetMixin, serializers.ModelSerializer):
     category = CategorySerializer(read_only=True)
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), source='category', write_only=True
@@ -76,9 +94,49 @@ class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ['id', 'category', 'category_id', 'subcategory', 'subcategory_id', 'name', 'slug', 'description', 
-                  'price', 'stock', 'is_available', 'image', 'images', 'sizes', 'colors']
+                  'price', 'effective_price', 'stock', 'is_available', 'image', 'images', 'sizes', 'colors']
         read_only_fields = ['slug']
-class ShippingLocationSerializer(serializers.ModelSerializer):
+        expandable_fields = ['category', 'subcategory', 'images']
+
+    def update(self, instance, validated_data):
+        # Product.save() leaves stock alone; set_stock writes it and records
+        # the difference as an adjustment.
+        stock = validated_data.pop('stock', None)
+        instance = super().update(instance, validated_data)
+        if stock is not None:
+            from .inventory import set_stock
+            user = self.context['request'].user if 'request' in self.context else None
+            set_stock(instance, stock, reference=f"api:{user.pk}" if user and user.pk else '')
+        return instance
+
+class ProductCardSerializer(ShardedStockMixin, SparseFieldsetMixin, serializers.ModelSerializer):
+    """Compact product representation for grids and the home page."""
+    category = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ['id', 'category', 'name', 'slug', 'price', 'effective_price', 'stock', 'is_available', 'image', 'sizes', 'colors']
+        relation_hints = {'category': 'category.name'}
+
+    def get_category(self, obj):
+        return {'id': obj.category_id, 'name': obj.category.name, 'slug': obj.category.slug}
+
+class ShippingLocationSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     class Meta:
         model = ShippingLocation
         fields = '__all__'
+
+from django.conf import settings
+from .models import UploadSession
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    product = serializers.SlugRelatedField(slug_field='slug', queryset=Product.objects.all())
+    chunk_size = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadSession
+        fields = ['id', 'product', 'filename', 'size', 'offset', 'status', 'chunk_size', 'created_at']
+        read_only_fields = ['offset', 'status']
+
+    def get_chunk_size(self, obj):
+        return settings.UPLOAD_CHUNK_SIZE
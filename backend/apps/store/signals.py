@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import receiver
+
+from utils.cache_tags import invalidate_tags
+from .models import Banner, Category, PriceRule, Product, SiteSettings, SubCategory
+from .navigation import CACHE_TAGS as NAVIGATION_TAGS, TRACKED_PRODUCT_FIELDS
+
+# Fields store.similarity embeds; other edits (stock, images) keep the vector.
+SIMILARITY_FIELDS = ('name', 'description', 'category_id', 'subcategory_id', 'price', 'sizes', 'colors')
+
+
+def _navigation_state(product):
+    return tuple(product.__dict__.get(field) for field in TRACKED_PRODUCT_FIELDS)
+
+
+def _similarity_state(product):
+    return tuple(product.__dict__.get(field) for field in SIMILARITY_FIELDS)
+
+
+@receiver(post_init, sender=Product)
+def remember_navigation_state(sender, instance, **kwargs):
+    instance._navigation_state = _navigation_state(instance)
+    instance._similarity_state = _similarity_state(instance)
+
+
+@receiver(post_save, sender=Product)
+def product_saved(sender, instance, created, **kwargs):
+    # Stock, price or description edits don't change the tree; skip the rebuild.
+    state = _navigation_state(instance)
+    if created or state != instance._navigation_state:
+        invalidate_tags(*NAVIGATION_TAGS)
+    instance._navigation_state = state
+
+
+def _reembed(product_id):
+    from .similarity import update_in_background
+
+    transaction.on_commit(lambda: update_in_background([product_id]))
+
+
+@receiver(post_save, sender=Product)
+def product_content_saved(sender, instance, created, **kwargs):
+    state = _similarity_state(instance)
+    if created or state != instance._similarity_state:
+        _reembed(instance.pk)
+    instance._similarity_state = state
+
+
+@receiver(post_save, sender=Product)
+def product_stock_imported(sender, instance, created, raw=False, **kwargs):
+    # Later changes go through store.inventory; this records the opening stock.
+    if created and not raw and instance.stock:
+        from .inventory import record_movements
+        record_movements([(instance.pk, instance.stock, 'created')], 'IMPORT')
+
+
+@receiver(post_delete, sender=Product)
+def product_content_deleted(sender, instance, **kwargs):
+    _reembed(instance.pk)
+
+
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=SubCategory)
+@receiver(post_delete, sender=SubCategory)
+def navigation_changed(sender, **kwargs):
+    invalidate_tags(*NAVIGATION_TAGS)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def products_changed(sender, **kwargs):
+    invalidate_tags('products')
+
+
+@receiver(post_save, sender=Banner)
+@receiver(post_delete, sender=Banner)
+def banners_changed(sender, **kwargs):
+    invalidate_tags('banners')
+
+
+@receiver(post_save, sender=SiteSettings)
+def site_settings_changed(sender, **kwargs):
+    invalidate_tags('site-settings')
+
+
+def _price_rule_scope(rule):
+    return (rule.product_id, rule.category_id, rule.subcategory_id)
+
+
+@receiver(post_init, sender=PriceRule)
+def remember_price_rule_scope(sender, instance, **kwargs):
+    instance._price_scope = _price_rule_scope(instance)
+
+
+@receiver(post_save, sender=PriceRule)
+@receiver(post_delete, sender=PriceRule)
+def price_rule_changed(sender, instance, **kwargs):
+    from .pricing import apply_rule_change, rule_scope, scope_filter
+
+    # Reprice both the old and the new scope, in case the rule was moved.
+    scope = rule_scope(instance)
+    if any(instance._price_scope):
+        scope |= scope_filter(*instance._price_scope)
+    rule_id = instance.pk
+    transaction.on_commit(lambda: apply_rule_change(rule_id, scope))
+    instance._price_scope = _price_rule_scope(instance)
@@ -0,0 +1,261 @@
+"""Content-based "similar products".
+
+Every product is embedded as a hashed, TF-IDF weighted bag of features:
+words from the name (weighted up) and description, its category and
+subcategory, sizes, colors and a log-scale price band. Vectors are
+L2-normalized float32 rows of a matrix stored with NumPy's .npy format in
+SIMILARITY_DIR and memory-mapped for queries, so a nearest-neighbour lookup
+is one matrix-vector product over the catalog:
+
+    vectors.npy  capacity x SIMILARITY_DIMENSIONS, float32
+    ids.npy      product id of each row (-1 for a free row)
+    idf.npy      inverse document frequency per hashed feature
+
+`manage.py build_similarity_index` embeds the whole catalog in batches and
+refreshes the IDF weights. Saving a product re-embeds just that product in
+place (see signals), reusing the stored weights.
+"""
+import os
+import re
+import threading
+import zlib
+from contextlib import contextmanager
+
+import numpy as np
+from django.conf import settings
+from django.db import connections
+from scipy import sparse
+
+from .models import Product
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to the in-process lock only
+    fcntl = None
+
+WORD_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset(
+    'a an and are as at be by for from has in is it its of on or our the this to was with you your'.split()
+)
+NAME_WEIGHT = 3
+CATEGORY_WEIGHT = 4
+COLOR_WEIGHT = 2
+PRICE_WEIGHT = 2
+BATCH_SIZE = 1000
+FIELDS = ('id', 'name', 'description', 'category_id', 'subcategory_id', 'price', 'sizes', 'colors')
+
+_write_lock = threading.Lock()
+_reader = {'stamp': None}
+
+
+def _path(name):
+    return os.path.join(settings.SIMILARITY_DIR, name)
+
+
+@contextmanager
+def _locked():
+    """Serialize index writers across threads and processes."""
+    os.makedirs(settings.SIMILARITY_DIR, exist_ok=True)
+    with _write_lock, open(_path('.lock'), 'w') as fh:
+        if fcntl:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+        yield
+
+
+def _words(text):
+    return [word for word in WORD_RE.findall((text or '').lower()) if word not in STOP_WORDS and len(word) > 1]
+
+
+def product_features(product):
+    """Weighted feature tokens for one product (a dict of FIELDS)."""
+    features = {}
+
+    def add(token, weight=1):
+        features[token] = features.get(token, 0) + weight
+
+    for word in _words(product['name']):
+        add(word, NAME_WEIGHT)
+    for word in _words(product['description']):
+        add(word)
+    add(f"category:{product['category_id']}", CATEGORY_WEIGHT)
+    if product['subcategory_id']:
+        add(f"subcategory:{product['subcategory_id']}", CATEGORY_WEIGHT)
+    for size in product['sizes'] or []:
+        add(f"size:{str(size).strip().lower()}")
+    for color in product['colors'] or []:
+        add(f"color:{str(color).strip().lower()}", COLOR_WEIGHT)
+    if product['price']:
+        band = int(np.log2(float(product['price']) + 1) * 2)
+        add(f"price:{band}", PRICE_WEIGHT)
+        add(f"price:{band - 1}")
+        add(f"price:{band + 1}")
+    return features
+
+
+def featurize(products, dimensions):
+    """Sparse (len(products) x dimensions) term-frequency matrix."""
+    rows, tokens, weights = [], [], []
+    for index, product in enumerate(products):
+        for token, weight in product_features(product).items():
+            rows.append(index)
+            tokens.append(token)
+            weights.append(weight)
+    # Hash each distinct token once rather than once per occurrence.
+    vocabulary, inverse = np.unique(np.array(tokens, dtype=object), return_inverse=True)
+    buckets = np.fromiter((zlib.crc32(token.encode()) for token in vocabulary), dtype=np.int64, count=len(vocabulary))
+    columns = (buckets % dimensions)[inverse]
+    matrix = sparse.csr_matrix(
+        (np.log1p(np.array(weights, dtype=np.float32)), (np.array(rows, dtype=np.int64), columns)),
+        shape=(len(products), dimensions),
+    )
+    matrix.sum_duplicates()
+    return matrix
+
+
+def _normalize(matrix, idf):
+    dense = matrix.multiply(idf).toarray().astype(np.float32)
+    norms = np.linalg.norm(dense, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return dense / norms
+
+
+def _product_batches(queryset):
+    batch = []
+    for product in queryset.values(*FIELDS).order_by('id').iterator(chunk_size=BATCH_SIZE):
+        batch.append(product)
+        if len(batch) == BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def build_index():
+    """Embed the whole catalog and replace the on-disk index; returns the row count."""
+    dimensions = settings.SIMILARITY_DIMENSIONS
+    ids, blocks = [], []
+    for batch in _product_batches(Product.objects.all()):
+        ids.extend(product['id'] for product in batch)
+        blocks.append(featurize(batch, dimensions))
+    count = len(ids)
+    tf = sparse.vstack(blocks).tocsr() if blocks else sparse.csr_matrix((0, dimensions), dtype=np.float32)
+
+    document_frequency = np.bincount(tf.indices, minlength=dimensions)
+    idf = (np.log((1 + count) / (1 + document_frequency)) + 1).astype(np.float32)
+
+    capacity = max(64, 1 << int(np.ceil(np.log2(max(count, 1) * 1.25))))
+    with _locked():
+        tmp = _path('vectors.npy.tmp')
+        vectors = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(capacity, dimensions))
+        for start in range(0, count, BATCH_SIZE):
+            end = min(start + BATCH_SIZE, count)
+            vectors[start:end] = _normalize(tf[start:end], idf)
+        vectors.flush()
+        del vectors
+        row_ids = np.full(capacity, -1, dtype=np.int64)
+        row_ids[:count] = ids
+        _save(_path('idf.npy'), idf)
+        os.replace(tmp, _path('vectors.npy'))
+        _save(_path('ids.npy'), row_ids)
+    return count
+
+
+def _save(path, array):
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as fh:
+        np.save(fh, array)
+    os.replace(tmp, path)
+
+
+def _grow(vectors, row_ids, capacity):
+    tmp = _path('vectors.npy.tmp')
+    grown = np.lib.format.open_memmap(tmp, mode='w+', dtype=np.float32, shape=(capacity, vectors.shape[1]))
+    grown[:len(vectors)] = vectors
+    grown.flush()
+    del grown
+    os.replace(tmp, _path('vectors.npy'))
+    return (
+        np.load(_path('vectors.npy'), mmap_mode='r+'),
+        np.concatenate([row_ids, np.full(capacity - len(row_ids), -1, dtype=np.int64)]),
+    )
+
+
+def update_products(product_ids):
+    """Re-embed (or drop, if deleted) the given products in place."""
+    if not os.path.exists(_path('ids.npy')):
+        build_index()
+        return
+    with _locked():
+        idf = np.load(_path('idf.npy'))
+        row_ids = np.load(_path('ids.npy'))
+        vectors = np.load(_path('vectors.npy'), mmap_mode='r+')
+
+        products = list(Product.objects.filter(id__in=product_ids).values(*FIELDS).order_by('id'))
+        found = {product['id'] for product in products}
+        for product_id in set(product_ids) - found:
+            rows = np.flatnonzero(row_ids == product_id)
+            vectors[rows] = 0
+            row_ids[rows] = -1
+
+        if products:
+            embedded = _normalize(featurize(products, vectors.shape[1]), idf)
+            for product, vector in zip(products, embedded):
+                rows = np.flatnonzero(row_ids == product['id'])
+                if not len(rows):
+                    rows = np.flatnonzero(row_ids == -1)[:1]
+                if not len(rows):
+                    vectors.flush()
+                    vectors, row_ids = _grow(vectors, row_ids, len(row_ids) * 2)
+                    rows = np.flatnonzero(row_ids == -1)[:1]
+                vectors[rows[0]] = vector
+                row_ids[rows[0]] = product['id']
+        vectors.flush()
+        _save(_path('ids.npy'), row_ids)
+
+
+def _load_reader():
+    """Memory-map the index, re-opening it only when a writer replaced ids.npy."""
+    try:
+        stat = os.stat(_path('ids.npy'))
+    except FileNotFoundError:
+        return None, None
+    stamp = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+    if _reader['stamp'] != stamp:
+        row_ids = np.load(_path('ids.npy'))
+        used = np.flatnonzero(row_ids != -1)
+        limit = int(used[-1]) + 1 if len(used) else 0
+        vectors = np.load(_path('vectors.npy'), mmap_mode='r')
+        _reader.update(stamp=stamp, ids=row_ids[:limit], vectors=vectors[:limit])
+    return _reader['ids'], _reader['vectors']
+
+
+def similar_products(product_id, k=8):
+    """Ids of the k most similar products, best first (empty if not indexed)."""
+    row_ids, vectors = _load_reader()
+    if row_ids is None:
+        return []
+    rows = np.flatnonzero(row_ids == product_id)
+    if not len(rows):
+        return []
+    scores = vectors @ vectors[rows[0]]
+    scores[row_ids == -1] = -np.inf
+    scores[rows[0]] = -np.inf
+    k = min(k, int(np.isfinite(scores).sum()))
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top])]
+    return row_ids[top].tolist()
+
+
+def _update_async(product_ids):
+    try:
+        update_products(product_ids)
+    except Exception as e:
+        print(f"Similarity index update failed for {product_ids}: {e}")
+    finally:
+        connections.close_all()
+
+
+def update_in_background(product_ids):
+    threading.Thread(target=_update_async, args=(list(product_ids),)).start()
@@ -0,0 +1,120 @@
+"""Snapshots, reconciliation and point-in-time reads over the stock ledger.
+
+store.inventory appends a StockMovement for every change to a product's
+total stock. Summing a product's movements gives its stock at any moment,
+but the ledger only grows, so reads start from a StockSnapshot instead:
+
+- `snapshot_stock` (cron, e.g. hourly) folds the movements since the last run
+  into new snapshot rows, only for products that moved. All rows of a run
+  share one `taken_at`, STOCK_SNAPSHOT_LAG_SECONDS in the past;
+- `stock_at(product, when)` is the latest snapshot at or before `when` plus
+  the movements after it: one index read and one bounded range scan on
+  (product, created_at), however long the ledger gets;
+- `reconcile_stock` (cron, e.g. nightly) recomputes every product's expected
+  stock from its latest snapshot and the movements since, compares it with
+  Product.stock plus its shards, and reports the products that drifted, i.e.
+  were changed without going through store.inventory (raw SQL, bulk_create,
+  fixtures). With adjust=True the ledger is corrected to match the shelf.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .inventory import record_movements, shard_total
+from .models import Product, StockMovement, StockSnapshot
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _last_snapshot_time():
+    return StockSnapshot.objects.aggregate(last=Max('taken_at'))['last']
+
+
+def _latest_snapshot(before=None):
+    snapshots = StockSnapshot.objects.filter(product=OuterRef('pk'))
+    if before is not None:
+        snapshots = snapshots.filter(taken_at__lte=before)
+    return Coalesce(Subquery(snapshots.order_by('-taken_at').values('quantity')[:1]), Value(0))
+
+
+def _sum_of(queryset, field):
+    """Correlated SUM(field) over `queryset` for the outer product, 0 if there are no rows."""
+    total = queryset.filter(product=OuterRef('pk')).order_by().values('product').annotate(total=Sum(field))
+    return Coalesce(Subquery(total.values('total'), output_field=IntegerField()), Value(0))
+
+
+@transaction.atomic
+def snapshot_stock(now=None):
+    """Snapshot the products that moved since the last run; returns how many."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.STOCK_SNAPSHOT_LAG_SECONDS)
+    since = _last_snapshot_time()
+    if since is not None and since >= cutoff:
+        return 0
+    movements = StockMovement.objects.filter(created_at__lte=cutoff)
+    if since is not None:
+        movements = movements.filter(created_at__gt=since)
+    deltas = dict(movements.order_by().values('product_id').annotate(delta=Sum('quantity')).values_list('product_id', 'delta'))
+    if not deltas:
+        return 0
+    latest = Product.objects.filter(pk__in=deltas).annotate(snapshot=_latest_snapshot()).values_list('pk', 'snapshot')
+    StockSnapshot.objects.bulk_create([
+        StockSnapshot(product_id=pk, quantity=snapshot + deltas[pk], taken_at=cutoff)
+        for pk, snapshot in latest
+    ], batch_size=DEFAULT_BATCH_SIZE)
+    return len(deltas)
+
+
+def stock_at(product, when):
+    """The product's total stock at `when`, according to the ledger."""
+    snapshot = (
+        StockSnapshot.objects
+        .filter(product=product, taken_at__lte=when)
+        .order_by('-taken_at')
+        .values_list('quantity', 'taken_at')
+        .first()
+    )
+    quantity, since = snapshot or (0, None)
+    movements = StockMovement.objects.filter(product=product, created_at__lte=when)
+    if since is not None:
+        movements = movements.filter(created_at__gt=since)
+    return quantity + (movements.aggregate(total=Sum('quantity'))['total'] or 0)
+
+
+def reconcile_stock(adjust=False, batch_size=DEFAULT_BATCH_SIZE):
+    """Compare the ledger with the stock on hand; returns [(product_id, expected, actual)].
+
+    With `adjust`, an ADJUSTMENT movement closing each gap is recorded.
+    """
+    # Every movement up to the last run is folded into a snapshot, so a
+    # product's latest snapshot plus its movements after it is its ledger stock.
+    since = _last_snapshot_time()
+    recent = StockMovement.objects.all() if since is None else StockMovement.objects.filter(created_at__gt=since)
+    drifted, last_pk = [], 0
+    while True:
+        # One statement per chunk, so stock and ledger are read at the same moment.
+        rows = list(
+            Product.objects.filter(pk__gt=last_pk).order_by('pk')
+            .annotate(
+                shards=shard_total(),
+                snapshot=_latest_snapshot(),
+                delta=_sum_of(recent, 'quantity'),
+            )
+            .values_list('pk', 'stock', 'shards', 'snapshot', 'delta')[:batch_size]
+        )
+        if not rows:
+            break
+        table = np.array(rows, dtype=np.int64)
+        actual = table[:, 1] + table[:, 2]
+        expected = table[:, 3] + table[:, 4]
+        off = np.flatnonzero(actual != expected)
+        chunk = [(int(table[i, 0]), int(expected[i]), int(actual[i])) for i in off]
+        if adjust and chunk:
+            record_movements([(pk, actual - expected, 'reconcile') for pk, expected, actual in chunk], 'ADJUSTMENT')
+        drifted += chunk
+        last_pk = rows[-1][0]
+    return drifted
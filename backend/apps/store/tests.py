@@ -1,3 +1,156 @@
-from django.test import TestCase
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.orders.models import Order
+from utils.startup import cold_start_ms, profile_imports
+
+from .coupons import CouponError, redeem_coupon, release_coupons
+from .inventory import InsufficientStock, release_many, reserve_many, set_stock, shard_stock
+from .models import Category, Coupon, CouponRedemption, CouponUsage, Product, StockMovement
+from .stock_ledger import reconcile_stock, snapshot_stock, stock_at
+
+
+class ColdStartTests(SimpleTestCase):
+    def test_api_worker_starts_within_budget(self):
+        # Best of three, so one slow spawn on a busy machine doesn't fail the run.
+        elapsed = min(cold_start_ms(api_only=True) for _ in range(3))
+        self.assertLessEqual(elapsed, settings.COLD_START_BUDGET_MS)
+
+    def test_api_worker_skips_admin_only_code(self):
+        modules = {module for module, _, _ in profile_imports(api_only=True)}
+        self.assertIn('apps.orders.views', modules)
+        for module in ('jazzmin', 'apps.store.admin', 'django.contrib.auth.views'):
+            self.assertNotIn(module, modules)
+
+
+class CouponCapTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        self.alice = User.objects.create_user(email='alice@example.com', password='x')
+        self.bob = User.objects.create_user(email='bob@example.com', password='x')
+        self.coupon = Coupon.objects.create(
+            code='SAVE10', discount_value=Decimal('10.00'), expiry_date=timezone.now() + timedelta(days=1),
+        )
+
+    def order(self, user):
+        return Order.objects.create(
+            user=user, full_name='Customer', email=user.email, phone='1', address_line_1='Road 1',
+            city='Dhaka', state='Dhaka', postal_code='1200', country='BD', total_price=Decimal('100.00'),
+        )
+
+    def redeem(self, user):
+        return redeem_coupon('SAVE10', self.order(user), Decimal('100.00'))
+
+    def used(self):
+        self.coupon.refresh_from_db()
+        return self.coupon.used
+
+    def test_global_cap(self):
+        Coupon.objects.filter(pk=self.coupon.pk).update(max_uses=2)
+        self.assertEqual(self.redeem(self.alice), Decimal('10.00'))
+        self.redeem(self.bob)
+        with self.assertRaisesMessage(CouponError, 'fully redeemed'):
+            self.redeem(self.alice)
+        self.assertEqual(self.used(), 2)
+        self.assertEqual(CouponRedemption.objects.count(), 2)
+
+    def test_cap_holds_when_the_advisory_check_is_stale(self):
+        # A concurrent checkout passed check_coupon before the last use was claimed.
+        Coupon.objects.filter(pk=self.coupon.pk).update(max_uses=1, used=1)
+        with mock.patch('apps.store.coupons.check_coupon'):
+            with self.assertRaisesMessage(CouponError, 'fully redeemed'):
+                self.redeem(self.alice)
+        self.assertEqual(self.used(), 1)
+
+    def test_per_user_cap(self):
+        Coupon.objects.filter(pk=self.coupon.pk).update(max_uses_per_user=1)
+        self.redeem(self.alice)
+        with mock.patch('apps.store.coupons.check_coupon'):
+            with self.assertRaisesMessage(CouponError, 'already used'):
+                self.redeem(self.alice)
+        self.redeem(self.bob)
+        # The rejected redemption's global claim was rolled back with it.
+        self.assertEqual(self.used(), 2)
+        self.assertEqual(CouponUsage.objects.get(coupon=self.coupon, user=self.alice).used, 1)
+
+    def test_release_gives_the_use_back_once(self):
+        Coupon.objects.filter(pk=self.coupon.pk).update(max_uses=1, max_uses_per_user=1)
+        order = self.order(self.alice)
+        redeem_coupon('SAVE10', order, Decimal('100.00'))
+
+        self.assertEqual(release_coupons(order.id), 1)
+        self.assertEqual(release_coupons(order.id), 0)
+        self.assertEqual(self.used(), 0)
+        self.assertEqual(CouponUsage.objects.get(coupon=self.coupon, user=self.alice).used, 0)
+        self.redeem(self.alice)
+
+
+@override_settings(STOCK_SNAPSHOT_LAG_SECONDS=0)
+class StockLedgerTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name='Shirts', slug='shirts')
+        self.product = Product.objects.create(
+            category=category, name='Shirt', slug='shirt', description='-', price=Decimal('10.00'),
+            stock=10, image='shirt.jpg',
+        )
+
+    def movements(self):
+        return list(StockMovement.objects.filter(product=self.product).order_by('pk').values_list('quantity', 'reason', 'reference'))
+
+    def stamp_last_movement(self, when):
+        StockMovement.objects.filter(pk=StockMovement.objects.latest('pk').pk).update(created_at=when)
+
+    def test_every_stock_change_is_a_movement(self):
+        reserve_many([(self.product, 3)], 'order:1')
+        with self.assertRaises(InsufficientStock):
+            reserve_many([(self.product, 100)], 'order:2')
+        set_stock(self.product, 20, reference='admin:1')
+        release_many([(self.product.pk, 2, 'return:1')])
+
+        self.assertEqual(self.movements(), [
+            (10, 'IMPORT', 'created'), (-3, 'SALE', 'order:1'),
+            (13, 'ADJUSTMENT', 'admin:1'), (2, 'RETURN', 'return:1'),
+        ])
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock, 22)
+
+    def test_sharding_is_not_a_movement(self):
+        shard_stock(self.product, 4)
+        self.product.refresh_from_db()
+        reserve_many([(self.product, 5)], 'order:1')
+        set_stock(self.product, 8)
+        self.assertEqual([quantity for quantity, _, _ in self.movements()], [10, -5, 3])
+        self.assertEqual(reconcile_stock(), [])
+
+    def test_stock_at_reads_the_snapshot_plus_later_movements(self):
+        start = timezone.now() - timedelta(hours=3)
+        self.stamp_last_movement(start)
+        reserve_many([(self.product, 3)], 'order:1')
+        self.stamp_last_movement(start + timedelta(hours=1))
+
+        self.assertEqual(snapshot_stock(now=start + timedelta(minutes=90)), 1)
+        self.assertEqual(snapshot_stock(now=start + timedelta(minutes=90)), 0)  # nothing new
+        self.assertEqual(self.product.stock_snapshots.get().quantity, 7)
+
+        reserve_many([(self.product, 2)], 'order:2')
+        self.stamp_last_movement(start + timedelta(hours=2))
+
+        self.assertEqual(stock_at(self.product, start + timedelta(minutes=30)), 10)
+        self.assertEqual(stock_at(self.product, start + timedelta(minutes=75)), 7)
+        self.assertEqual(stock_at(self.product, start + timedelta(minutes=100)), 7)
+        self.assertEqual(stock_at(self.product, timezone.now()), 5)
+
+    def test_reconcile_reports_and_corrects_drift(self):
+        snapshot_stock()
+        Product.objects.filter(pk=self.product.pk).update(stock=15)  # bypasses store.inventory
+
+        self.assertEqual(reconcile_stock(), [(self.product.pk, 10, 15)])
+        self.assertEqual(reconcile_stock(adjust=True), [(self.product.pk, 10, 15)])
+        self.assertEqual(self.movements()[-1], (5, 'ADJUSTMENT', 'reconcile'))
+        self.assertEqual(reconcile_stock(), [])
@@ -0,0 +1,196 @@
+"""Chunked, resumable uploads for product gallery images.
+
+    POST   /api/uploads/                 {product, filename, size}  -> session
+    PUT    /api/uploads/{id}/chunk/      raw bytes + Content-Range: bytes a-b/size
+    GET    /api/uploads/{id}/            current offset, to resume after a failure
+    POST   /api/products/{slug}/images/  {uploads: [id, ...]} -> attach
+
+Chunks are streamed from the request straight into a partial file under
+CHUNKED_UPLOAD_DIR, so memory stays bounded by STREAM_CHUNK_SIZE whatever
+the image size. Chunks of one file are sequential (each must start at the
+stored offset), different files upload in parallel. Attaching moves the
+finished files into MEDIA_ROOT with os.replace, creates every ProductImage
+in one bulk_create and verifies the images on a background thread.
+"""
+import errno
+import os
+import posixpath
+import re
+import shutil
+from datetime import timedelta
+from threading import Thread
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+from rest_framework import serializers
+from rest_framework.exceptions import APIException
+
+from .models import ProductImage, UploadSession
+
+ALLOWED_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.webp', '.gif'}
+CONTENT_RANGE_RE = re.compile(r'^bytes (\d+)-(\d+)/(\d+)$')
+STREAM_CHUNK_SIZE = 64 * 1024
+GALLERY_DIR = 'product_images'
+
+
+class OffsetConflict(APIException):
+    status_code = 409
+    default_detail = 'Chunk does not start at the current upload offset.'
+    default_code = 'offset_conflict'
+
+    def __init__(self, offset):
+        super().__init__()
+        # Keep the offset numeric so clients can resume from it directly.
+        self.detail = {'error': self.default_detail, 'offset': offset}
+
+
+def partial_path(session):
+    return os.path.join(settings.CHUNKED_UPLOAD_DIR, f"{session.pk.hex}.part")
+
+
+def open_session(product, user, filename, size):
+    ext = posixpath.splitext(filename)[1].lower()
+    if ext not in ALLOWED_EXTENSIONS:
+        raise serializers.ValidationError({'filename': f"Unsupported image type '{ext}'."})
+    if size <= 0 or size > settings.UPLOAD_MAX_SIZE:
+        raise serializers.ValidationError({'size': f"Images must be between 1 byte and {settings.UPLOAD_MAX_SIZE} bytes."})
+
+    session = UploadSession.objects.create(product=product, user=user, filename=filename, size=size)
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    open(partial_path(session), 'wb').close()
+    return session
+
+
+def parse_content_range(header, size):
+    match = CONTENT_RANGE_RE.match((header or '').strip())
+    if not match:
+        raise serializers.ValidationError({'error': 'Content-Range header of the form "bytes start-end/size" is required.'})
+    start, end, total = (int(value) for value in match.groups())
+    if total != size or start > end or end >= size:
+        raise serializers.ValidationError({'error': 'Content-Range does not fit this upload.'})
+    if end - start + 1 > settings.UPLOAD_CHUNK_SIZE:
+        raise serializers.ValidationError({'error': f"Chunks may be at most {settings.UPLOAD_CHUNK_SIZE} bytes."})
+    return start, end
+
+
+def write_chunk(session, start, end, stream):
+    """Copy bytes start..end (inclusive) from `stream` into the partial file.
+
+    The offset only advances after the bytes are on disk, and only if nobody
+    else advanced it first, so a retried or duplicated chunk is harmless.
+    """
+    if session.status != 'Open':
+        raise serializers.ValidationError({'error': f"Upload is already {session.status.lower()}."})
+    if start != session.offset:
+        raise OffsetConflict(session.offset)
+
+    length = end - start + 1
+    with open(partial_path(session), 'r+b') as fh:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = stream.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            fh.write(chunk)
+            remaining -= len(chunk)
+    if remaining:
+        # Client went away mid-chunk; the offset is unchanged so it resumes here.
+        raise serializers.ValidationError({'error': 'Chunk body is shorter than its Content-Range.', 'offset': start})
+
+    new_offset = end + 1
+    advanced = UploadSession.objects.filter(pk=session.pk, status='Open', offset=start).update(
+        offset=new_offset,
+        status='Complete' if new_offset == session.size else 'Open',
+        updated_at=timezone.now(),
+    )
+    if not advanced:
+        session.refresh_from_db(fields=['offset'])
+        raise OffsetConflict(session.offset)
+    return new_offset
+
+
+def discard_session(session):
+    try:
+        os.remove(partial_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def _final_name(session):
+    # The session id is unique, so the name is never reused for other bytes and
+    # matches utils.media's hashed-name pattern (served as immutable).
+    stem, ext = posixpath.splitext(session.filename)
+    stem = slugify(stem)[:40] or 'image'
+    return posixpath.join(GALLERY_DIR, f"{stem}.{session.pk.hex[:12]}{ext.lower()}")
+
+
+def _move_into_media(source, name):
+    destination = os.path.join(settings.MEDIA_ROOT, name)
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    try:
+        os.replace(source, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        shutil.move(source, destination)  # upload dir is on another filesystem
+
+
+def attach_uploads(product, upload_ids):
+    """Attach completed uploads to `product`; returns the new ProductImages."""
+    sessions = list(UploadSession.objects.filter(pk__in=upload_ids, product=product, status='Complete'))
+    images = []
+    with transaction.atomic():
+        for session in sessions:
+            # Claim first so two concurrent attach calls can't both move the file.
+            if not UploadSession.objects.filter(pk=session.pk, status='Complete').update(status='Attached'):
+                continue
+            name = _final_name(session)
+            _move_into_media(partial_path(session), name)
+            images.append(ProductImage(product=product, image=name))
+        ProductImage.objects.bulk_create(images)
+        image_ids = [image.pk for image in images]
+        transaction.on_commit(lambda: verify_in_background(image_ids))
+    return images
+
+
+def verify_images(image_ids):
+    """Drop gallery images whose files Pillow can't decode."""
+    from PIL import Image
+
+    for image in ProductImage.objects.filter(pk__in=image_ids):
+        try:
+            with Image.open(image.image.path) as img:
+                img.verify()
+        except Exception:
+            image.image.delete(save=False)
+            image.delete()
+
+
+def _verify_async(image_ids):
+    try:
+        verify_images(image_ids)
+    except Exception as e:
+        print(f"Image verification failed for {image_ids}: {e}")
+    finally:
+        connections.close_all()
+
+
+def verify_in_background(image_ids):
+    if image_ids:
+        Thread(target=_verify_async, args=(image_ids,)).start()
+
+
+def expire_sessions(max_age=None):
+    """Remove unattached sessions (and their partial files) older than max_age."""
+    max_age = max_age or timedelta(hours=settings.UPLOAD_SESSION_TTL_HOURS)
+    stale = UploadSession.objects.filter(updated_at__lt=timezone.now() - max_age).exclude(status='Attached')
+    count = 0
+    for session in stale.iterator():
+        discard_session(session)
+        count += 1
+    UploadSession.objects.filter(status='Attached', updated_at__lt=timezone.now() - max_age).delete()
+    return count
@@ -1,9 +1,15 @@
-from rest_framework import viewsets, permissions
-from .models import Category, SubCategory, Product, ProductImage, Banner, SiteSettings, Coupon, FooterSection, FooterLink, ShippingLocation, CouponRule
+from django.core.exceptions import ValidationError
+from rest_framework import mixins, viewsets, permissions
+from utils.cache_tags import etag_matches
+from utils.db_router import ReplicaReadsMixin
+from utils.sparse_fields import SparseFieldsetViewMixin
+from .inventory import shard_total
+from .models import Category, SubCategory, Product, ProductImage, Banner, SiteSettings, Coupon, FooterSection, FooterLink, ShippingLocation, CouponRule, UploadSession, ProductRecommendation
 from .serializers import (
     CategorySerializer, SubCategorySerializer, ProductSerializer, BannerSerializer, 
     SiteSettingsSerializer, CouponSerializer, FooterLinkSerializer, FooterSectionSerializer, ShippingLocationSerializer,
-    ReviewSerializer, CouponRuleSerializer
+    ReviewSerializer, CouponRuleSerializer, ProductImageSerializer, UploadSessionSerializer,
+    ProductCardSerializer
 )
 
 class IsAdminOrReadOnly(permissions.BasePermission):
@@ -12,12 +18,12 @@ class IsAdminOrReadOnly(permissions.BasePermission):
             return True
         return request.user and request.user.is_staff
 
-class FooterLinkViewSet(viewsets.ModelViewSet):
+class FooterLinkViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = FooterLink.objects.all()
     serializer_class = FooterLinkSerializer
     permission_classes = [IsAdminOrReadOnly]
 
-class FooterSectionViewSet(viewsets.ModelViewSet):
+class FooterSectionViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = FooterSection.objects.all()
     serializer_class = FooterSectionSerializer
     permission_classes = [IsAdminOrReadOnly]
@@ -27,7 +33,7 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.decorators import action
 from rest_framework.response import Response
 
-class SiteSettingsViewSet(viewsets.GenericViewSet):
+class SiteSettingsViewSet(SparseFieldsetViewMixin, viewsets.GenericViewSet):
     serializer_class = SiteSettingsSerializer
     permission_classes = [IsAdminOrReadOnly]
 
@@ -35,7 +41,7 @@ class SiteSettingsViewSet(viewsets.GenericViewSet):
         return SiteSettings.objects.filter(pk=1)
 
     def list(self, request):
-        settings = SiteSettings.load()
+        settings = SiteSettings.cached()
         serializer = self.get_serializer(settings)
         return Response(serializer.data)
 
@@ -47,58 +53,107 @@ class SiteSettingsViewSet(viewsets.GenericViewSet):
         return Response(serializer.data)
 
 from django.utils import timezone
+from utils.throttling import SlidingWindowThrottle
 
-class CouponViewSet(viewsets.ModelViewSet):
-    queryset = Coupon.objects.all().order_by('-created_at')
+class CouponViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    # Campaign codes are managed through their rule (coupon-rules/{id}/codes/).
+    queryset = Coupon.objects.filter(campaign__isnull=True).order_by('-created_at')
     serializer_class = CouponSerializer
     permission_classes = [IsAdminOrReadOnly]
+    throttle_scope = None  # set per action
 
-    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny])
+    @action(detail=False, methods=['post'], permission_classes=[permissions.AllowAny],
+            throttle_classes=[SlidingWindowThrottle], throttle_scope='coupon_apply')
     def apply(self, request):
+        from .coupons import CouponError, check_coupon
+
         code = request.data.get('code')
         amount = request.data.get('amount', 0)
         
         try:
             coupon = Coupon.objects.get(code=code, is_active=True)
-            
-            # Check expiry
-            if coupon.expiry_date < timezone.now():
-                return Response({'error': 'Coupon has expired.'}, status=400)
-            
-            # Check min purchase
-            if float(amount) < float(coupon.min_purchase):
-                return Response({'error': f'Minimum purchase of ৳{coupon.min_purchase} required.'}, status=400)
-            
-            return Response({
-                'code': coupon.code,
-                'discount_type': coupon.discount_type,
-                'discount_value': coupon.discount_value
-            })
-            
         except Coupon.DoesNotExist:
             return Response({'error': 'Invalid coupon code.'}, status=404)
 
-class CouponRuleViewSet(viewsets.ModelViewSet):
+        # Expiry, minimum purchase and redemption caps; checkout enforces
+        # them again when the coupon is actually redeemed.
+        try:
+            check_coupon(coupon, amount or 0, request.user)
+        except CouponError as e:
+            return Response({'error': str(e)}, status=400)
+        except ArithmeticError:
+            return Response({'error': 'Invalid amount.'}, status=400)
+
+        return Response({
+            'code': coupon.code,
+            'discount_type': coupon.discount_type,
+            'discount_value': coupon.discount_value
+        })
+
+class CouponRuleViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = CouponRule.objects.all().order_by('-created_at')
     serializer_class = CouponRuleSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    @action(detail=True, methods=['get'], permission_classes=[permissions.IsAdminUser])
+    def codes(self, request, pk=None):
+        from django.http import StreamingHttpResponse
+        from .campaigns import iter_codes_csv
+
+        rule = self.get_object()
+        response = StreamingHttpResponse(iter_codes_csv(rule), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="coupon-rule-{rule.pk}-codes.csv"'
+        return response
+
 
 from rest_framework.parsers import MultiPartParser, FormParser, JSONParser
 
-class BannerViewSet(viewsets.ModelViewSet):
+class BannerViewSet(ReplicaReadsMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    replica_reads = True
     queryset = Banner.objects.all().order_by('-created_at')
     serializer_class = BannerSerializer
     permission_classes = [IsAdminOrReadOnly]
     parser_classes = [MultiPartParser, FormParser, JSONParser]
 
-class CategoryViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        # Staff manage every banner; the storefront only sees active ones.
+        if self.request.user.is_staff:
+            return self.queryset
+        return self.queryset.filter(is_active=True)
+
+class HomeViewSet(viewsets.ViewSet):
+    """Everything the landing page needs in one cached response."""
+    permission_classes = [permissions.AllowAny]
+
+    def list(self, request):
+        from .home import get_home_document
+
+        document, version = get_home_document()
+        etag = f'"home-{version}"'
+        if etag_matches(request, etag):
+            return Response(status=304, headers={'ETag': etag})
+        return Response(document, headers={'ETag': etag})
+
+class CategoryViewSet(ReplicaReadsMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    replica_reads = True
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     lookup_field = 'slug'
     permission_classes = [IsAdminOrReadOnly]
 
-class SubCategoryViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['get'])
+    def tree(self, request):
+        # Cached navigation document with live product counts; see store.navigation.
+        from .navigation import get_navigation_tree
+
+        tree, version = get_navigation_tree()
+        etag = f'"nav-{version}"'
+        if etag_matches(request, etag):
+            return Response(status=304, headers={'ETag': etag})
+        return Response({'version': version, 'categories': tree}, headers={'ETag': etag})
+
+class SubCategoryViewSet(ReplicaReadsMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    replica_reads = True
     queryset = SubCategory.objects.all()
     serializer_class = SubCategorySerializer
     lookup_field = 'slug'
@@ -111,13 +166,38 @@ class SubCategoryViewSet(viewsets.ModelViewSet):
             slug = f"{slug}-{SubCategory.objects.count()}"
         serializer.save(slug=slug)
 
+from decimal import Decimal, InvalidOperation
 from django.utils.text import slugify
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ReplicaReadsMixin, SparseFieldsetViewMixin, viewsets.ModelViewSet):
+    replica_reads = True
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     lookup_field = 'slug'
     permission_classes = [IsAdminOrReadOnly]
+    # ShardedStockMixin decides per row whether to add the shards.
+    sparse_required_columns = ['sharded_stock']
+    # ?ordering= values; prices sort on the materialized sale price.
+    ORDERINGS = {'price': 'effective_price', '-price': '-effective_price', 'newest': '-created_at'}
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.request.method == 'GET':
+            queryset = queryset.annotate(shards_total=shard_total())
+        if self.action != 'list':
+            return queryset
+        params = self.request.query_params
+        for param, lookup in (('min_price', 'effective_price__gte'), ('max_price', 'effective_price__lte')):
+            try:
+                value = Decimal(params[param])
+            except (KeyError, InvalidOperation):
+                continue
+            if value.is_finite():  # NaN/Infinity parse, but can't be compared
+                queryset = queryset.filter(**{lookup: value})
+        ordering = self.ORDERINGS.get(params.get('ordering'))
+        if ordering:
+            queryset = queryset.order_by(ordering, 'pk')
+        return queryset
 
     def perform_create(self, serializer):
         name = serializer.validated_data.get('name')
@@ -125,19 +205,103 @@ class ProductViewSet(viewsets.ModelViewSet):
         if Product.objects.filter(slug=slug).exists():
             slug = f"{slug}-{Product.objects.count()}"
         product = serializer.save(slug=slug)
-        
-        # Handle multiple images
-        images = self.request.FILES.getlist('uploaded_images')
-        for image in images:
-            ProductImage.objects.create(product=product, image=image)
+        self._attach_posted_images(product)
 
     def perform_update(self, serializer):
         product = serializer.save()
+        self._attach_posted_images(product)
+
+    def _attach_posted_images(self, product):
+        # Small galleries can still be posted inline; large ones should use the
+        # chunked upload endpoints and `images` below.
         images = self.request.FILES.getlist('uploaded_images')
-        for image in images:
-            ProductImage.objects.create(product=product, image=image)
+        if images:
+            ProductImage.objects.bulk_create([ProductImage(product=product, image=image) for image in images])
+
+    @action(detail=True, methods=['post'])
+    def images(self, request, slug=None):
+        """Attach completed chunked uploads (see store.uploads) to this product."""
+        from .uploads import attach_uploads
+
+        upload_ids = request.data.get('uploads')
+        if not isinstance(upload_ids, list) or not upload_ids:
+            return Response({'error': 'uploads must be a non-empty list of upload ids.'}, status=400)
+        product = self.get_object()
+        try:
+            images = attach_uploads(product, upload_ids)
+        except ValidationError:
+            return Response({'error': 'Invalid upload id.'}, status=400)
+        serializer = ProductImageSerializer(images, many=True, context=self.get_serializer_context())
+        return Response(serializer.data, status=201)
+
+    @action(detail=True, methods=['get'])
+    def recommendations(self, request, slug=None):
+        """Precomputed "frequently bought together" products, best first."""
+        rows = (
+            ProductRecommendation.objects
+            .filter(product__slug=slug, recommended__is_available=True)
+            .select_related('recommended__category')
+            .annotate(recommended_shards=shard_total('recommended_id'))
+            .order_by('rank')
+        )
+        products = []
+        for row in rows:
+            row.recommended.shards_total = row.recommended_shards
+            products.append(row.recommended)
+        return Response(ProductCardSerializer(products, many=True, context=self.get_serializer_context()).data)
+
+    @action(detail=True, methods=['get'])
+    def similar(self, request, slug=None):
+        """Nearest neighbours from the content similarity index."""
+        from .similarity import similar_products
+
+        product_id = Product.objects.filter(slug=slug).values_list('id', flat=True).first()
+        if product_id is None:
+            return Response({'error': 'Product not found.'}, status=404)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 8)), 24))
+        except ValueError:
+            limit = 8
+        # Over-fetch a little so unavailable products can be dropped.
+        ids = similar_products(product_id, limit * 2)
+        products = (
+            Product.objects.filter(id__in=ids, is_available=True)
+            .select_related('category').annotate(shards_total=shard_total())
+        )
+        ranked = sorted(products, key=lambda product: ids.index(product.id))[:limit]
+        return Response(ProductCardSerializer(ranked, many=True, context=self.get_serializer_context()).data)
+
+class UploadSessionViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.DestroyModelMixin,
+                           viewsets.GenericViewSet):
+    """Resumable chunked image uploads; see store.uploads for the protocol."""
+    serializer_class = UploadSessionSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+    def get_queryset(self):
+        return UploadSession.objects.filter(user=self.request.user)
+
+    def perform_create(self, serializer):
+        from .uploads import open_session
+
+        data = serializer.validated_data
+        serializer.instance = open_session(data['product'], self.request.user, data['filename'], data['size'])
+
+    def perform_destroy(self, instance):
+        from .uploads import discard_session
+
+        discard_session(instance)
+
+    @action(detail=True, methods=['put'], parser_classes=[])
+    def chunk(self, request, pk=None):
+        from .uploads import parse_content_range, write_chunk
+
+        session = self.get_object()
+        start, end = parse_content_range(request.headers.get('Content-Range'), session.size)
+        # Read the raw body stream; request.data would buffer the whole chunk.
+        offset = write_chunk(session, start, end, request.stream)
+        return Response({'offset': offset, 'status': 'Complete' if offset == session.size else 'Open'})
 
-class ShippingLocationViewSet(viewsets.ModelViewSet):
+class ShippingLocationViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     queryset = ShippingLocation.objects.all().order_by('name')
     serializer_class = ShippingLocationSerializer
     permission_classes = [IsAdminOrReadOnly]
@@ -145,7 +309,7 @@ class ShippingLocationViewSet(viewsets.ModelViewSet):
 from apps.orders.models import Order
 from .models import Review
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(SparseFieldsetViewMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     pagination_class = None # Show all reviews
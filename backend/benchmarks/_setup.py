@@ -0,0 +1,22 @@
+"""Shared bootstrap for the scripts in this package.
+
+Run benchmarks from backend/, e.g. `python -m benchmarks.bench_throttling`.
+"""
+import os
+
+import django
+
+
+def setup():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    django.setup()
+
+
+def test_database():
+    """Create a throwaway test database so benchmarks never touch real data."""
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    return lambda: connection.creation.destroy_test_db(old_name, verbosity=0)
@@ -0,0 +1,104 @@
+"""Encode time and bytes on the wire for the product and order list endpoints.
+
+Seeds a throwaway test database, then renders the product and order list
+payloads with DRF's JSONRenderer and utils.renderers.ORJSONRenderer and
+reports the compressed size for each codec CompressionMiddleware can use.
+
+    python -m benchmarks.bench_renderers [--products 2000] [--orders 2000]
+"""
+import argparse
+import time
+
+from benchmarks._setup import setup, test_database
+
+setup()
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from utils import middleware
+from utils.renderers import ORJSONRenderer
+
+
+def seed(products, orders):
+    from apps.accounts.models import User
+    from apps.orders.models import Order, OrderItem
+    from apps.store.models import Category, Product, ProductImage, SubCategory
+
+    user = User.objects.create_user('bench@example.com', 'bench', is_staff=True)
+    categories = [Category.objects.create(name=f"Category {i}", slug=f"category-{i}") for i in range(10)]
+    subcategories = [SubCategory.objects.create(category=c, name=f"{c.name} sub", slug=f"{c.slug}-sub") for c in categories]
+    Product.objects.bulk_create([
+        Product(
+            category=categories[i % 10], subcategory=subcategories[i % 10],
+            name=f"Product {i}", slug=f"product-{i}",
+            description="Soft cotton shirt with a relaxed fit and mother-of-pearl buttons. " * 4,
+            price=1000 + i, stock=50, image=f"products/product-{i}.jpg",
+            sizes=['S', 'M', 'L', 'XL'], colors=['Black', 'White'],
+        ) for i in range(products)
+    ])
+    product_ids = list(Product.objects.values_list('id', flat=True))
+    ProductImage.objects.bulk_create([ProductImage(product_id=pid, image=f"product_images/{pid}.jpg") for pid in product_ids])
+    Order.objects.bulk_create([
+        Order(user=user, full_name='Bench User', email='bench@example.com', phone='01700000000',
+              address_line_1='House 1, Road 2', city='Dhaka', state='Dhaka', postal_code='1207',
+              country='Bangladesh', total_price=2500, status='Delivered')
+        for _ in range(orders)
+    ])
+    best_sellers = product_ids[:200]
+    OrderItem.objects.bulk_create([
+        OrderItem(order_id=oid, product_id=best_sellers[n % len(best_sellers)], price=1250, quantity=2, size='M')
+        for n, oid in enumerate(Order.objects.values_list('id', flat=True))
+    ])
+    return user
+
+
+def payload(view_class, user, path):
+    request = APIRequestFactory().get(path)
+    force_authenticate(request, user=user)
+    # The view isn't rendered; we only want the serialized data.
+    return view_class.as_view({'get': 'list'})(request).data
+
+
+def measure(renderer, data, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        body = renderer.render(data)
+        best = min(best, time.perf_counter() - start)
+    return best, body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=2000)
+    parser.add_argument('--orders', type=int, default=2000)
+    args = parser.parse_args()
+
+    teardown = test_database()
+    try:
+        from apps.orders.views import OrderViewSet
+        from apps.store.views import ProductViewSet
+
+        user = seed(args.products, args.orders)
+        cases = [
+            ('products/', payload(ProductViewSet, user, '/api/products/')),
+            ('orders/', payload(OrderViewSet, user, '/api/orders/')),
+        ]
+        for label, data in cases:
+            print(f"\n{label} ({len(data)} rows)")
+            for renderer in (JSONRenderer(), ORJSONRenderer()):
+                elapsed, body = measure(renderer, data)
+                print(f"  {type(renderer).__name__:<16} encode {elapsed * 1000:8.2f} ms   {len(body):>10,} bytes")
+            for codec in middleware.CODECS:
+                compressor = codec()
+                start = time.perf_counter()
+                compressed = compressor.compress(body) + compressor.finish()
+                elapsed = time.perf_counter() - start
+                print(f"  {codec.name:<16} +{elapsed * 1000:7.2f} ms   {len(compressed):>10,} bytes on the wire")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Build time and query latency of the similar-products index.
+
+Seeds a throwaway test database with a synthetic catalog, builds the index
+into a temporary SIMILARITY_DIR, then times top-K queries and a single-product
+re-embed.
+
+    python -m benchmarks.bench_similarity [--products 20000] [--queries 500]
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from benchmarks._setup import setup, test_database
+
+setup()
+
+from django.conf import settings
+
+WORDS = (
+    'cotton linen silk wool denim leather suede knit slim relaxed tailored cropped oversized classic '
+    'shirt trousers jacket blazer dress skirt sneaker loafer boot scarf belt wallet bag watch summer '
+    'winter formal casual stretch breathable handmade organic premium vintage striped plain printed'
+).split()
+COLORS = ['Black', 'White', 'Navy', 'Olive', 'Beige', 'Maroon', 'Grey']
+SIZES = ['XS', 'S', 'M', 'L', 'XL', 'XXL']
+
+
+def seed(products):
+    from apps.store.models import Category, Product, SubCategory
+
+    rng = random.Random(7)
+    categories = [Category.objects.create(name=f"Category {i}", slug=f"category-{i}") for i in range(12)]
+    subcategories = [
+        SubCategory.objects.create(category=c, name=f"{c.name} {j}", slug=f"{c.slug}-{j}")
+        for c in categories for j in range(4)
+    ]
+    batch = []
+    for i in range(products):
+        subcategory = rng.choice(subcategories)
+        batch.append(Product(
+            category_id=subcategory.category_id, subcategory=subcategory,
+            name=' '.join(rng.sample(WORDS, 3)).title(), slug=f"product-{i}",
+            description=' '.join(rng.choices(WORDS, k=30)),
+            price=rng.randint(500, 20000), stock=10, image=f"products/{i}.jpg",
+            sizes=rng.sample(SIZES, 3), colors=rng.sample(COLORS, 2),
+        ))
+        if len(batch) == 2000:
+            Product.objects.bulk_create(batch)
+            batch = []
+    Product.objects.bulk_create(batch)
+    return list(Product.objects.values_list('id', flat=True))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--products', type=int, default=20000)
+    parser.add_argument('--queries', type=int, default=500)
+    args = parser.parse_args()
+
+    teardown = test_database()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            settings.SIMILARITY_DIR = directory
+            from apps.store.models import Product
+            from apps.store.similarity import build_index, similar_products, update_products
+
+            ids = seed(args.products)
+
+            start = time.perf_counter()
+            build_index()
+            print(f"build_index: {args.products} products in {time.perf_counter() - start:.2f}s")
+
+            similar_products(ids[0])  # open the memory map
+            rng = random.Random(1)
+            timings = []
+            for product_id in rng.choices(ids, k=args.queries):
+                start = time.perf_counter()
+                similar_products(product_id, 8)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            print(f"similar_products(k=8): p50 {timings[len(timings) // 2] * 1000:.2f} ms, "
+                  f"p99 {timings[int(len(timings) * 0.99)] * 1000:.2f} ms")
+
+            Product.objects.filter(pk=ids[0]).update(description='waterproof hiking boot')
+            start = time.perf_counter()
+            update_products([ids[0]])
+            print(f"update_products(1 product): {(time.perf_counter() - start) * 1000:.2f} ms")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""Checkout throughput on one hot product: single stock row vs sharded stock.
+
+Each worker thread reserves one unit at a time inside a transaction that
+stays open for --hold-ms, standing in for the rest of checkout (order rows,
+coupon, outbox event). With a single row every transaction queues on that
+row's lock. With shards, concurrent transactions mostly lock different rows.
+
+    python -m benchmarks.bench_stock_contention [--threads 16] [--orders 2000] [--shards 8] [--hold-ms 2]
+
+Row locks only help on a database that has them. SQLite takes one write lock
+for the whole database, so both modes come out about the same there. Point
+DATABASES at PostgreSQL to see the difference.
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks._setup import setup, test_database
+
+setup()
+
+from django.db import connection, connections, transaction
+
+
+def run(product, threads, orders, hold):
+    from apps.store.inventory import InsufficientStock, reserve_stock
+
+    per_thread = orders // threads
+    errors = []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        try:
+            for _ in range(per_thread):
+                with transaction.atomic():
+                    reserve_stock(product, 1)
+                    if hold:
+                        time.sleep(hold)
+        except InsufficientStock as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise errors[0]
+    return per_thread * threads, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--orders', type=int, default=2000)
+    parser.add_argument('--shards', type=int, default=8)
+    parser.add_argument('--hold-ms', type=float, default=2)
+    args = parser.parse_args()
+
+    if connection.vendor == 'sqlite':
+        # Worker threads need their own connections to a real file, and
+        # should wait for the write lock instead of failing on it.
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tempfile.mkdtemp(), 'bench.sqlite3')
+        connection.settings_dict['OPTIONS'].setdefault('timeout', 60)
+        connection.settings_dict['OPTIONS'].setdefault('transaction_mode', 'IMMEDIATE')
+
+    teardown = test_database()
+    try:
+        from apps.store.inventory import available_stock, shard_stock
+        from apps.store.models import Category, Product
+
+        category = Category.objects.create(name='Drops', slug='drops')
+        stock = args.orders + args.threads
+        print(f"{connection.vendor}, {args.threads} threads, {args.orders} orders, hold {args.hold_ms} ms")
+        for mode in ('single row', f"{args.shards} shards"):
+            product = Product.objects.create(
+                category=category, name=mode, slug=mode.replace(' ', '-'), description='',
+                price=100, stock=stock, image='products/drop.jpg',
+            )
+            if mode != 'single row':
+                shard_stock(product, args.shards)
+                product.refresh_from_db()
+            connection.close()  # let the workers have the database
+            done, elapsed = run(product, args.threads, args.orders, args.hold_ms / 1000)
+            left = available_stock(product)
+            assert left == stock - done, f"expected {stock - done} left, found {left}"
+            print(f"{mode:>12}: {done / elapsed:8.0f} reservations/s ({elapsed:.2f}s), {left} left")
+    finally:
+        teardown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+"""Per-request cost of utils.throttling.SlidingWindowThrottle.
+
+Compares no throttling, DRF's AnonRateThrottle and the sliding-window
+throttle against the configured cache backend (LocMem unless REDIS_URL is
+set) and against the in-memory fallback.
+"""
+import time
+
+from benchmarks._setup import setup
+
+setup()
+
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+from rest_framework.settings import api_settings
+from rest_framework.throttling import AnonRateThrottle
+
+from utils.throttling import SlidingWindowThrottle
+
+ITERATIONS = 20000
+RATES = {'bench': '1000000/min', 'bench.ip': '1000000/min', 'bench.route': '1000000/min', 'anon': '1000000/min'}
+
+
+class View:
+    throttle_scope = 'bench'
+
+
+def run(label, throttle_factory):
+    request = RequestFactory().post('/api/auth/login/', REMOTE_ADDR='10.0.0.1')
+    request.user = AnonymousUser()
+    view = View()
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        if throttle_factory is not None:
+            throttle_factory().allow_request(request, view)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<40} {elapsed / ITERATIONS * 1e6:8.2f} us/request")
+
+
+def main():
+    with mock.patch.object(api_settings, 'DEFAULT_THROTTLE_RATES', RATES), \
+            mock.patch.object(AnonRateThrottle, 'THROTTLE_RATES', RATES):
+        run('no throttle', None)
+        run('DRF AnonRateThrottle', AnonRateThrottle)
+        run('SlidingWindowThrottle (cache, 3 rates)', SlidingWindowThrottle)
+        with mock.patch('utils.throttling.cache.add', side_effect=ConnectionError):
+            run('SlidingWindowThrottle (memory fallback)', SlidingWindowThrottle)
+
+
+if __name__ == '__main__':
+    main()
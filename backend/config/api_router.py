@@ -2,7 +2,7 @@ from rest_framework.routers import DefaultRouter
 from apps.store.views import (
     CategoryViewSet, ProductViewSet, SubCategoryViewSet, BannerViewSet, 
     SiteSettingsViewSet, CouponViewSet, FooterSectionViewSet, FooterLinkViewSet, ShippingLocationViewSet,
-    ReviewViewSet, CouponRuleViewSet
+    ReviewViewSet, CouponRuleViewSet, HomeViewSet, UploadSessionViewSet
 )
 from apps.orders.views import OrderViewSet, ReturnRequestViewSet
 from apps.accounts.views import AuthViewSet, AddressViewSet, UserViewSet
@@ -24,5 +24,7 @@ router.register(r'footer-sections', FooterSectionViewSet)
 router.register(r'footer-links', FooterLinkViewSet)
 router.register(r'shipping-locations', ShippingLocationViewSet)
 router.register(r'reviews', ReviewViewSet, basename='reviews')
+router.register(r'home', HomeViewSet, basename='home')
+router.register(r'uploads', UploadSessionViewSet, basename='uploads')
 
 urlpatterns = router.urls
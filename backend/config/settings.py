@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
 import os
+from datetime import timedelta
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -31,6 +32,15 @@ DEBUG = os.getenv('DEBUG', 'False') == 'True'
 
 ALLOWED_HOSTS = os.getenv('ALLOWED_HOSTS', '*').split(',')
 
+# API-only workers skip the admin (jazzmin), sessions, messages, static files,
+# templates and the browsable API, which they never serve, to start faster. Run the
+# admin from a separate deployment with API_ONLY off; `manage.py
+# import_profile` shows what each mode imports.
+API_ONLY = os.getenv('API_ONLY', 'False') == 'True'
+# Milliseconds from `import django` until the WSGI app and URLconf are loaded
+# in a fresh process; enforced by `import_profile --budget` and the store tests.
+COLD_START_BUDGET_MS = int(os.getenv('COLD_START_BUDGET_MS', 1500))
+
 
 # Application definition
 
@@ -51,11 +61,22 @@ INSTALLED_APPS = [
     'corsheaders',
 
     # Local apps
+    'apps.events',
     'apps.accounts',
     'apps.store',
     'apps.orders',
 ]
 
+ADMIN_ONLY_APPS = [
+    'jazzmin',
+    'django.contrib.admin',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+]
+
+if API_ONLY:
+    INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in ADMIN_ONLY_APPS]
+
 JAZZMIN_SETTINGS = {
     "site_title": "LuxStore Admin",
     "site_header": "LuxStore",
@@ -84,23 +105,70 @@ JAZZMIN_SETTINGS = {
 }
 
 REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'utils.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'utils.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'apps.accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # Reverse proxies in front of the app. Throttles identify anonymous clients
+    # by the address this many hops back in X-Forwarded-For; with 0 they use
+    # REMOTE_ADDR, so a client can't pick its own identity by sending the header.
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES', 0)),
+    # Used by utils.throttling.SlidingWindowThrottle; see its docstring for the
+    # '<scope>', '<scope>.ip' and '<scope>.route' keys.
+    'DEFAULT_THROTTLE_RATES': {
+        'login': '5/min',
+        'login.ip': '20/min',
+        'register': '5/hour',
+        'register.ip': '20/hour',
+        'coupon_apply': '10/min',
+        'coupon_apply.ip': '30/min',
+        'payment_init': '10/min',
+        'payment_init.ip': '30/min',
+    },
 }
 
+if API_ONLY:
+    # The storefront sends `Authorization: Token ...`; sessions only back the
+    # admin and the browsable API.
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'].remove('rest_framework.renderers.BrowsableAPIRenderer')
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'].remove('rest_framework.authentication.SessionAuthentication')
+
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'utils.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'utils.db_router.ReadYourWritesMiddleware',
 ]
 
+ADMIN_ONLY_MIDDLEWARE = [
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+]
+
+if API_ONLY:
+    MIDDLEWARE = [name for name in MIDDLEWARE if name not in ADMIN_ONLY_MIDDLEWARE]
+
+# Responses below this many bytes are sent uncompressed.
+# Install `brotli` and/or `zstandard` to offer br/zstd alongside gzip.
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 860))
+
 ROOT_URLCONF = 'config.urls'
 
 TEMPLATES = [
@@ -118,6 +186,9 @@ TEMPLATES = [
     },
 ]
 
+if API_ONLY:
+    TEMPLATES = []
+
 WSGI_APPLICATION = 'config.wsgi.application'
 
 
@@ -131,6 +202,42 @@ DATABASES = {
     }
 }
 
+# Read replicas (utils/db_router.py). For local testing, DATABASE_REPLICAS
+# takes comma separated SQLite files, e.g. copies of db.sqlite3; production
+# adds its PostgreSQL replicas as further aliases here. Tests read from
+# `default` through TEST MIRROR.
+for _index, _name in enumerate(filter(None, os.getenv('DATABASE_REPLICAS', '').split(',')), start=1):
+    DATABASES[f'replica{_index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': _name.strip(),
+        'TEST': {'MIRROR': 'default'},
+    }
+
+REPLICA_DATABASES = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['utils.db_router.PrimaryReplicaRouter']
+# How long a client that just wrote keeps reading from the primary.
+READ_YOUR_WRITES_SECONDS = int(os.getenv('READ_YOUR_WRITES_SECONDS', 10))
+
+
+# Cache
+# Set REDIS_URL to share cached data (auth tokens etc.) across worker processes.
+
+REDIS_URL = os.getenv('REDIS_URL', '')
+
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -172,10 +279,84 @@ STATIC_ROOT = BASE_DIR / 'static'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Uploads are stored under content-hashed names (see utils.media) so they can
+# be cached forever by browsers and CDNs.
+STORAGES = {
+    'default': {
+        'BACKEND': 'utils.media.HashedMediaStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Offload media bytes to the web server in production. With nginx, point
+# MEDIA_ACCEL_REDIRECT_PREFIX at an `internal` location aliased to MEDIA_ROOT;
+# with Apache/lighttpd enable MEDIA_SENDFILE instead.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '')
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', 'False') == 'True'
+
+# Chunked gallery uploads (see apps/store/uploads.py). Keep the partial-file
+# directory on the same filesystem as MEDIA_ROOT so attaching is a rename.
+CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR', BASE_DIR / 'var' / 'uploads')
+UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 5 * 1024 * 1024))
+UPLOAD_MAX_SIZE = int(os.getenv('UPLOAD_MAX_SIZE', 30 * 1024 * 1024))
+UPLOAD_SESSION_TTL_HOURS = int(os.getenv('UPLOAD_SESSION_TTL_HOURS', 24))
+
+# "Frequently bought together" (apps/store/recommendations.py); refresh with
+# `manage.py build_recommendations` from cron.
+RECOMMENDATIONS_DIR = os.getenv('RECOMMENDATIONS_DIR', BASE_DIR / 'var' / 'recommendations')
+RECOMMENDATIONS_TOP_K = 12
+RECOMMENDATIONS_METRIC = os.getenv('RECOMMENDATIONS_METRIC', 'cosine')
+
+# "Similar products" index (apps/store/similarity.py); rebuild with
+# `manage.py build_similarity_index` after bulk catalog imports.
+SIMILARITY_DIR = os.getenv('SIMILARITY_DIR', BASE_DIR / 'var' / 'similarity')
+SIMILARITY_DIMENSIONS = int(os.getenv('SIMILARITY_DIMENSIONS', 1024))
+
+# Domain events (apps/events). With EVENTS_DISPATCH_IN_PROCESS off, run
+# `manage.py dispatch_events --loop` as a separate worker instead.
+EVENTS_DISPATCH_IN_PROCESS = os.getenv('EVENTS_DISPATCH_IN_PROCESS', 'True') == 'True'
+EVENTS_MAX_ATTEMPTS = int(os.getenv('EVENTS_MAX_ATTEMPTS', 8))
+EVENTS_LEASE_SECONDS = 60
+EVENTS_POLL_SECONDS = 5
+# Delivered events are deleted after this many days by `manage.py prune_events`
+# (run it daily from cron). Failed events are kept for inspection.
+EVENTS_RETENTION_DAYS = int(os.getenv('EVENTS_RETENTION_DAYS', 7))
+
+# Admin changelists on large tables (utils/admin.py) count at most this many
+# matching rows instead of running an exact COUNT(*).
+ADMIN_COUNT_LIMIT = int(os.getenv('ADMIN_COUNT_LIMIT', 10000))
+
+# Campaign mail (apps/accounts/mailer.py): recipients loaded and sent per
+# chunk over one SMTP connection, never faster than MAIL_RATE_PER_SECOND.
+MAIL_CHUNK_SIZE = int(os.getenv('MAIL_CHUNK_SIZE', 500))
+MAIL_RATE_PER_SECOND = int(os.getenv('MAIL_RATE_PER_SECOND', 14))
+
+# Scheduled sales (apps/store/pricing.py). Run `manage.py sweep_prices --loop`
+# as a worker (or sweep_prices from cron); with the loop, sales start and end
+# within this many seconds of their window.
+PRICE_SWEEP_SECONDS = int(os.getenv('PRICE_SWEEP_SECONDS', 30))
+
+# Counter rows a product's stock is split over once sharded (apps/store/inventory.py).
+STOCK_SHARDS = int(os.getenv('STOCK_SHARDS', 8))
+
+# Stock ledger snapshots (apps/store/stock_ledger.py). Run `manage.py
+# snapshot_stock` and `reconcile_stock` from cron. Snapshots only fold in
+# movements older than this, so transactions still in flight when the snapshot
+# is taken are not missed.
+STOCK_SNAPSHOT_LAG_SECONDS = int(os.getenv('STOCK_SNAPSHOT_LAG_SECONDS', 300))
+
 AUTH_USER_MODEL = 'accounts.User'
 
 CORS_ALLOW_ALL_ORIGINS = True  # For development convenience
 
+# Token authentication
+TOKEN_EXPIRY = timedelta(days=int(os.getenv('TOKEN_EXPIRY_DAYS', 30)))
+TOKEN_CACHE_TTL = int(os.getenv('TOKEN_CACHE_TTL', 300))  # seconds, shared cache
+TOKEN_LOCAL_CACHE_TTL = int(os.getenv('TOKEN_LOCAL_CACHE_TTL', 10))  # seconds, per process
+TOKEN_LOCAL_CACHE_SIZE = 10000
+
 # SSLCommerz Configuration
 SSL_STORE_ID = os.getenv('SSL_STORE_ID', 'testbox')
 SSL_STORE_PASSWORD = os.getenv('SSL_STORE_PASSWORD', 'testbox')
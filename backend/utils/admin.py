@@ -0,0 +1,55 @@
+"""Admin building blocks for tables with millions of rows.
+
+Django's changelist runs an exact COUNT(*) for the paginator and another for
+the "N total" link on every page view. LargeTableAdmin replaces both:
+
+- unfiltered changelists on PostgreSQL use the planner's row estimate
+  (pg_class.reltuples), which is free to read;
+- everything else counts at most ADMIN_COUNT_LIMIT rows, so a broad filter
+  stops counting early instead of walking the whole table. Narrow the filter
+  to page further.
+
+A purely numeric search term also matches the row with that primary key, on
+top of the usual search_fields matches (postal codes, phone numbers, ...).
+"""
+from django.conf import settings
+from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using):
+    """Planner estimate of the table's row count, or None if there isn't one."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 until the table is first vacuumed or analyzed.
+    return row[0] if row and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        limit = settings.ADMIN_COUNT_LIMIT
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > limit:
+                return estimate
+        return queryset.order_by()[:limit].count()
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_search_results(self, request, queryset, search_term):
+        results, may_have_duplicates = super().get_search_results(request, queryset, search_term)
+        term = search_term.strip()
+        if term.isdigit():
+            results = results | queryset.filter(pk=int(term))
+        return results, may_have_duplicates
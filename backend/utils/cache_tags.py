@@ -0,0 +1,85 @@
+"""Versioned cache documents with tag-based invalidation.
+
+Each tag has a version counter in the cache. A document is stored under a
+key derived from the versions of the tags it depends on, so invalidating a
+tag (bumping its counter) makes every dependent document miss on its next
+read, across all processes sharing the cache.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db import transaction
+
+from utils.db_router import primary_reads
+
+TAG_PREFIX = 'tag-version:'
+DEFAULT_TIMEOUT = 60 * 60
+
+
+def _opaque(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_matches(request, etag):
+    """Whether If-None-Match names `etag`, compared weakly.
+
+    CompressionMiddleware sends compressed responses with `W/"..."`, and
+    clients echo that back, so `W/"x"` and `"x"` must match.
+    """
+    header = request.headers.get('If-None-Match', '')
+    if header.strip() == '*':
+        return True
+    return _opaque(etag) in {_opaque(tag.strip()) for tag in header.split(',')}
+
+
+def tag_versions(tags):
+    keys = [f"{TAG_PREFIX}{tag}" for tag in tags]
+    found = cache.get_many(keys)
+    versions = {}
+    for tag, key in zip(tags, keys):
+        version = found.get(key)
+        if version is None:
+            cache.add(key, 1, None)
+            version = cache.get(key, 1)
+        versions[tag] = version
+    return versions
+
+
+def invalidate_tags(*tags):
+    """Bump the tags' versions once the current transaction commits.
+
+    Bumping earlier would let a concurrent reader rebuild from the old,
+    still-visible data and cache it under the new version.
+    """
+    transaction.on_commit(lambda: _bump(tags))
+
+
+def _bump(tags):
+    for tag in tags:
+        key = f"{TAG_PREFIX}{tag}"
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Unknown tag: nothing was cached against it yet, but start past 1
+            # in case a reader is racing with us.
+            cache.add(key, 2, None)
+
+
+def document_version(tags):
+    versions = tag_versions(tags)
+    raw = '|'.join(f"{tag}={versions[tag]}" for tag in sorted(versions))
+    return hashlib.md5(raw.encode()).hexdigest()[:16]
+
+
+def cached_document(key, tags, builder, timeout=DEFAULT_TIMEOUT):
+    """Return (document, version), building it with `builder()` on a miss."""
+    version = document_version(tags)
+    cache_key = f"{key}:{version}"
+    document = cache.get(cache_key)
+    if document is None:
+        # The tag was bumped when the write hit the primary; a replica may
+        # not have it yet, and the result is cached under the new version.
+        with primary_reads():
+            document = builder()
+        cache.set(cache_key, document, timeout)
+    return document, version
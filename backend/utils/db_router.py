@@ -0,0 +1,108 @@
+"""Primary/replica routing with read-your-writes stickiness.
+
+Writes, migrations and anything inside a transaction go to `default`. Reads
+go to a random alias in REPLICA_DATABASES only while the current request
+allows it, and only viewsets that opt in allow it:
+
+    class ProductViewSet(ReplicaReadsMixin, ..., viewsets.ModelViewSet):
+        replica_reads = True
+
+Everything else (other views, management commands, background threads) keeps
+reading the primary, so code that is sensitive to replication lag never sees
+it by accident.
+
+A client that just wrote something (any successful unsafe request, see
+ReadYourWritesMiddleware) is pinned to the primary for
+READ_YOUR_WRITES_SECONDS. The pin is kept under the user's id in the cache
+and in a short-lived cookie for guests, so the order they just placed or the
+profile they just saved is never read back from a replica that hasn't caught
+up yet.
+
+Code that fills a shared cache reads inside `primary_reads()`: a document
+rebuilt from a lagging replica would be cached under the new tag version
+and served stale until it expires (see utils.cache_tags.cached_document).
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from rest_framework.permissions import SAFE_METHODS
+
+PIN_COOKIE = 'pin_primary'
+PIN_KEY = 'pin-primary:user:{}'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.REPLICA_DATABASES
+        if not replicas or not _replica_reads.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return random.choice(replicas)
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True  # replicas hold the same data as the primary
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def primary_reads():
+    """Read from the primary inside the block, even in a replica-reads request."""
+    token = _replica_reads.set(False)
+    try:
+        yield
+    finally:
+        _replica_reads.reset(token)
+
+
+def is_pinned(request):
+    if PIN_COOKIE in request.COOKIES:
+        return True
+    user = getattr(request, 'user', None)
+    return bool(user is not None and user.is_authenticated and cache.get(PIN_KEY.format(user.pk)))
+
+
+def pin_to_primary(request, response):
+    seconds = settings.READ_YOUR_WRITES_SECONDS
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        cache.set(PIN_KEY.format(user.pk), 1, seconds)
+    response.set_cookie(PIN_COOKIE, '1', max_age=seconds, httponly=True, samesite='Lax')
+
+
+class ReplicaReadsMixin:
+    """Let a viewset's safe requests read from replicas (`replica_reads = True`)."""
+    replica_reads = False
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # After authentication, so a pinned user is recognised.
+        if self.replica_reads and request.method in SAFE_METHODS and not is_pinned(request):
+            _replica_reads.set(True)
+
+
+class ReadYourWritesMiddleware:
+    """Scope replica reads to one request and pin clients that just wrote."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _replica_reads.set(False)
+        try:
+            response = self.get_response(request)
+        finally:
+            _replica_reads.reset(token)
+        if settings.REPLICA_DATABASES and request.method not in SAFE_METHODS and response.status_code < 400:
+            # DRF copies the authenticated user (token auth too) onto the request.
+            pin_to_primary(request, response)
+        return response
@@ -1,23 +1,34 @@
-from django.core.mail import send_mail
 from django.conf import settings
 from threading import Thread
 
 class EmailService:
+    @staticmethod
+    def _deliver(subject, message, recipient_list):
+        # Imported on first send: django.core.mail pulls in the stdlib email
+        # package, which API workers otherwise never need.
+        from django.core.mail import send_mail
+        send_mail(
+            subject,
+            message,
+            settings.EMAIL_HOST_USER or 'noreply@luxstore.com',
+            recipient_list,
+            fail_silently=False,
+        )
+
     @staticmethod
     def _send_async(subject, message, recipient_list):
         try:
-            send_mail(
-                subject,
-                message,
-                settings.EMAIL_HOST_USER or 'noreply@luxstore.com',
-                recipient_list,
-                fail_silently=False,
-            )
+            EmailService._deliver(subject, message, recipient_list)
         except Exception as e:
             print(f"Failed to send email: {e}")
 
     @staticmethod
-    def send_email(subject, message, recipient_list):
+    def send_email(subject, message, recipient_list, background=True):
+        # Event handlers already run off the request and pass background=False
+        # so a failed send raises and the event is retried.
+        if not background:
+            EmailService._deliver(subject, message, recipient_list)
+            return
         # Run in a separate thread to avoid blocking the main request
         Thread(target=EmailService._send_async, args=(subject, message, recipient_list)).start()
 
@@ -28,19 +39,19 @@ class EmailService:
         EmailService.send_email(subject, message, [user.email])
 
     @staticmethod
-    def send_order_confirmation(order):
+    def send_order_confirmation(order, background=True):
         subject = f"Order Confirmation #{order.id}"
         message = f"Hi {order.full_name},\n\nYour order #{order.id} has been placed successfully.\nTotal Amount: {order.total_price}\n\nWe will notify you once it ships.\n\nThank you for shopping with us!"
-        EmailService.send_email(subject, message, [order.email])
+        EmailService.send_email(subject, message, [order.email], background)
 
     @staticmethod
-    def send_order_status_update(order):
+    def send_order_status_update(order, background=True):
         subject = f"Order Update #{order.id}"
         message = f"Hi {order.full_name},\n\nYour order #{order.id} status has been updated to: {order.status}.\n\nTrack your order on our website.\n\nBest,\nLuxStore"
-        EmailService.send_email(subject, message, [order.email])
+        EmailService.send_email(subject, message, [order.email], background)
 
     @staticmethod
-    def send_return_status_update(return_request):
+    def send_return_status_update(return_request, background=True):
         subject = f"Return Request Update #{return_request.id}"
-        message = f"Hi {return_request.user.full_name},\n\nYour return request for Order #{return_request.order.id} has been {return_request.status}.\n\nReason for decision: {return_request.admin_note or 'N/A'}\n\nBest,\nLuxStore"
-        EmailService.send_email(subject, message, [return_request.user.email])
+        message = f"Hi {return_request.user.get_full_name() or return_request.user.email},\n\nYour return request for Order #{return_request.order.id} has been {return_request.status}.\n\nReason for decision: {return_request.admin_note or 'N/A'}\n\nBest,\nLuxStore"
+        EmailService.send_email(subject, message, [return_request.user.email], background)
@@ -0,0 +1,162 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.utils.text import slugify
+
+from utils.cache_tags import etag_matches
+
+HASH_LENGTH = 12
+HASHED_NAME_RE = re.compile(r'\.([0-9a-f]{%d})\.[^./]+$' % HASH_LENGTH)
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+MUTABLE_CACHE_CONTROL = 'public, max-age=3600'
+STREAM_CHUNK_SIZE = 64 * 1024
+
+
+class HashedMediaStorage(FileSystemStorage):
+    """Stores uploads under a content-hashed name, e.g. products/shirt.3f9a1c2b4d5e.jpg.
+
+    The same bytes always map to the same name, so a stored file never
+    changes and can be served with `Cache-Control: immutable`. Re-uploading
+    identical content reuses the existing file.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        name = self.hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    @staticmethod
+    def hashed_name(name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        directory, filename = posixpath.split(name)
+        stem, ext = posixpath.splitext(filename)
+        stem = slugify(stem)[:40] or 'file'
+        return posixpath.join(directory, f"{stem}.{digest.hexdigest()[:HASH_LENGTH]}{ext.lower()}")
+
+
+def _etag_and_cache_control(path, stat):
+    match = HASHED_NAME_RE.search(path)
+    if match:
+        return f'"{match.group(1)}"', IMMUTABLE_CACHE_CONTROL
+    # Files stored before hashed names were introduced can still change.
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"', MUTABLE_CACHE_CONTROL
+
+
+def _range_iter(fh, start, length):
+    try:
+        fh.seek(start)
+        remaining = length
+        while remaining > 0:
+            chunk = fh.read(min(STREAM_CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+    finally:
+        fh.close()
+
+
+def _parse_range(header, size):
+    """Return (start, end) for a single satisfiable byte range, None to ignore
+    the header, or False when the range cannot be satisfied."""
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None  # multi-range or malformed: reply with the whole file
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+
+def serve_media(request, path):
+    """Serve a file from MEDIA_ROOT.
+
+    In production set MEDIA_ACCEL_REDIRECT_PREFIX (nginx) or MEDIA_SENDFILE
+    (Apache/lighttpd) so only headers are produced here and the web server
+    sends the bytes. Without them files are streamed with Range, ETag and
+    conditional request support.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except Exception:
+        raise Http404
+    try:
+        stat = os.stat(full_path)
+    except OSError:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    etag, cache_control = _etag_and_cache_control(path, stat)
+    headers = {
+        'ETag': etag,
+        'Cache-Control': cache_control,
+        'Last-Modified': http_date(stat.st_mtime),
+        'Accept-Ranges': 'bytes',
+    }
+
+    if etag_matches(request, etag):
+        response = HttpResponseNotModified()
+        for key, value in headers.items():
+            response[key] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or 'application/octet-stream'
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + path.lstrip('/')
+        return response
+    if settings.MEDIA_SENDFILE:
+        response = HttpResponse(content_type=content_type, headers=headers)
+        response['X-Sendfile'] = full_path
+        return response
+
+    size = stat.st_size
+    byte_range = _parse_range(request.headers['Range'], size) if 'Range' in request.headers else None
+    if byte_range is False:
+        response = HttpResponse(status=416, headers=headers)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    if byte_range is None:
+        # FileResponse hands the file to wsgi.file_wrapper (sendfile) when the server offers it.
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type, headers=headers)
+    else:
+        start, end = byte_range
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            _range_iter(open(full_path, 'rb'), start, length),
+            status=206, content_type=content_type, headers=headers,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(length)
+    if encoding:
+        response['Content-Encoding'] = encoding
+    return response
@@ -0,0 +1,173 @@
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Streamed responses are sync-flushed once this much input has gone in, so
+# small chunks (one CSV row each) still compress as a block.
+STREAM_FLUSH_SIZE = 16 * 1024
+
+# Only the API's data formats. HTML pages (admin, browsable API) carry CSRF
+# tokens next to echoed request input, which compression would expose to a
+# BREACH-style length oracle, so they are never compressed here.
+COMPRESSIBLE_TYPES = ('application/json', 'application/x-ndjson', 'text/csv')
+
+
+class _Gzip:
+    name = 'gzip'
+
+    def __init__(self):
+        # wbits=31: gzip container
+        self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        # Sync flush so buffered output reaches the client promptly.
+        return self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self._obj.flush(zlib.Z_FINISH)
+
+
+class _Brotli:
+    name = 'br'
+
+    def __init__(self):
+        self._obj = brotli.Compressor(quality=5)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def flush(self):
+        return self._obj.flush()
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _Zstd:
+    name = 'zstd'
+
+    def __init__(self):
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def flush(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self):
+        return self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_FINISH)
+
+
+# Server preference when the client accepts several with equal weight.
+CODECS = [codec for codec, available in ((_Zstd, zstandard), (_Brotli, brotli), (_Gzip, True)) if available]
+
+
+def _accepted_encodings(header):
+    accepted = {}
+    for part in header.split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def negotiate(header):
+    accepted = _accepted_encodings(header)
+    wildcard = accepted.get('*', 0.0)
+    best, best_q = None, 0.0
+    for codec in CODECS:
+        q = accepted.get(codec.name, wildcard)
+        if q > best_q:
+            best, best_q = codec, q
+    return best
+
+
+class CompressionMiddleware:
+    """Negotiated zstd/br/gzip compression for API JSON and CSV responses.
+
+    zstd and br are used when the optional `zstandard`/`brotli` packages are
+    installed. Responses smaller than COMPRESSION_MIN_SIZE, other content
+    types (see COMPRESSIBLE_TYPES), partial content and responses that
+    already carry a Content-Encoding are passed through untouched. Streaming
+    responses are compressed as they stream and flushed every
+    STREAM_FLUSH_SIZE bytes of input.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        return self.process_response(request, response)
+
+    def process_response(self, request, response):
+        if response.status_code != 200 or response.has_header('Content-Encoding'):
+            return response
+        content_type = response.get('Content-Type', '').lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        codec = negotiate(request.headers.get('Accept-Encoding', ''))
+        if codec is None:
+            return response
+
+        if response.streaming:
+            if getattr(response, 'is_async', False):
+                return response
+            response.streaming_content = self._compress_stream(codec(), response.streaming_content)
+            del response.headers['Content-Length']
+        else:
+            if len(response.content) < settings.COMPRESSION_MIN_SIZE:
+                return response
+            compressor = codec()
+            compressed = compressor.compress(response.content) + compressor.finish()
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = codec.name
+        return response
+
+    @staticmethod
+    def _compress_stream(compressor, chunks):
+        pending = 0
+        for chunk in chunks:
+            data = compressor.compress(chunk)
+            pending += len(chunk)
+            if pending >= STREAM_FLUSH_SIZE:
+                data += compressor.flush()
+                pending = 0
+            if data:
+                yield data
+        yield compressor.finish()
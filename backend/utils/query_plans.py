@@ -0,0 +1,88 @@
+"""Registry of hot queries and an EXPLAIN-based full-scan detector.
+
+Apps list the queries their request paths depend on in a `query_plans`
+module:
+
+    @hot_query('orders.history')
+    def order_history():
+        return Order.objects.filter(user_id=1).order_by('-created_at')
+
+`manage.py check_query_plans` EXPLAINs every registered queryset and fails if
+a plan reads a whole table, so a dropped or mis-ordered index shows up before
+it reaches production. Tables that are small by design (categories, site
+settings) can be whitelisted per query with `allow_scan`.
+
+On PostgreSQL the check runs with enable_seqscan off. The planner then only
+picks a Seq Scan when no index can serve the query, so the result doesn't
+depend on how much data the database happens to hold. SQLite uses any
+applicable index as long as its tables haven't been ANALYZEd.
+"""
+import json
+import re
+
+from django.db import connections, transaction
+from django.utils.module_loading import autodiscover_modules
+
+_registry = {}
+
+SQLITE_STEP_RE = re.compile(r'^(SCAN|SEARCH) (\S+)')
+
+
+def hot_query(name, allow_scan=()):
+    def decorator(func):
+        _registry[name] = (func, frozenset(allow_scan))
+        return func
+    return decorator
+
+
+def registered_queries():
+    autodiscover_modules('query_plans')
+    return dict(sorted(_registry.items()))
+
+
+def _sqlite_plan(cursor, sql, params):
+    cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+    steps = [row[-1] for row in cursor.fetchall()]
+    scans = []
+    for step in steps:
+        match = SQLITE_STEP_RE.match(step)
+        # "SCAN t USING INDEX i" walks an index in order (and stops at the
+        # LIMIT); only a bare "SCAN t" reads the table itself.
+        if match and match.group(1) == 'SCAN' and ' USING ' not in step:
+            scans.append(match.group(2))
+    return scans, '\n'.join(steps)
+
+
+def _postgresql_plan(cursor, sql, params):
+    with transaction.atomic(using=cursor.db.alias):
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    scans = []
+    nodes = [plan[0]['Plan']]
+    while nodes:
+        node = nodes.pop()
+        if node.get('Node Type') == 'Seq Scan':
+            scans.append(node['Relation Name'])
+        nodes.extend(node.get('Plans', ()))
+    return scans, json.dumps(plan, indent=2)
+
+
+PLANNERS = {
+    'sqlite': _sqlite_plan,
+    'postgresql': _postgresql_plan,
+}
+
+
+def full_scans(queryset, allow_scan=()):
+    """Return (tables read in full, plan text) for a queryset."""
+    connection = connections[queryset.db]
+    planner = PLANNERS.get(connection.vendor)
+    if planner is None:
+        raise NotImplementedError(f"Query plan checks don't support {connection.vendor}.")
+    sql, params = queryset.query.get_compiler(using=queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        scans, plan = planner(cursor, sql, params)
+    return [table for table in scans if table not in allow_scan], plan
@@ -0,0 +1,173 @@
+"""Sparse fieldsets (`?fields=`) and expansion control (`?expand=`).
+
+    GET /api/products/?fields=id,name,slug,price,image
+    GET /api/products/?expand=category            # subcategory -> id, no images
+    GET /api/products/?expand=category.subcategories,images
+
+Without either parameter responses are unchanged. With `expand`, nested
+relations listed in the serializer's `Meta.expandable_fields` are only
+rendered when named; forward relations otherwise fall back to their primary
+key and reverse/many relations are left out. Dotted names expand nested
+serializers.
+
+The view mixin derives select_related/prefetch_related from whatever the
+pruned serializer will actually read, and defers unused columns.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+def _split(value):
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(',') if part.strip()]
+
+
+def _nested_expand(expand, name):
+    prefix = f"{name}."
+    return [item[len(prefix):] for item in expand if item.startswith(prefix)]
+
+
+class SparseFieldsetMixin:
+    """Serializer mixin accepting `fields=` and `expand=` keyword arguments."""
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+        if expand is not None:
+            self.apply_expand(expand)
+
+    def apply_expand(self, expand):
+        expandable = getattr(getattr(self, 'Meta', None), 'expandable_fields', ())
+        top_level = {item.split('.', 1)[0] for item in expand}
+        for name in expandable:
+            field = self.fields.get(name)
+            if field is None:
+                continue
+            if name not in top_level:
+                if isinstance(field, serializers.ListSerializer):
+                    self.fields.pop(name)
+                else:
+                    source = {} if field.source == name else {'source': field.source}
+                    self.fields[name] = serializers.PrimaryKeyRelatedField(read_only=True, **source)
+                continue
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, SparseFieldsetMixin):
+                nested.apply_expand(_nested_expand(expand, name))
+
+
+def _relation_paths(serializer, model, prefix='', inside_prefetch=False, select=None, prefetch=None):
+    """Collect the select_related/prefetch_related lookups a serializer will hit."""
+    select = [] if select is None else select
+    prefetch = [] if prefetch is None else prefetch
+
+    def add(path, many):
+        if many or inside_prefetch:
+            prefetch.append(path)
+        else:
+            select.append(path)
+
+    hints = getattr(getattr(serializer, 'Meta', None), 'relation_hints', {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        nested = field.child if isinstance(field, serializers.ListSerializer) else field
+        sources = [hints[name]] if name in hints else [field.source]
+        for source in sources:
+            if source == '*' or not source:
+                continue
+            attrs = source.split('.')
+            current_model, path, many = model, prefix, inside_prefetch
+            for index, attr in enumerate(attrs):
+                try:
+                    model_field = current_model._meta.get_field(attr)
+                except FieldDoesNotExist:
+                    break
+                if not model_field.is_relation:
+                    break
+                is_last = index == len(attrs) - 1
+                if is_last and isinstance(nested, serializers.PrimaryKeyRelatedField) and not model_field.many_to_many \
+                        and not model_field.one_to_many:
+                    break  # plain FK id, already on the row
+                path = f"{path}{attr}"
+                many = many or model_field.one_to_many or model_field.many_to_many
+                add(path, many)
+                current_model = model_field.related_model
+                path = f"{path}__"
+            else:
+                if isinstance(nested, serializers.ModelSerializer):
+                    _relation_paths(nested, current_model, path, many, select, prefetch)
+    return select, prefetch
+
+
+def _used_columns(serializer, model):
+    used = set()
+    hints = getattr(getattr(serializer, 'Meta', None), 'relation_hints', {})
+    for name, field in serializer.fields.items():
+        if field.write_only:
+            continue
+        for source in ([hints[name]] if name in hints else [field.source]):
+            if source == '*':
+                return None  # whole object handed to the field; can't prune
+            try:
+                model_field = model._meta.get_field(source.split('.')[0])
+            except FieldDoesNotExist:
+                return None  # property or method; be conservative
+            if model_field.concrete:
+                used.add(model_field.attname)
+    return used
+
+
+class SparseFieldsetViewMixin:
+    """ViewSet mixin wiring `?fields=`/`?expand=` into serializers and querysets.
+
+    Only applied to GET requests so writes always see the full serializer.
+    """
+
+    def get_sparse_options(self):
+        request = getattr(self, 'request', None)
+        if request is None or request.method != 'GET':
+            return {}
+        options = {}
+        fields = _split(request.query_params.get('fields'))
+        expand = _split(request.query_params.get('expand'))
+        if fields is not None:
+            options['fields'] = fields
+        if expand is not None:
+            options['expand'] = expand
+        return options
+
+    def get_serializer(self, *args, **kwargs):
+        for key, value in self.get_sparse_options().items():
+            kwargs.setdefault(key, value)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        # filter_queryset rather than get_queryset so viewsets that override
+        # get_queryset don't need to call super().
+        queryset = super().filter_queryset(queryset)
+        request = getattr(self, 'request', None)
+        if request is None or request.method != 'GET':
+            return queryset
+
+        serializer = self.get_serializer_class()(context=self.get_serializer_context(), **self.get_sparse_options())
+        model = queryset.model
+        select, prefetch = _relation_paths(serializer, model)
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+
+        used = _used_columns(serializer, model)
+        if used is not None:
+            used.update(model._meta.get_field(path.split('__')[0]).attname for path in select)
+            used.update(getattr(self, 'sparse_required_columns', ()))
+            deferred = [f.attname for f in model._meta.concrete_fields
+                        if f.attname not in used and not f.primary_key]
+            if deferred:
+                queryset = queryset.defer(*deferred)
+        return queryset
@@ -0,0 +1,52 @@
+"""Cold start measurements for worker processes.
+
+Both helpers start a fresh interpreter that does what a WSGI worker does
+before it can answer its first request: build the application (settings, app
+registry, middleware) and load the URLconf, which imports every view. Running
+in a subprocess means nothing the current process has already imported skews
+the numbers.
+"""
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+
+STARTUP_SCRIPT = """
+import time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+get_wsgi_application()
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(round((time.perf_counter() - started) * 1000, 1))
+"""
+
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| *(\S+)$')
+
+
+def _run(api_only, *python_flags):
+    env = {**os.environ, 'API_ONLY': 'True' if api_only else 'False'}
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    return subprocess.run(
+        [sys.executable, *python_flags, '-c', STARTUP_SCRIPT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+def cold_start_ms(api_only=False):
+    """Milliseconds a new worker spends from `import django` to a loaded URLconf."""
+    return float(_run(api_only).stdout.strip().splitlines()[-1])
+
+
+def profile_imports(api_only=False):
+    """(module, self ms, cumulative ms) for every module a worker cold start imports."""
+    result = _run(api_only, '-X', 'importtime')
+    timings = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            module, self_us, cumulative_us = match.group(3), int(match.group(1)), int(match.group(2))
+            timings.append((module, self_us / 1000, cumulative_us / 1000))
+    return timings
@@ -0,0 +1,155 @@
+import threading
+import time
+
+from django.core.cache import cache
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """'10/min' -> (10, 60). Same format as DRF's DEFAULT_THROTTLE_RATES."""
+    num, period = rate.split('/')
+    return int(num), DURATIONS[period[0]]
+
+
+class _MemoryCounterStore:
+    """Process-local fallback used when the shared cache is unreachable."""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            return None
+        return entry[1]
+
+    def incr(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < now:
+                if len(self._data) > 50000:
+                    self._data = {k: v for k, v in self._data.items() if v[0] >= now}
+                entry = (now + timeout, 0)
+            entry = (entry[0], entry[1] + 1)
+            self._data[key] = entry
+            return entry[1]
+
+    def decr(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data[key] = (entry[0], max(entry[1] - 1, 0))
+
+
+memory_store = _MemoryCounterStore()
+
+
+class SlidingWindowThrottle(BaseThrottle):
+    """Sliding-window counter throttle with state in the shared cache.
+
+    The rate for a scope is looked up in DEFAULT_THROTTLE_RATES under up to
+    three keys, each enforced independently:
+
+        '<scope>'        per client (user id when authenticated, else IP)
+        '<scope>.ip'     per IP address, whoever is logged in
+        '<scope>.route'  all clients combined
+
+    A '.route' limit is shared by everyone, so one abusive client can use it
+    up for all; keep it for capacity guards, not abuse protection.
+
+    The scope comes from the class (subclass and set `scope`) or from the
+    view's `throttle_scope`, so it can be set per viewset or per @action.
+    Each request is counted with an atomic add/incr before the limit is
+    checked, so a concurrent burst can't slip in under it. A denied request
+    takes its hits back, so a client that keeps retrying while throttled is
+    let through again once the window slides on. Each check costs one
+    add/incr and one get per configured rate.
+
+    Anonymous clients are identified by DRF's get_ident(), which only trusts
+    X-Forwarded-For as far as REST_FRAMEWORK['NUM_PROXIES'] allows.
+    """
+
+    scope = None
+    cache_prefix = 'throttle'
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def get_scope(self, view):
+        return self.scope or getattr(view, 'throttle_scope', None)
+
+    def get_rates(self, scope):
+        rates = api_settings.DEFAULT_THROTTLE_RATES
+        limits = []
+        for suffix in ('', '.ip', '.route'):
+            rate = rates.get(f"{scope}{suffix}")
+            if rate:
+                limits.append((suffix or '.client', parse_rate(rate)))
+        return limits
+
+    def get_identity(self, dimension, request):
+        if dimension == '.client' and request.user and request.user.is_authenticated:
+            return f"u{request.user.pk}"
+        if dimension == '.route':
+            return 'all'
+        return self.get_ident(request)
+
+    def allow_request(self, request, view):
+        scope = self.get_scope(view)
+        if not scope:
+            return True
+
+        now = time.time()
+        hits = []
+        for dimension, (limit, window) in self.get_rates(scope):
+            identity = self.get_identity(dimension, request)
+            window_index, elapsed = divmod(now, window)
+            base = f"{self.cache_prefix}:{scope}{dimension}:{identity}"
+            current_key = f"{base}:{int(window_index)}"
+            current = self._hit(current_key, window)
+            hits.append(current_key)
+            previous = self._get(f"{base}:{int(window_index) - 1}")
+
+            # Weight the previous window by how much of it still overlaps.
+            estimated = previous * (1 - elapsed / window) + current
+            if estimated > limit:
+                for key in hits:
+                    self._unhit(key)
+                self.wait_seconds = window - elapsed
+                return False
+        return True
+
+    def _hit(self, key, window):
+        """Count a hit and return the window's new total."""
+        try:
+            if cache.add(key, 1, window * 2):
+                return 1
+            return cache.incr(key)
+        except ValueError:
+            # Key expired between add() and incr(); count this hit as the first.
+            cache.set(key, 1, window * 2)
+            return 1
+        except Exception:
+            return memory_store.incr(key, window * 2)
+
+    def _unhit(self, key):
+        try:
+            cache.decr(key)
+        except ValueError:
+            pass  # expired meanwhile; nothing to give back
+        except Exception:
+            memory_store.decr(key)
+
+    def _get(self, key):
+        try:
+            return cache.get(key) or 0
+        except Exception:
+            return memory_store.get(key) or 0
+
+    def wait(self):
+        return self.wait_seconds
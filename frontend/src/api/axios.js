@@ -18,4 +18,13 @@ api.interceptors.request.use((config) => {
     return Promise.reject(error);
 });
 
+// Drop credentials the server no longer accepts (expired, rotated or revoked)
+api.interceptors.response.use((response) => response, (error) => {
+    if (error.response?.status === 401 && localStorage.getItem('token')) {
+        localStorage.removeItem('token');
+        localStorage.removeItem('user');
+    }
+    return Promise.reject(error);
+});
+
 export default api;
@@ -0,0 +1,50 @@
+import api from './axios';
+
+const PARALLEL_FILES = 4;
+const MAX_RETRIES = 3;
+
+// Send one file in Content-Range chunks, resuming from the server's offset
+// after a failed chunk.
+const uploadFile = async (productSlug, file) => {
+    const { data: session } = await api.post('uploads/', {
+        product: productSlug,
+        filename: file.name,
+        size: file.size,
+    });
+
+    let offset = 0;
+    let retries = 0;
+    while (offset < file.size) {
+        const end = Math.min(offset + session.chunk_size, file.size) - 1;
+        try {
+            const { data } = await api.put(`uploads/${session.id}/chunk/`, file.slice(offset, end + 1), {
+                headers: {
+                    'Content-Type': 'application/octet-stream',
+                    'Content-Range': `bytes ${offset}-${end}/${file.size}`,
+                },
+            });
+            offset = data.offset;
+            retries = 0;
+        } catch (error) {
+            if (++retries > MAX_RETRIES) throw error;
+            const { data } = await api.get(`uploads/${session.id}/`);
+            offset = data.offset;
+        }
+    }
+    return session.id;
+};
+
+// Upload gallery images in parallel and attach them to the product in one call.
+export const uploadGallery = async (productSlug, files) => {
+    const queue = [...files];
+    const uploadIds = [];
+    const worker = async () => {
+        while (queue.length) {
+            uploadIds.push(await uploadFile(productSlug, queue.shift()));
+        }
+    };
+    await Promise.all(Array.from({ length: Math.min(PARALLEL_FILES, queue.length) }, worker));
+    if (!uploadIds.length) return [];
+    const { data } = await api.post(`products/${productSlug}/images/`, { uploads: uploadIds });
+    return data;
+};
@@ -30,7 +30,12 @@ const Navbar = () => {
     };
 
     useEffect(() => {
-        api.get('categories/').then(res => setCategories(res.data.results || res.data)).catch(console.error);
+        // Hide branches with no live products
+        api.get('categories/tree/').then(res => setCategories(
+            res.data.categories
+                .filter(cat => cat.product_count > 0)
+                .map(cat => ({ ...cat, subcategories: cat.subcategories.filter(sub => sub.product_count > 0) }))
+        )).catch(console.error);
 
         const handleScroll = () => setScrolled(window.scrollY > 20);
         window.addEventListener('scroll', handleScroll);
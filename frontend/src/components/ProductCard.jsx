@@ -6,6 +6,7 @@ import { ShoppingBag } from 'lucide-react';
 const ProductCard = ({ product }) => {
     const { addToCart } = useCart();
     const BASE_URL = `http://${window.location.hostname}:8000`;
+    const onSale = product.effective_price != null && parseFloat(product.effective_price) < parseFloat(product.price);
 
     return (
         <motion.div
@@ -65,7 +66,12 @@ const ProductCard = ({ product }) => {
                         fontWeight: '800',
                         color: 'var(--primary-color)'
                     }}>
-                        ৳{product.price}
+                        ৳{product.effective_price ?? product.price}
+                        {onSale && (
+                            <span style={{ fontSize: '0.9rem', fontWeight: 600, color: 'var(--text-muted)', textDecoration: 'line-through', marginLeft: '0.5rem' }}>
+                                ৳{product.price}
+                            </span>
+                        )}
                     </span>
 
                     <motion.button
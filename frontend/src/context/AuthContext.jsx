@@ -81,6 +81,10 @@ export const AuthProvider = ({ children }) => {
     };
 
     const logout = () => {
+        if (token) {
+            // Revoke the token server-side; local state is cleared regardless.
+            api.post('auth/logout/').catch(() => {});
+        }
         setToken(null);
         setUser(null);
         localStorage.removeItem('token');
@@ -24,7 +24,9 @@ export const CartProvider = ({ children }) => {
                         : item
                 );
             }
-            return [...prevCart, { ...product, quantity, size, color, cartId }];
+            // Charge the sale price while a price rule is live; checkout uses it too.
+            const price = product.effective_price ?? product.price;
+            return [...prevCart, { ...product, price, quantity, size, color, cartId }];
         });
     };
 
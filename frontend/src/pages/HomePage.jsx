@@ -10,12 +10,11 @@ const HomePage = () => {
     const BASE_URL = `http://${window.location.hostname}:8000`;
 
     useEffect(() => {
-        api.get('products/')
-            .then(res => setProducts(res.data.results || res.data))
-            .catch(err => console.error(err));
-
-        api.get('banners/')
-            .then(res => setBanners(res.data.results || res.data))
+        api.get('home/')
+            .then(res => {
+                setProducts(res.data.new_arrivals);
+                setBanners(res.data.banners);
+            })
             .catch(err => console.error(err));
     }, []);
 
@@ -6,6 +6,7 @@ import api from '../api/axios';
 import { useCart } from '../context/CartContext';
 import { useNotifications } from '../context/NotificationContext';
 import ReviewForm from '../components/ReviewForm';
+import ProductCard from '../components/ProductCard';
 
 const ProductDetailsPage = () => {
     const { slug } = useParams();
@@ -17,6 +18,8 @@ const ProductDetailsPage = () => {
     const { showNotification } = useNotifications();
     const [reviews, setReviews] = useState([]);
     const [averageRating, setAverageRating] = useState(0);
+    const [boughtTogether, setBoughtTogether] = useState([]);
+    const [similar, setSimilar] = useState([]);
     const BASE_URL = `http://${window.location.hostname}:8000`;
 
     useEffect(() => {
@@ -36,6 +39,14 @@ const ProductDetailsPage = () => {
                 });
             })
             .catch(err => console.error(err));
+
+        // Precomputed from past orders; an empty list simply hides the section
+        api.get(`products/${slug}/recommendations/`)
+            .then(res => setBoughtTogether(res.data))
+            .catch(() => setBoughtTogether([]));
+        api.get(`products/${slug}/similar/?limit=4`)
+            .then(res => setSimilar(res.data))
+            .catch(() => setSimilar([]));
     }, [slug]);
 
     if (!product) return (
@@ -47,6 +58,7 @@ const ProductDetailsPage = () => {
     const imageUrl = product.image
         ? (product.image.startsWith('http') ? product.image : `${BASE_URL}${product.image}`)
         : null;
+    const onSale = product.effective_price != null && parseFloat(product.effective_price) < parseFloat(product.price);
 
     return (
         <div style={{ background: 'var(--bg-color)', minHeight: '100vh' }}>
@@ -160,7 +172,12 @@ const ProductDetailsPage = () => {
                                 fontWeight: '800',
                                 color: 'var(--primary-color)'
                             }}>
-                                ৳{product.price}
+                                ৳{product.effective_price ?? product.price}
+                                {onSale && (
+                                    <span style={{ fontSize: '1.2rem', fontWeight: 600, color: 'var(--text-muted)', textDecoration: 'line-through', marginLeft: '0.75rem' }}>
+                                        ৳{product.price}
+                                    </span>
+                                )}
                             </span>
                             <span style={{
                                 background: (product.stock > 0 && product.is_available) ? 'var(--accent-color)' : '#fef2f2',
@@ -289,6 +306,34 @@ const ProductDetailsPage = () => {
                     </motion.div>
                 </div>
 
+                {/* Frequently Bought Together */}
+                {boughtTogether.length > 0 && (
+                    <div style={{ marginTop: '5rem', borderTop: '1px solid var(--gray-200)', paddingTop: '5rem' }}>
+                        <div style={{ textAlign: 'center', marginBottom: '3rem' }}>
+                            <h2 style={{ fontSize: '2.5rem', marginBottom: '0.5rem' }}>Frequently Bought Together</h2>
+                        </div>
+                        <div className="grid-products">
+                            {boughtTogether.slice(0, 4).map(item => (
+                                <ProductCard key={item.id} product={item} />
+                            ))}
+                        </div>
+                    </div>
+                )}
+
+                {/* You May Also Like */}
+                {similar.length > 0 && (
+                    <div style={{ marginTop: '5rem', borderTop: '1px solid var(--gray-200)', paddingTop: '5rem' }}>
+                        <div style={{ textAlign: 'center', marginBottom: '3rem' }}>
+                            <h2 style={{ fontSize: '2.5rem', marginBottom: '0.5rem' }}>You May Also Like</h2>
+                        </div>
+                        <div className="grid-products">
+                            {similar.map(item => (
+                                <ProductCard key={item.id} product={item} />
+                            ))}
+                        </div>
+                    </div>
+                )}
+
                 {/* Product Reviews Section */}
                 <div style={{ marginTop: '5rem', borderTop: '1px solid var(--gray-200)', paddingTop: '5rem' }}>
                     <div style={{ textAlign: 'center', marginBottom: '3rem' }}>
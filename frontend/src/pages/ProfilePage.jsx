@@ -15,6 +15,7 @@ const ProfilePage = () => {
     const [orders, setOrders] = useState([]);
     const [addresses, setAddresses] = useState([]);
     const [returns, setReturns] = useState([]);
+    const [returnableIds, setReturnableIds] = useState([]);
     const [loadingOrders, setLoadingOrders] = useState(false);
     const [loadingReturns, setLoadingReturns] = useState(false);
 
@@ -56,8 +57,9 @@ const ProfilePage = () => {
     const fetchOrders = async () => {
         setLoadingOrders(true);
         try {
-            const res = await api.get('orders/');
+            const [res, returnable] = await Promise.all([api.get('orders/'), api.get('orders/returnable/')]);
             setOrders(res.data.results || res.data);
+            setReturnableIds(returnable.data);
         } catch (error) {
             console.error("Failed to fetch orders", error);
         } finally {
@@ -218,7 +220,7 @@ const ProfilePage = () => {
                                             </div>
 
                                             <div style={{ display: 'flex', gap: '1rem' }}>
-                                                {order.status === 'Delivered' && !returns.some(r => r.order === order.id) && (
+                                                {returnableIds.includes(order.id) && !returns.some(r => r.order === order.id) && (
                                                     <button
                                                         className="btn-secondary"
                                                         onClick={() => openReturnModal(order)}
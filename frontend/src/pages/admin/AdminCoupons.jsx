@@ -23,6 +23,8 @@ const AdminCoupons = () => {
         discount_value: '',
         min_purchase: '0.00',
         expiry_date: '',
+        max_uses: '',
+        max_uses_per_user: '',
         is_active: true
     });
 
@@ -36,6 +38,7 @@ const AdminCoupons = () => {
         coupon: '',
         start_date: '',
         end_date: '',
+        unique_codes: false,
         is_active: true
     });
 
@@ -77,11 +80,15 @@ const AdminCoupons = () => {
     const handleSubmit = async (e) => {
         e.preventDefault();
         try {
-            await api.post('coupons/', formData);
+            await api.post('coupons/', {
+                ...formData,
+                max_uses: formData.max_uses || null,
+                max_uses_per_user: formData.max_uses_per_user || null
+            });
             setShowForm(false);
             setFormData({
                 code: '', discount_type: 'FLAT', discount_value: '',
-                min_purchase: '0.00', expiry_date: '', is_active: true
+                min_purchase: '0.00', expiry_date: '', max_uses: '', max_uses_per_user: '', is_active: true
             });
             fetchCoupons();
         } catch (error) {
@@ -118,7 +125,7 @@ const AdminCoupons = () => {
             setShowRuleForm(false);
             setRuleData({
                 name: '', trigger_event: 'LOGIN', min_amount: '0.00',
-                coupon: '', start_date: '', end_date: '', is_active: true
+                coupon: '', start_date: '', end_date: '', unique_codes: false, is_active: true
             });
             fetchRules();
             showNotification('Automation rule activated successfully.', 'success');
@@ -269,6 +276,14 @@ const AdminCoupons = () => {
                                     required
                                 />
                             </label>
+                            <label style={{ gridColumn: 'span 2', display: 'flex', alignItems: 'center', gap: '0.75rem', fontSize: '0.9rem', color: '#71717a' }}>
+                                <input
+                                    type="checkbox"
+                                    checked={ruleData.unique_codes}
+                                    onChange={e => setRuleData({ ...ruleData, unique_codes: e.target.checked })}
+                                />
+                                Send each customer a single-use code (mint them with <code>manage.py mint_coupon_codes</code>)
+                            </label>
                             <div style={{ gridColumn: 'span 2', display: 'flex', justifyContent: 'flex-end', marginTop: '1rem' }}>
                                 <button type="submit" className="btn btn-primary" style={{ padding: '1.1rem 5rem', borderRadius: '16px' }}>CREATE RULE</button>
                             </div>
@@ -337,6 +352,22 @@ const AdminCoupons = () => {
                                     required
                                 />
                             </label>
+                            <label>
+                                <span style={{ fontSize: '0.8rem', fontWeight: 700, color: '#71717a', display: 'block', marginBottom: '0.5rem' }}>TOTAL USES (BLANK = UNLIMITED)</span>
+                                <input
+                                    type="number" min="1" className="input-field"
+                                    value={formData.max_uses}
+                                    onChange={e => setFormData({ ...formData, max_uses: e.target.value })}
+                                />
+                            </label>
+                            <label>
+                                <span style={{ fontSize: '0.8rem', fontWeight: 700, color: '#71717a', display: 'block', marginBottom: '0.5rem' }}>USES PER CUSTOMER (BLANK = UNLIMITED)</span>
+                                <input
+                                    type="number" min="1" className="input-field"
+                                    value={formData.max_uses_per_user}
+                                    onChange={e => setFormData({ ...formData, max_uses_per_user: e.target.value })}
+                                />
+                            </label>
                             <div style={{ gridColumn: 'span 2', display: 'flex', justifyContent: 'flex-end', marginTop: '1rem' }}>
                                 <button type="submit" className="btn btn-primary" style={{ padding: '1.1rem 5rem', borderRadius: '16px' }}>CREATE CUPON</button>
                             </div>
@@ -396,6 +427,10 @@ const AdminCoupons = () => {
                                 <div style={{ display: 'flex', alignItems: 'center', gap: '0.75rem', fontSize: '0.9rem', color: '#71717a', borderTop: '1px solid #f4f4f5', paddingTop: '1rem' }}>
                                     <Calendar size={16} />
                                     <span style={{ fontWeight: 600 }}>Expires: {new Date(coupon.expiry_date).toLocaleString()}</span>
+                                    <span style={{ marginLeft: 'auto', fontWeight: 600 }}>
+                                        Used {coupon.used}{coupon.max_uses ? ` / ${coupon.max_uses}` : ''}
+                                        {coupon.max_uses_per_user ? ` · ${coupon.max_uses_per_user} per customer` : ''}
+                                    </span>
                                 </div>
                             </motion.div>
                         )) : (
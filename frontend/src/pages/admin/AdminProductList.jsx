@@ -1,5 +1,6 @@
 import { useEffect, useState } from 'react';
 import api from '../../api/axios';
+import { uploadGallery } from '../../api/uploads';
 import { useAuth } from '../../context/AuthContext';
 import { useNotifications } from '../../context/NotificationContext';
 import { useModal } from '../../context/ModalContext';
@@ -25,7 +26,7 @@ const AdminProductList = () => {
 
     useEffect(() => {
         fetchProducts();
-        api.get('categories/').then(res => setCategories(res.data.results || res.data));
+        api.get('categories/tree/').then(res => setCategories(res.data.categories));
     }, []);
 
     useEffect(() => {
@@ -99,21 +100,23 @@ const AdminProductList = () => {
         // Single main image (optional, for backward compatibility or main display)
         if (formData.images && formData.images.length > 0) {
             data.append('image', formData.images[0]);
-            formData.images.forEach(image => {
-                data.append('uploaded_images', image);
-            });
         }
 
         try {
+            let response;
             if (editingSlug) {
-                await api.patch(`products/${editingSlug}/`, data, {
+                response = await api.patch(`products/${editingSlug}/`, data, {
                     headers: { Authorization: `Token ${token}`, 'Content-Type': 'multipart/form-data' }
                 });
             } else {
-                await api.post('products/', data, {
+                response = await api.post('products/', data, {
                     headers: { Authorization: `Token ${token}`, 'Content-Type': 'multipart/form-data' }
                 });
             }
+            // Gallery images go up in resumable chunks, several files at a time
+            if (formData.images && formData.images.length > 0) {
+                await uploadGallery(response.data.slug, formData.images);
+            }
             setShowForm(false);
             setEditingSlug(null);
             fetchProducts();
@@ -15,10 +15,15 @@ const AdminReturnRequests = () => {
     const { token } = useAuth();
     const [returnDays, setReturnDays] = useState('');
     const [savingSettings, setSavingSettings] = useState(false);
+    const [selectedStatus, setSelectedStatus] = useState('Pending');
+    const [page, setPage] = useState(1);
+    const [count, setCount] = useState(0);
+    const [selectedIds, setSelectedIds] = useState([]);
+    const pageSize = 25;
 
     useEffect(() => {
         fetchRequests();
-    }, []);
+    }, [page, selectedStatus]);
 
     useEffect(() => {
         if (settings && settings.return_window_days !== undefined) {
@@ -28,12 +33,16 @@ const AdminReturnRequests = () => {
 
     const fetchRequests = async () => {
         try {
-            const res = await api.get('returns/');
-            const data = res.data.results || res.data;
-            setRequests(Array.isArray(data) ? data : []);
+            const params = { page, page_size: pageSize };
+            if (selectedStatus !== 'All') params.status = selectedStatus;
+            const res = await api.get('returns/queue/', { params });
+            setRequests(res.data.results || []);
+            setCount(res.data.count || 0);
+            setSelectedIds([]);
         } catch (error) {
             console.error("Failed to fetch return requests:", error);
             setRequests([]);
+            setCount(0);
         } finally {
             setLoading(false);
         }
@@ -67,13 +76,26 @@ const AdminReturnRequests = () => {
         }
     };
 
-    const [selectedStatus, setSelectedStatus] = useState('All');
+    const bulkUpdate = async (status) => {
+        try {
+            const { data } = await api.post('returns/bulk/', { ids: selectedIds, status }, {
+                headers: { Authorization: `Token ${token}` }
+            });
+            showNotification(`${data.updated.length} request(s) ${status.toLowerCase()}.`, 'success');
+            fetchRequests();
+        } catch (error) {
+            console.error(error);
+            showNotification('Failed to update requests.', 'error');
+        }
+    };
 
-    // ... existing functions ...
+    const toggleSelected = (id) => {
+        setSelectedIds(ids => ids.includes(id) ? ids.filter(i => i !== id) : [...ids, id]);
+    };
 
-    const filteredRequests = requests.filter(req =>
-        selectedStatus === 'All' || req.status === selectedStatus
-    );
+    const pendingIds = requests.filter(req => req.status === 'Pending').map(req => req.id);
+    const allSelected = pendingIds.length > 0 && pendingIds.every(id => selectedIds.includes(id));
+    const pageCount = Math.max(1, Math.ceil(count / pageSize));
 
     if (loading) return <div style={{ padding: '2rem' }}>Loading requests...</div>;
 
@@ -92,7 +114,7 @@ const AdminReturnRequests = () => {
                             className="input-field"
                             style={{ marginBottom: 0, height: '40px', padding: '0 1rem' }}
                             value={selectedStatus}
-                            onChange={(e) => setSelectedStatus(e.target.value)}
+                            onChange={(e) => { setSelectedStatus(e.target.value); setPage(1); }}
                         >
                             <option value="All">All Requests</option>
                             <option value="Pending">Pending</option>
@@ -119,12 +141,33 @@ const AdminReturnRequests = () => {
                 </div>
             </div>
 
+            {selectedIds.length > 0 && (
+                <div style={{ display: 'flex', alignItems: 'center', gap: '1rem', marginBottom: '1rem' }}>
+                    <span style={{ fontWeight: 700 }}>{selectedIds.length} selected</span>
+                    <button onClick={() => bulkUpdate('Approved')} className="btn" style={{ background: '#dcfce7', color: '#166534', padding: '0.5rem 1rem', borderRadius: '8px' }}>
+                        <CheckCircle size={14} style={{ marginRight: '0.4rem' }} /> APPROVE & RESTOCK
+                    </button>
+                    <button onClick={() => bulkUpdate('Rejected')} className="btn" style={{ background: '#fee2e2', color: '#991b1b', padding: '0.5rem 1rem', borderRadius: '8px' }}>
+                        <XCircle size={14} style={{ marginRight: '0.4rem' }} /> REJECT
+                    </button>
+                </div>
+            )}
+
             <div className="card" style={{ padding: '0', background: 'white', overflow: 'hidden' }}>
                 <table style={{ width: '100%', borderCollapse: 'collapse', textAlign: 'left' }}>
                     <thead>
                         <tr style={{ background: '#f8fafc', borderBottom: '1px solid #e2e8f0' }}>
+                            <th style={{ padding: '1rem' }}>
+                                <input
+                                    type="checkbox"
+                                    checked={allSelected}
+                                    disabled={pendingIds.length === 0}
+                                    onChange={() => setSelectedIds(allSelected ? [] : pendingIds)}
+                                />
+                            </th>
                             <th style={{ padding: '1rem', fontSize: '0.8rem', fontWeight: 700, color: '#64748b' }}>REQUEST ID</th>
                             <th style={{ padding: '1rem', fontSize: '0.8rem', fontWeight: 700, color: '#64748b' }}>ORDER</th>
+                            <th style={{ padding: '1rem', fontSize: '0.8rem', fontWeight: 700, color: '#64748b' }}>CUSTOMER</th>
                             <th style={{ padding: '1rem', fontSize: '0.8rem', fontWeight: 700, color: '#64748b' }}>REASON</th>
                             <th style={{ padding: '1rem', fontSize: '0.8rem', fontWeight: 700, color: '#64748b' }}>PROOF</th>
                             <th style={{ padding: '1rem', fontSize: '0.8rem', fontWeight: 700, color: '#64748b' }}>STATUS</th>
@@ -132,10 +175,24 @@ const AdminReturnRequests = () => {
                         </tr>
                     </thead>
                     <tbody>
-                        {filteredRequests.map(req => (
+                        {requests.map(req => (
                             <tr key={req.id} style={{ borderBottom: '1px solid #f1f5f9' }}>
+                                <td style={{ padding: '1rem' }}>
+                                    <input
+                                        type="checkbox"
+                                        checked={selectedIds.includes(req.id)}
+                                        disabled={req.status !== 'Pending'}
+                                        onChange={() => toggleSelected(req.id)}
+                                    />
+                                </td>
                                 <td style={{ padding: '1rem', fontWeight: 600 }}>#{req.id}</td>
-                                <td style={{ padding: '1rem' }}>Order #{req.order}</td>
+                                <td style={{ padding: '1rem' }}>
+                                    <div>Order #{req.order}</div>
+                                    <div style={{ fontSize: '0.75rem', color: '#94a3b8' }}>
+                                        ৳{req.order_total}{req.delivered_at && ` · delivered ${new Date(req.delivered_at).toLocaleDateString()}`}
+                                    </div>
+                                </td>
+                                <td style={{ padding: '1rem', fontSize: '0.85rem' }}>{req.user_email}</td>
                                 <td style={{ padding: '1rem', maxWidth: '300px' }}>{req.reason}</td>
                                 <td style={{ padding: '1rem' }}>
                                     {req.image ? (
@@ -183,6 +240,14 @@ const AdminReturnRequests = () => {
                 {requests.length === 0 && <div style={{ padding: '3rem', textAlign: 'center', color: '#94a3b8' }}>No return requests found.</div>}
             </div>
 
+            {pageCount > 1 && (
+                <div style={{ display: 'flex', justifyContent: 'flex-end', alignItems: 'center', gap: '1rem', marginTop: '1rem' }}>
+                    <button className="btn" disabled={page <= 1} onClick={() => setPage(p => p - 1)}>PREV</button>
+                    <span style={{ fontSize: '0.85rem', color: '#71717a' }}>Page {page} of {pageCount}</span>
+                    <button className="btn" disabled={page >= pageCount} onClick={() => setPage(p => p + 1)}>NEXT</button>
+                </div>
+            )}
+
             <AnimatePresence>
                 {selectedImage && (
                     <motion.div